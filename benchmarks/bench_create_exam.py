@@ -0,0 +1,101 @@
+"""
+Create-Exam Load Benchmark
+==========================
+Drives ExamService.acreate_exam against an offline LLM backend (the
+deterministic stub by default, or a replayed cassette) and reports
+throughput and latency percentiles. Runs without network access and
+gives reproducible numbers for a fixed seed.
+
+Usage:
+    python benchmarks/bench_create_exam.py --exams 50 --concurrency 10
+    python benchmarks/bench_create_exam.py --failure-rate 0.2 --latency 0.8
+    LLM_BACKEND=replay LLM_CASSETTE_PATH=cassettes/run.jsonl \\
+        python benchmarks/bench_create_exam.py --backend replay
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--backend", default="stub", choices=["stub", "replay"])
+    parser.add_argument("--exams", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5, help="exams in flight")
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--question-type", default="mcq", choices=["mcq", "fill_blank"])
+    parser.add_argument("--latency", type=float, default=0.5, help="stub latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="stub latency jitter (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="stub failure rate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--per-question", action="store_true", help="disable batched prompts")
+    return parser.parse_args()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+async def run(args):
+    from src.exams.exam_service import ExamService
+
+    service = ExamService()
+    llm = service.question_generator.llm.llm
+    latencies = []
+    produced = 0
+    failures = 0
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async def one(i):
+        nonlocal produced, failures
+        async with gate:
+            started = time.perf_counter()
+            try:
+                result = await service.acreate_exam(
+                    f"Benchmark topic {i}", "medium", args.questions,
+                    args.question_type, batch=not args.per_question,
+                )
+                produced += result["totalQuestions"]
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.exams)))
+    elapsed = time.perf_counter() - started
+
+    print(f"backend={args.backend} exams={args.exams} concurrency={args.concurrency} "
+          f"questions={args.questions} batch={not args.per_question}")
+    print(f"wall clock:     {elapsed:.2f}s ({args.exams / elapsed:.2f} exams/s)")
+    print(f"exam latency:   p50={percentile(latencies, 50):.3f}s "
+          f"p95={percentile(latencies, 95):.3f}s max={max(latencies):.3f}s")
+    print(f"questions:      {produced}/{args.exams * args.questions}")
+    print(f"failed exams:   {failures}")
+    if hasattr(llm, "calls"):
+        print(f"llm calls:      {llm.calls} ({getattr(llm, 'failures', 0)} simulated failures)")
+
+
+def main():
+    args = parse_args()
+    os.environ["LLM_BACKEND"] = args.backend
+    os.environ.setdefault("LLM_STUB_LATENCY_SECONDS", str(args.latency))
+    os.environ.setdefault("LLM_STUB_LATENCY_JITTER_SECONDS", str(args.jitter))
+    os.environ.setdefault("LLM_STUB_FAILURE_RATE", str(args.failure_rate))
+    os.environ.setdefault("LLM_STUB_SEED", str(args.seed))
+    # measure generation, not the provider's rate limits or the caches
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "1000000000")
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", "64")
+    os.environ.setdefault("QUESTION_CACHE_ENABLED", "false")
+    os.environ.setdefault("POOL_HOT_TOPICS", "")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Student Exam View Load Benchmark
+================================
+Load test of GET /api/exam/{test_id} in-process (httpx over ASGI, no
+network), comparing:
+
+- dict: the previous handler, building the view dict per request and
+  letting FastAPI serialize it
+- rendered: the current handler, serving the bytes pre-rendered when the
+  test was saved (src.exams.student_view)
+- rendered+304: the same, with clients revalidating their copy through
+  If-None-Match
+
+``--requests`` requests over ``--tests`` tests of ``--questions``
+questions, with ``--concurrency`` in flight.
+
+Usage:
+    python benchmarks/bench_exam_view.py
+    python benchmarks/bench_exam_view.py --questions 50 --requests 20000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--tests", type=int, default=50)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20, help="requests in flight")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def make_test(i, questions):
+    return {
+        "testId": f"bench-{i}",
+        "topic": "Data structures",
+        "difficulty": "medium",
+        "questionType": "mcq",
+        "totalQuestions": questions,
+        "questions": [
+            {
+                "question": f"Which structure gives O(1) average lookup by key? ({i}.{q})",
+                "options": ["Linked list", "Hash map", "Binary heap", "Stack"],
+                "correct_answer": "Hash map",
+                "explanation": "Hashing maps a key straight to its bucket.",
+            }
+            for q in range(questions)
+        ],
+        "revision": 1,
+    }
+
+
+def make_app():
+    import logging
+
+    from fastapi import FastAPI
+    from src.routes import exam_routes
+
+    # per-request info logs would dominate the timings
+    logging.disable(logging.INFO)
+    app = FastAPI()
+    app.include_router(exam_routes.router)
+
+    @app.get("/baseline/exam/{test_id}")
+    async def baseline(test_id: str):
+        return exam_routes.exam_service.get_exam_questions(test_id)
+
+    return app
+
+
+async def load(client, paths, concurrency, etags=None):
+    latencies = []
+    statuses = {}
+    sent = 0
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(path):
+        nonlocal sent
+        async with gate:
+            headers = {"If-None-Match": etags[path]} if etags else None
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            sent += len(response.content)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(path) for path in paths))
+    return time.perf_counter() - started, latencies, statuses, sent
+
+
+async def run(args):
+    import httpx
+    from src.exams.exam_manager import ExamManager
+
+    for i in range(args.tests):
+        ExamManager.save_test(f"bench-{i}", make_test(i, args.questions))
+    ids = [f"bench-{random.randrange(args.tests)}" for _ in range(args.requests)]
+
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        etags = {}
+        for i in range(args.tests):
+            path = f"/api/exam/bench-{i}"
+            response = await client.get(path)
+            baseline = await client.get(f"/baseline/exam/bench-{i}")
+            assert response.json() == baseline.json()
+            etags[path] = response.headers["etag"]
+
+        runs = [
+            ("dict", [f"/baseline/exam/{i}" for i in ids], None),
+            ("rendered", [f"/api/exam/{i}" for i in ids], None),
+            ("rendered+304", [f"/api/exam/{i}" for i in ids], etags),
+        ]
+        results = []
+        for name, paths, headers in runs:
+            elapsed, latencies, statuses, sent = await load(
+                client, paths, args.concurrency, headers
+            )
+            results.append((name, len(paths) / elapsed, latencies, statuses, sent))
+    return results
+
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    results = asyncio.run(run(args))
+
+    print(f"tests={args.tests} questions={args.questions} requests={args.requests} "
+          f"concurrency={args.concurrency}")
+    print(f"{'handler':<14}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'body MB':>9}  statuses")
+    base = results[0][1]
+    for name, rate, latencies, statuses, sent in results:
+        print(f"{name:<14}{rate:>10.0f}{percentile(latencies, 50) * 1000:>9.2f}"
+              f"{percentile(latencies, 99) * 1000:>9.2f}{sent / 1e6:>9.2f}  {statuses}"
+              + (f"  ({rate / base:.1f}x)" if name != "dict" else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+JSON Extraction Microbenchmark
+==============================
+Compares the legacy greedy-regex parser with extract_json_objects on a
+corpus of LLM outputs (benchmarks/corpus/llm_outputs.jsonl): clean
+answers, code fences, prose with stray braces, trailing commas, LaTeX
+escapes, truncated and refused outputs. Reports how many outputs each
+parser turns into question objects (every failure is a wasted LLM call)
+and the mean time per extraction.
+
+Usage:
+    python benchmarks/bench_json_extraction.py
+    python benchmarks/bench_json_extraction.py --repeat 5000 --verbose
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.generator.json_extraction import JSONExtractionError, extract_json_objects
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus", "llm_outputs.jsonl")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--repeat", type=int, default=2000, help="passes over the corpus")
+    parser.add_argument("--verbose", action="store_true", help="per-case outcomes")
+    return parser.parse_args()
+
+
+def legacy_extract(text):
+    """The original _parse_response: greedy {...} match plus escape fix"""
+    match = re.search(r"\{.*\}", text.strip(), re.DOTALL)
+    if not match:
+        raise ValueError("No JSON object found in LLM response")
+    json_str = re.sub(r'\\(?!["\\/bfnrtu])', r"\\\\", match.group(0))
+    return [json.loads(json_str)]
+
+
+def outcome(extract, text):
+    try:
+        return len(extract(text))
+    except JSONExtractionError as e:
+        return e.kind
+    except ValueError:
+        return "failed"
+
+
+def timed(extract, texts, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            try:
+                extract(text)
+            except ValueError:
+                pass
+    return (time.perf_counter() - started) / (repeat * len(texts))
+
+
+def main():
+    args = parse_args()
+    with open(args.corpus, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    texts = [case["text"] for case in cases]
+    usable = [case for case in cases if isinstance(case["expect"], int)]
+
+    results = {}
+    for name, extract in (("legacy", legacy_extract), ("extract_json_objects", extract_json_objects)):
+        outcomes = [outcome(extract, case["text"]) for case in cases]
+        parsed = sum(
+            1 for case, got in zip(cases, outcomes)
+            if isinstance(case["expect"], int) and got == case["expect"]
+        )
+        results[name] = outcomes
+        print(
+            f"{name:>22}: {parsed}/{len(usable)} usable outputs fully parsed, "
+            f"{timed(extract, texts, args.repeat) * 1e6:.1f} us/extraction"
+        )
+
+    if args.verbose:
+        print()
+        print(f"{'case':<28}{'expect':>12}{'legacy':>12}{'new':>12}")
+        for case, old, new in zip(cases, results["legacy"], results["extract_json_objects"]):
+            print(f"{case['name']:<28}{str(case['expect']):>12}{str(old):>12}{str(new):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Store Recovery Benchmark
+========================
+Measures how long the write-ahead-logged memory store
+(src.storage.wal_store) takes to come back after a restart, against the
+size of the store. For each size in ``--sizes`` (tests, each with
+``--submissions`` submissions) it recovers twice:
+
+- log only: no snapshot was ever taken, every record is replayed
+- snapshot + tail: a compacted snapshot was taken, then ``--tail`` more
+  mutations were logged; recovery maps the snapshot and replays the tail
+
+It also reports the write rate with fsync'ed group commit from
+``--writers`` threads, and the mean number of records per fsync.
+
+Usage:
+    python benchmarks/bench_recovery.py
+    python benchmarks/bench_recovery.py --sizes 1000,10000,50000 --tail 500
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.in_memory_store import TESTS, SUBMISSIONS
+from src.storage.wal_store import DurableMemoryBackend
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="1000,5000,20000", help="tests per store, comma separated")
+    parser.add_argument("--questions", type=int, default=10, help="questions per test")
+    parser.add_argument("--submissions", type=int, default=2, help="submissions per test")
+    parser.add_argument("--tail", type=int, default=200, help="mutations after the snapshot")
+    parser.add_argument("--writers", type=int, default=16, help="threads for the write rate")
+    parser.add_argument("--writes", type=int, default=2000, help="fsync'ed writes to time")
+    return parser.parse_args()
+
+
+def make_test(i, questions):
+    return {
+        "testId": f"bench-{i}",
+        "topic": "Benchmark",
+        "difficulty": "medium",
+        "questionType": "mcq",
+        "totalQuestions": questions,
+        "questions": [
+            {
+                "question": f"Benchmark question {i}.{q}?",
+                "options": ["alpha", "beta", "gamma", "delta"],
+                "correct_answer": "beta",
+            }
+            for q in range(questions)
+        ],
+        "revision": 1,
+    }
+
+
+def make_submission(i, s, questions):
+    return {
+        "studentName": f"student-{i}-{s}",
+        "answers": {q: "beta" for q in range(questions)},
+        "score": questions,
+    }
+
+
+def populate(directory, size, args, snapshot):
+    # building the store is not what we time: skip the fsyncs
+    backend = DurableMemoryBackend(directory, fsync=False, snapshot_every=10 ** 9)
+    for i in range(size):
+        backend.store_test(f"bench-{i}", make_test(i, args.questions))
+        for s in range(args.submissions):
+            backend.store_submission(f"bench-{i}", make_submission(i, s, args.questions))
+    if snapshot:
+        backend.snapshot()
+        for n in range(args.tail):
+            backend.store_submission(f"bench-{n % size}", make_submission(n, -1, args.questions))
+    backend.close()
+    return sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+
+
+def recover(directory):
+    TESTS.clear()
+    SUBMISSIONS.clear()
+    started = time.perf_counter()
+    backend = DurableMemoryBackend(directory)
+    elapsed = time.perf_counter() - started
+    backend.close()
+    return elapsed
+
+
+def write_rate(directory, args):
+    TESTS.clear()
+    SUBMISSIONS.clear()
+    backend = DurableMemoryBackend(directory, snapshot_every=10 ** 9)
+    per_writer = args.writes // args.writers
+
+    def writer(w):
+        for n in range(per_writer):
+            backend.store_submission(f"bench-{w}", make_submission(w, n, args.questions))
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(args.writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stats = backend.stats()
+    backend.close()
+    return stats["walRecords"] / elapsed, stats["meanGroupCommit"]
+
+
+def main():
+    args = parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    print(f"questions/test={args.questions} submissions/test={args.submissions} tail={args.tail}")
+    print(f"{'tests':>8}{'records':>10}{'log MB':>9}{'log only s':>12}"
+          f"{'snap MB':>9}{'snap+tail s':>13}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in sizes:
+            log_dir = os.path.join(tmpdir, f"log-{size}")
+            snap_dir = os.path.join(tmpdir, f"snap-{size}")
+            log_bytes = populate(log_dir, size, args, snapshot=False)
+            snap_bytes = populate(snap_dir, size, args, snapshot=True)
+            log_only = recover(log_dir)
+            snap_tail = recover(snap_dir)
+            print(f"{size:>8}{size * (1 + args.submissions):>10}{log_bytes / 1e6:>9.1f}"
+                  f"{log_only:>12.3f}{snap_bytes / 1e6:>9.1f}{snap_tail:>13.3f}"
+                  f"{log_only / snap_tail:>8.1f}x")
+
+        rate, group = write_rate(os.path.join(tmpdir, "writes"), args)
+        print(f"\nfsync'ed writes from {args.writers} threads: {rate:.0f}/s "
+              f"(mean {group} records per fsync)")
+    TESTS.clear()
+    SUBMISSIONS.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Submission Memory Benchmark
+===========================
+Compares the memory held by one test's submissions stored as a list of
+dicts (the evaluate_exam shape) and as a columnar SubmissionTable
+(src.storage.submission_table), measured with tracemalloc. Each of
+``--students`` submissions answers ``--questions`` questions (parsed from
+a JSON request body, as the API receives them). Also times appending the
+rows and rebuilding every dict (what get_submissions does).
+
+Usage:
+    python benchmarks/bench_submission_memory.py
+    python benchmarks/bench_submission_memory.py --students 20000 --questions 50
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.submission_table import SubmissionTable
+
+OPTIONS = ["Stack", "Queue", "Linked list", "Binary tree", "Hash map"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--answered", type=float, default=0.9, help="fraction answered")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def submissions(args):
+    """Yield submissions as ExamService.evaluate_exam builds them"""
+    rng = random.Random(args.seed)
+    key = [rng.choice(OPTIONS) for _ in range(args.questions)]
+    for s in range(args.students):
+        body = json.dumps({
+            "studentName": f"Student {s}",
+            "answers": {
+                str(q): rng.choice(OPTIONS)
+                for q in range(args.questions) if rng.random() < args.answered
+            },
+        })
+        request = json.loads(body)
+        answers = {int(q): a for q, a in request["answers"].items()}
+        details = [
+            {"questionId": q, "studentAnswer": a, "correctAnswer": key[q],
+             "isCorrect": a.strip().lower() == key[q].strip().lower()}
+            for q, a in answers.items()
+        ]
+        correct = sum(d["isCorrect"] for d in details)
+        total = len(details)
+        yield {
+            "studentName": request["studentName"],
+            "answers": answers,
+            "correct": correct,
+            "wrong": total - correct,
+            "totalAttempted": total,
+            "scorePercentage": round(correct / total * 100 if total else 0.0, 2),
+            "resultsDetails": details,
+            "revision": 1,
+        }
+
+
+def measure(build):
+    """Build the store; return (it, bytes it holds, seconds)"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    store = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, held, elapsed
+
+
+def main():
+    args = parse_args()
+
+    rows, dict_bytes, _ = measure(lambda: list(submissions(args)))
+    table, table_bytes, _ = measure(
+        lambda: SubmissionTable.from_rows(submissions(args), width=args.questions)
+    )
+
+    # timings without tracemalloc's overhead
+    generated = list(submissions(args))
+    started = time.perf_counter()
+    SubmissionTable.from_rows(generated, width=args.questions)
+    append_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    rebuilt = list(table)
+    rebuild_seconds = time.perf_counter() - started
+    assert rebuilt == rows
+
+    print(f"students={args.students} questions={args.questions} answered={args.answered:.0%}")
+    print(f"{'storage':<14}{'bytes':>14}{'bytes/row':>12}")
+    print(f"{'list of dicts':<14}{dict_bytes:>14,}{dict_bytes / args.students:>12.0f}")
+    print(f"{'columnar':<14}{table_bytes:>14,}{table_bytes / args.students:>12.0f}")
+    print(f"reduction: {dict_bytes / table_bytes:.1f}x "
+          f"(table.nbytes() estimate: {table.nbytes():,})")
+    print(f"append: {args.students / append_seconds:,.0f} rows/s   "
+          f"rebuild dicts: {args.students / rebuild_seconds:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Shared test fixtures: an isolated ExamService factory and fake LLMs.
+
+Every test starts from fresh process-wide singletons (circuit breaker,
+question cache, question bank, LLM client registry and the routes'
+ExamService), with the question cache and bank files under the test's
+tmp_path, so results do not depend on which tests ran before.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import re
+import sys
+import time
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from langchain_core.messages import AIMessage
+
+from src.config.settings import settings
+from src.exams.exam_service import ExamService
+from src.generator import question_pool
+from src.llm import circuit_breaker, client_registry
+from src.llm.backends import StubChatModel
+from src.storage import question_bank, question_cache
+
+MCQ_JSON = json.dumps({
+    "question": "What is the capital of France?",
+    "options": ["London", "Berlin", "Paris", "Madrid"],
+    "correct_answer": "Paris",
+})
+
+BATCH_PROMPT = re.compile(r"Generate (\d+) distinct")
+
+
+def mcq(question, answer="a"):
+    return {"question": question, "options": ["a", "b", "c", "d"], "correct_answer": answer}
+
+
+def distinct_mcq(n):
+    """MCQ_JSON with its own question text, so it is not a near-duplicate"""
+    item = json.loads(MCQ_JSON)
+    item["question"] = f"Question {n}?"
+    return json.dumps(item)
+
+
+def batch_count(prompt):
+    """How many questions a batch prompt asks for, or None for a single question"""
+    match = BATCH_PROMPT.search(prompt)
+    return int(match.group(1)) if match else None
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    """Stands in for ChatGroq: every call sleeps ``delay`` then answers"""
+
+    def __init__(self, delay=0.1, outputs=None):
+        self.delay = delay
+        self.outputs = list(outputs or [])
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        return FakeResponse(self.outputs.pop(0) if self.outputs else distinct_mcq(self.calls))
+
+    def invoke(self, prompt):
+        time.sleep(self.delay)
+        return self._next()
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.delay)
+        return self._next()
+
+
+class DelayedLLM:
+    """
+    Unique valid MCQs (a JSON array for batch prompts): call i sleeps
+    ``delays[i]``, later calls ``delay``; with ``fail`` every call raises
+    once its delay is over
+    """
+
+    def __init__(self, delays=(), delay=0.0, fail=False):
+        self.delays = list(delays)
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+        self._ids = itertools.count()
+
+    def _mcq(self):
+        return mcq(f"Question number {next(self._ids)}?")
+
+    async def ainvoke(self, prompt):
+        delay = self.delays[self.calls] if self.calls < len(self.delays) else self.delay
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError("upstream error")
+
+        count = batch_count(prompt)
+        if count is None:
+            return FakeResponse(json.dumps(self._mcq()))
+        return FakeResponse(json.dumps([self._mcq() for _ in range(count)]))
+
+
+class FailingLLM:
+    """Every call fails as an unreachable provider would"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        raise RuntimeError("upstream error")
+
+    def invoke(self, prompt):
+        self.calls += 1
+        raise RuntimeError("upstream error")
+
+
+class ScriptedLLM:
+    """Returns the scripted raw responses in order, with token usage"""
+
+    model_name = "scripted"
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return AIMessage(
+            content=self.responses.pop(0),
+            usage_metadata={"input_tokens": 100, "output_tokens": 40, "total_tokens": 140},
+        )
+
+
+class ScriptedQuestionsLLM:
+    """Answers single prompts with ``questions`` in order, batches with one array"""
+
+    def __init__(self, questions):
+        self.questions = list(questions)
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        count = batch_count(prompt)
+        if count is None:
+            return FakeResponse(json.dumps(mcq(self.questions.pop(0))))
+        return FakeResponse(json.dumps([mcq(self.questions.pop(0)) for _ in range(count)]))
+
+
+@pytest.fixture(autouse=True)
+def fresh_singletons(monkeypatch, tmp_path):
+    """Start each test from new process-wide singletons, closed afterwards"""
+    monkeypatch.setattr(settings, "QUESTION_CACHE_PATH", str(tmp_path / "questions.sqlite3"))
+    monkeypatch.setattr(settings, "QUESTION_BANK_PATH", str(tmp_path / "question_bank.sqlite3"))
+    monkeypatch.setattr(circuit_breaker, "_breaker", None)
+    monkeypatch.setattr(question_cache, "_cache", None)
+    monkeypatch.setattr(question_bank, "_bank", None)
+    monkeypatch.setattr(question_pool, "_pool", None)
+    monkeypatch.setattr(client_registry, "_registry", None)
+
+    # the routes' service: on the fresh singletons, and whatever a test
+    # sets on it (its LLM, say) is undone afterwards
+    from src.routes import exam_routes
+
+    generator = exam_routes.exam_service.question_generator
+    monkeypatch.setattr(generator, "llm", generator.llm)
+    monkeypatch.setattr(generator, "cache", question_cache.get_question_cache())
+    monkeypatch.setattr(generator, "bank", question_bank.get_question_bank())
+    monkeypatch.setattr(generator, "breaker", circuit_breaker.get_circuit_breaker())
+    monkeypatch.setattr(exam_routes.exam_service, "question_pool", None)
+    yield
+    if client_registry._registry is not None:
+        client_registry._registry.close()
+
+
+@pytest.fixture
+def make_service():
+    """
+    Factory of ExamServices generating with ``llm`` (a StubChatModel by
+    default) and no pool; the cache, bank and breaker are only those given
+    """
+    def make(llm=None, cache=None, bank=None, breaker=None):
+        service = ExamService()
+        service.question_pool = None
+        generator = service.question_generator
+        generator.llm = llm if llm is not None else StubChatModel()
+        generator.cache = cache
+        generator.bank = bank
+        generator.breaker = breaker
+        return service
+
+    return make
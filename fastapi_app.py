@@ -23,6 +23,11 @@ load_dotenv()
 # Import routes
 from src.routes.exam_routes import router as exam_router
 from src.routes.health import router as health_router
+from src.routes.metrics_routes import router as metrics_router
+from src.generator.question_pool import get_question_pool
+from src.llm.client_registry import get_client_registry
+from src.storage.in_memory_store import get_storage_backend
+from src.common.executor import run_blocking
 
 # Configure logging
 logging.basicConfig(
@@ -81,6 +86,9 @@ app.include_router(health_router)
 # Exam management routes
 app.include_router(exam_router)
 
+# Generation pipeline metrics
+app.include_router(metrics_router)
+
 
 # ==================== STARTUP/SHUTDOWN EVENTS ====================
 
@@ -96,15 +104,32 @@ async def startup_event():
     logging.info("  - POST /api/exam/{testId}/submit (Submit answers)")
     logging.info("  - GET /api/exam/{testId}/results (View results)")
     logging.info("  - GET /health (Health check)")
+    logging.info("  - GET /api/metrics/pools (Question pool depth)")
     logging.info("  - GET /docs (Swagger UI)")
     logging.info("=" * 50)
 
+    # Start background refills of the hot-topic question pools
+    pool = get_question_pool()
+    if pool is not None:
+        await pool.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
     logging.info("Study Buddy AI - Exam System Shutting Down")
 
+    pool = get_question_pool()
+    if pool is not None:
+        await pool.stop()
+
+    # Release pooled keep-alive connections to the LLM provider
+    await get_client_registry().aclose()
+
+    # Drain pending storage writes (SQL group commit, WAL segment) and
+    # release connections; close() may block, so keep it off the loop
+    await run_blocking(get_storage_backend().close)
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,74 @@
+"""
+Request Deadlines
+=================
+A per-request time budget carried in a context variable, so it reaches
+QuestionGenerator's retry loops (and every task started for the
+request) without being threaded through each call.
+
+Deadlines are absolute ``time.monotonic()`` timestamps. Nested scopes
+keep the earliest deadline.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget is spent; no new LLM attempt is started"""
+
+
+def deadline_after(seconds: Optional[float]) -> Optional[float]:
+    """Absolute deadline ``seconds`` from now (None or <= 0: no deadline)"""
+    if not seconds or seconds <= 0:
+        return None
+    return time.monotonic() + seconds
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]):
+    """Apply an absolute deadline to the enclosed code"""
+    current = _deadline.get()
+    if current is not None and (deadline is None or current < deadline):
+        deadline = current
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    return _deadline.get()
+
+
+def seconds_until(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left before ``deadline``, None when there is none"""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the current deadline, None when there is none"""
+    return seconds_until(_deadline.get())
+
+
+def deadline_expired() -> bool:
+    remaining = time_remaining()
+    return remaining is not None and remaining <= 0
+
+
+def check_deadline() -> None:
+    """Raise DeadlineExceeded once the current deadline has passed"""
+    if deadline_expired():
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def capped_delay(delay: float) -> float:
+    """Shorten a backoff sleep so it never outlasts the current deadline"""
+    remaining = time_remaining()
+    return delay if remaining is None else min(delay, remaining)
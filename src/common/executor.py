@@ -0,0 +1,39 @@
+"""
+Blocking Executor
+=================
+Bounded thread pool for running sync-only work (e.g. an LLM client
+without a native ``ainvoke``) from async code without stalling the
+event loop.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from src.config.settings import settings
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor, creating it on first use"""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.BLOCKING_EXECUTOR_WORKERS),
+                    thread_name_prefix="blocking",
+                )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callable on the bounded executor and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_blocking_executor(), functools.partial(func, *args, **kwargs)
+    )
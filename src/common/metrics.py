@@ -0,0 +1,101 @@
+"""
+Metrics Module
+==============
+Minimal in-process latency histograms (no external metrics backend).
+
+Each histogram keeps cumulative bucket counts for export plus a
+sliding window of recent samples for percentile queries.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Optional, Sequence
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Thread-safe histogram of observed values (seconds by convention)"""
+
+    def __init__(
+        self,
+        name: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        window: int = 1024,
+    ):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            self._recent.append(value)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+            else:
+                self._counts[-1] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th percentile (0-100) over the recent window, None when empty"""
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self.count, self.sum
+
+        cumulative = {}
+        running = 0
+        for bound, n in zip(self.buckets, counts):
+            running += n
+            cumulative[f"le_{bound:g}"] = running
+        cumulative["le_inf"] = running + counts[-1]
+
+        def rounded(value):
+            return round(value, 4) if value is not None else None
+
+        return {
+            "count": count,
+            "sum": round(total, 4),
+            "mean": round(total / count, 4) if count else None,
+            "p50": rounded(self.percentile(50)),
+            "p95": rounded(self.percentile(95)),
+            "p99": rounded(self.percentile(99)),
+            "buckets": cumulative,
+        }
+
+
+_histograms: Dict[str, Histogram] = {}
+_lock = threading.Lock()
+
+
+def get_histogram(name: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    """Return the named process-wide histogram, creating it on first use"""
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _lock:
+            histogram = _histograms.get(name)
+            if histogram is None:
+                histogram = Histogram(name, buckets)
+                _histograms[name] = histogram
+    return histogram
+
+
+def export_histograms() -> Dict[str, Dict[str, object]]:
+    """Snapshot of every registered histogram, keyed by name"""
+    with _lock:
+        histograms = list(_histograms.values())
+    return {h.name: h.snapshot() for h in histograms}
@@ -13,5 +13,173 @@ class Settings():
 
     MAX_RETRIES = 3
 
+    # Chat model backend: groq, record, replay or stub (offline, deterministic)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+    LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", "cassettes/llm_cassette.jsonl")
+    # Sleep for the recorded latency when replaying
+    LLM_CASSETTE_REPLAY_LATENCY = os.getenv("LLM_CASSETTE_REPLAY_LATENCY", "false").lower() == "true"
+    LLM_STUB_LATENCY_SECONDS = float(os.getenv("LLM_STUB_LATENCY_SECONDS", "0.5"))
+    LLM_STUB_LATENCY_JITTER_SECONDS = float(os.getenv("LLM_STUB_LATENCY_JITTER_SECONDS", "0.1"))
+    LLM_STUB_FAILURE_RATE = float(os.getenv("LLM_STUB_FAILURE_RATE", "0"))
+    LLM_STUB_SEED = int(os.getenv("LLM_STUB_SEED", "0"))
+
+    # Pooled keep-alive HTTP connections shared by every Groq client
+    LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+    LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10"))
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    LLM_HTTP_TIMEOUT_SECONDS = float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "60"))
+
+    # Max number of question-generation LLM calls in flight per exam
+    GENERATION_CONCURRENCY = int(os.getenv("GENERATION_CONCURRENCY", "5"))
+
+    # Ask for several questions per LLM call (JSON array) instead of one
+    BATCH_GENERATION = os.getenv("BATCH_GENERATION", "false").lower() == "true"
+
+    # Max questions requested in a single batched call
+    BATCH_SIZE = int(os.getenv("BATCH_SIZE", "10"))
+
+    # Two-tier question cache (memory LRU + on-disk SQLite)
+    QUESTION_CACHE_ENABLED = os.getenv("QUESTION_CACHE_ENABLED", "false").lower() == "true"
+    QUESTION_CACHE_TTL_SECONDS = float(os.getenv("QUESTION_CACHE_TTL_SECONDS", "3600"))
+    QUESTION_CACHE_MAX_KEYS = int(os.getenv("QUESTION_CACHE_MAX_KEYS", "256"))
+    QUESTION_CACHE_MAX_PER_KEY = int(os.getenv("QUESTION_CACHE_MAX_PER_KEY", "50"))
+    # A key only serves hits once it holds this many distinct questions
+    QUESTION_CACHE_MIN_VARIETY = int(os.getenv("QUESTION_CACHE_MIN_VARIETY", "20"))
+    QUESTION_CACHE_PATH = os.getenv("QUESTION_CACHE_PATH", "cache/questions.sqlite3")
+
+    # Persistent question bank of every validated generated question,
+    # indexed by (topic, difficulty, type); source of bank/mixed exams
+    QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "false").lower() == "true"
+    QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", "cache/question_bank.sqlite3")
+    QUESTION_BANK_MAX_PER_KEY = int(os.getenv("QUESTION_BANK_MAX_PER_KEY", "2000"))
+    # Default create-test source: llm (pool, cache, LLM), bank (bank only)
+    # or mixed (bank first, LLM for the shortfall)
+    QUESTION_SOURCE = os.getenv("QUESTION_SOURCE", "llm").lower()
+
+    # Near-duplicate rejection of generated questions (against the exam
+    # and the bank): Jaccard similarity of word shingles (question and
+    # answer), found by MinHash LSH with NUM_PERM hashes cut into BANDS bands
+    NEAR_DUPLICATE_DETECTION = os.getenv("NEAR_DUPLICATE_DETECTION", "false").lower() == "true"
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.6"))
+    NEAR_DUPLICATE_NUM_PERM = int(os.getenv("NEAR_DUPLICATE_NUM_PERM", "128"))
+    NEAR_DUPLICATE_BANDS = int(os.getenv("NEAR_DUPLICATE_BANDS", "32"))
+
+    # Shared LLM scheduler: provider rate limits (defaults: Groq free tier)
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "6000"))
+    # Tokens assumed for a completion before the real usage is known
+    LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "600"))
+    # Adaptive (AIMD) concurrency bounds across the whole process
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+    # Calls slower than this count as congestion
+    LLM_LATENCY_TARGET_SECONDS = float(os.getenv("LLM_LATENCY_TARGET_SECONDS", "10"))
+    # Fraction of the concurrency background work (pool refills) may use
+    LLM_BACKGROUND_SHARE = float(os.getenv("LLM_BACKGROUND_SHARE", "0.5"))
+    LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+    LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "20"))
+
+    # Background question pools for hot topics (comma-separated lists)
+    POOL_HOT_TOPICS = [t.strip() for t in os.getenv("POOL_HOT_TOPICS", "").split(",") if t.strip()]
+    POOL_DIFFICULTIES = [d.strip() for d in os.getenv("POOL_DIFFICULTIES", "easy,medium,hard").split(",") if d.strip()]
+    POOL_QUESTION_TYPES = [t.strip() for t in os.getenv("POOL_QUESTION_TYPES", "mcq,fill_blank").split(",") if t.strip()]
+    POOL_TARGET_DEPTH = int(os.getenv("POOL_TARGET_DEPTH", "20"))
+    POOL_REFILL_INTERVAL_SECONDS = float(os.getenv("POOL_REFILL_INTERVAL_SECONDS", "30"))
+
+    # Where tests and submissions live: memory (per process, the default)
+    # or sql (shared by every replica and durable; any SQLAlchemy async
+    # URL, needs sqlalchemy plus a driver such as aiosqlite / asyncpg)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory").lower()
+    STORAGE_SQL_URL = os.getenv("STORAGE_SQL_URL", "sqlite+aiosqlite:///cache/exam_store.sqlite3")
+    STORAGE_SQL_POOL_SIZE = int(os.getenv("STORAGE_SQL_POOL_SIZE", "5"))
+    # Writes queued together are committed in one transaction (group
+    # commit); optionally linger this long for more before committing
+    STORAGE_WRITE_BATCH_SIZE = int(os.getenv("STORAGE_WRITE_BATCH_SIZE", "100"))
+    STORAGE_WRITE_LINGER_MS = float(os.getenv("STORAGE_WRITE_LINGER_MS", "0"))
+    # Optional durability for the memory backend: every mutation goes to
+    # a write-ahead log in STORAGE_WAL_DIR (group-committed fsync,
+    # lingering STORAGE_WAL_GROUP_COMMIT_MS), with a compacted snapshot
+    # every STORAGE_SNAPSHOT_EVERY mutations; restarts recover from them
+    STORAGE_WAL_ENABLED = os.getenv("STORAGE_WAL_ENABLED", "false").lower() == "true"
+    STORAGE_WAL_DIR = os.getenv("STORAGE_WAL_DIR", "cache/store_wal")
+    STORAGE_WAL_FSYNC = os.getenv("STORAGE_WAL_FSYNC", "true").lower() == "true"
+    STORAGE_WAL_GROUP_COMMIT_MS = float(os.getenv("STORAGE_WAL_GROUP_COMMIT_MS", "0"))
+    STORAGE_SNAPSHOT_EVERY = int(os.getenv("STORAGE_SNAPSHOT_EVERY", "10000"))
+    # Bounds for the memory backend (0 = unbounded): tests idle this long
+    # are dropped; over the budget the least recently active tests are
+    # evicted, to STORAGE_SPILL_DIR (loaded back on access) when it is set
+    STORAGE_TEST_TTL_SECONDS = float(os.getenv("STORAGE_TEST_TTL_SECONDS", "0"))
+    STORAGE_MEMORY_BUDGET_MB = float(os.getenv("STORAGE_MEMORY_BUDGET_MB", "0"))
+    STORAGE_SPILL_DIR = os.getenv("STORAGE_SPILL_DIR", "")
+
+    # Student exam view (GET /api/exam/{id}) rendered to JSON bytes once
+    # per saved test revision and served with an ETag (304 on a match)
+    STUDENT_VIEW_CACHE_ENABLED = os.getenv("STUDENT_VIEW_CACHE_ENABLED", "true").lower() == "true"
+    STUDENT_VIEW_CACHE_MAX_ENTRIES = int(os.getenv("STUDENT_VIEW_CACHE_MAX_ENTRIES", "10000"))
+
+    # Default time budget for creating a test; partial results after that (0: none)
+    CREATE_TEST_DEADLINE_SECONDS = float(os.getenv("CREATE_TEST_DEADLINE_SECONDS", "0"))
+
+    # Admission control in front of create-test: at most
+    # ADMISSION_MAX_CONCURRENCY generations overall and
+    # ADMISSION_TENANT_MAX_CONCURRENCY per teacher (X-Teacher-Id header,
+    # else client address); the rest wait in a bounded queue served by
+    # weighted round-robin across teachers ("teacher:weight,..."), and
+    # get 429 + Retry-After when it is full or they wait too long
+    ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "false").lower() == "true"
+    ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "8"))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+    ADMISSION_TENANT_MAX_CONCURRENCY = int(os.getenv("ADMISSION_TENANT_MAX_CONCURRENCY", "2"))
+    ADMISSION_TENANT_MAX_QUEUE = int(os.getenv("ADMISSION_TENANT_MAX_QUEUE", "16"))
+    ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "30"))
+    ADMISSION_TENANT_WEIGHTS = os.getenv("ADMISSION_TENANT_WEIGHTS", "")
+
+    # Default for create-test's per-request ``coalesce`` flag: identical
+    # concurrent requests share one generation, each gets its own test ID
+    COALESCE_CREATE_TEST = os.getenv("COALESCE_CREATE_TEST", "false").lower() == "true"
+
+    # Opt-in tail-latency mode: over-provision N+k questions, hedge slow units
+    HEDGED_GENERATION = os.getenv("HEDGED_GENERATION", "false").lower() == "true"
+    HEDGE_OVERPROVISION_RATIO = float(os.getenv("HEDGE_OVERPROVISION_RATIO", "0.2"))
+    HEDGE_MAX_EXTRA_QUESTIONS = int(os.getenv("HEDGE_MAX_EXTRA_QUESTIONS", "3"))
+    # Hedge a unit running past this percentile of learned unit latency
+    HEDGE_LATENCY_PERCENTILE = float(os.getenv("HEDGE_LATENCY_PERCENTILE", "95"))
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    HEDGE_MAX_PER_EXAM = int(os.getenv("HEDGE_MAX_PER_EXAM", "2"))
+    # Hedges may use at most this share of primary units (plus a small burst)
+    HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))
+    HEDGE_BUDGET_BURST = float(os.getenv("HEDGE_BUDGET_BURST", "5"))
+
+    # Latency-aware routing between several Groq models (comma separated,
+    # smallest/fastest first, largest last). Interactive calls go to the
+    # fastest healthy model, background pool refills to the largest one.
+    # A single model (the default) disables routing.
+    LLM_MODELS = [m.strip() for m in os.getenv("LLM_MODELS", "").split(",") if m.strip()]
+    # A model is taken out of rotation for MODEL_ROUTER_COOLDOWN_SECONDS when
+    # its smoothed latency exceeds LLM_LATENCY_TARGET_SECONDS, one call takes
+    # MODEL_ROUTER_SPIKE_FACTOR times the target, or at least
+    # MODEL_ROUTER_FAILURE_RATE of its last MODEL_ROUTER_WINDOW calls failed
+    # validation (after MODEL_ROUTER_MIN_SAMPLES calls)
+    MODEL_ROUTER_SPIKE_FACTOR = float(os.getenv("MODEL_ROUTER_SPIKE_FACTOR", "2"))
+    MODEL_ROUTER_FAILURE_RATE = float(os.getenv("MODEL_ROUTER_FAILURE_RATE", "0.5"))
+    MODEL_ROUTER_WINDOW = int(os.getenv("MODEL_ROUTER_WINDOW", "20"))
+    MODEL_ROUTER_MIN_SAMPLES = int(os.getenv("MODEL_ROUTER_MIN_SAMPLES", "5"))
+    MODEL_ROUTER_MAX_CALL_ERRORS = int(os.getenv("MODEL_ROUTER_MAX_CALL_ERRORS", "3"))
+    MODEL_ROUTER_COOLDOWN_SECONDS = float(os.getenv("MODEL_ROUTER_COOLDOWN_SECONDS", "60"))
+
+    # Circuit breaker around LLM calls: CIRCUIT_FAILURE_THRESHOLD consecutive
+    # failed calls open it for CIRCUIT_OPEN_SECONDS, then up to
+    # CIRCUIT_HALF_OPEN_MAX_CALLS probe calls decide whether it closes
+    CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+    CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_MAX_CALLS", "1"))
+
+    # Per-exam LLM usage roll-ups kept for GET /api/metrics/exams/{test_id}
+    LLM_USAGE_MAX_EXAMS = int(os.getenv("LLM_USAGE_MAX_EXAMS", "1000"))
+
+    # Worker threads for sync-only calls made from async code
+    BLOCKING_EXECUTOR_WORKERS = int(os.getenv("BLOCKING_EXECUTOR_WORKERS", "8"))
+
 
 settings = Settings()  
\ No newline at end of file
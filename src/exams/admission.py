@@ -0,0 +1,273 @@
+"""
+Admission Control
+=================
+Fair queuing in front of exam generation, so one teacher bulk-creating
+exams cannot starve everyone else of LLM capacity.
+
+- At most ``max_concurrency`` generations run at once, and at most
+  ``tenant_max_concurrency`` per tenant (teacher)
+- Requests beyond that wait in a bounded queue, one FIFO per tenant;
+  freed slots go to the waiting tenants by smooth weighted round-robin
+  (weights per tenant, default 1)
+- A full queue (overall or for the tenant), or a wait longer than
+  ``max_wait``, is refused with AdmissionRejected carrying a Retry-After
+  estimate; the route turns it into 429
+
+Queue depth, in-flight counts and rejections are reported by ``stats()``
+and wait times go to the ``admission_wait_seconds`` histogram.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.common.metrics import get_histogram
+
+logger = get_logger(__name__)
+
+WAIT_HISTOGRAM = "admission_wait_seconds"
+EWMA_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """The request was not admitted; retry after ``retry_after`` seconds"""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Too many exam generation requests ({reason})")
+
+
+def parse_weights(spec: str) -> Dict[str, int]:
+    """``"alice:3,bob:2"`` -> ``{"alice": 3, "bob": 2}``"""
+    weights = {}
+    for item in spec.split(","):
+        tenant, _, weight = item.strip().rpartition(":")
+        if tenant and weight.strip().isdigit():
+            weights[tenant.strip()] = max(1, int(weight))
+    return weights
+
+
+class AdmissionController:
+    """Bounded, per-tenant weighted-fair admission of generation requests"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue: int = 64,
+        tenant_max_concurrency: int = 2,
+        tenant_max_queue: int = 16,
+        max_wait: float = 30.0,
+        weights: Optional[Dict[str, int]] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.tenant_max_concurrency = max(1, tenant_max_concurrency)
+        self.tenant_max_queue = max(0, tenant_max_queue)
+        self.max_wait = max_wait
+        self.weights = weights or {}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._tenant_in_flight: Dict[str, int] = {}
+        self._queues: Dict[str, Deque[Tuple[asyncio.Future, asyncio.AbstractEventLoop]]] = {}
+        self._queued = 0
+        # smooth weighted round-robin state
+        self._current: Dict[str, int] = defaultdict(int)
+        self._service_ewma: Optional[float] = None
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected: Dict[str, int] = defaultdict(int)
+
+    def _weight(self, tenant: str) -> int:
+        return self.weights.get(tenant, 1)
+
+    def _has_capacity(self, tenant: str) -> bool:
+        return (
+            self._in_flight < self.max_concurrency
+            and self._tenant_in_flight.get(tenant, 0) < self.tenant_max_concurrency
+        )
+
+    def _grant(self, tenant: str) -> None:
+        self._in_flight += 1
+        self._tenant_in_flight[tenant] = self._tenant_in_flight.get(tenant, 0) + 1
+        self.admitted += 1
+
+    def _retry_after(self) -> float:
+        service = self._service_ewma or 1.0
+        rounds = math.ceil((self._queued + 1) / self.max_concurrency)
+        return min(60.0, max(1.0, service * rounds))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected[reason] += 1
+        return AdmissionRejected(reason, self._retry_after())
+
+    def _next_tenant(self) -> Optional[str]:
+        """Weighted round-robin pick among tenants that can run now"""
+        eligible = [
+            t for t, queue in self._queues.items()
+            if queue and self._tenant_in_flight.get(t, 0) < self.tenant_max_concurrency
+        ]
+        if not eligible or self._in_flight >= self.max_concurrency:
+            return None
+        total = 0
+        for tenant in eligible:
+            self._current[tenant] += self._weight(tenant)
+            total += self._weight(tenant)
+        chosen = max(eligible, key=lambda t: self._current[t])
+        self._current[chosen] -= total
+        return chosen
+
+    def _dispatch(self) -> None:
+        # called with the lock held: hand freed slots to waiting tenants
+        while True:
+            tenant = self._next_tenant()
+            if tenant is None:
+                return
+            future, loop = self._queues[tenant][0]
+            self._unqueue(tenant, future)
+            self._grant(tenant)
+            try:
+                loop.call_soon_threadsafe(self._wake, future, tenant)
+            except RuntimeError:
+                # the waiter's event loop is gone
+                self._ungrant(tenant)
+
+    def _unqueue(self, tenant: str, future: asyncio.Future) -> None:
+        queue = self._queues.get(tenant)
+        if queue is None:
+            return
+        for waiter in queue:
+            if waiter[0] is future:
+                queue.remove(waiter)
+                self._queued -= 1
+                break
+        if not queue:
+            del self._queues[tenant]
+            self._current.pop(tenant, None)
+
+    def _wake(self, future: asyncio.Future, tenant: str) -> None:
+        if future.done():
+            # the waiter went away after being granted a slot: give it back
+            self.release(tenant)
+        else:
+            future.set_result(True)
+
+    async def acquire(self, tenant: str) -> None:
+        """Wait for a generation slot for ``tenant`` or raise AdmissionRejected"""
+        started = time.perf_counter()
+        with self._lock:
+            queue = self._queues.get(tenant)
+            if not queue and self._has_capacity(tenant):
+                self._grant(tenant)
+                get_histogram(WAIT_HISTOGRAM).observe(0.0)
+                return
+            if self._queued >= self.max_queue:
+                raise self._reject("queue_full")
+            if queue is not None and len(queue) >= self.tenant_max_queue:
+                raise self._reject("tenant_queue_full")
+
+            future = asyncio.get_running_loop().create_future()
+            self._queues.setdefault(tenant, deque()).append(
+                (future, asyncio.get_running_loop())
+            )
+            self._queued += 1
+            self.queued_total += 1
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                self._unqueue(tenant, future)
+                granted = future.done() and not future.cancelled()
+                # a slot granted but not yet delivered is returned by _wake
+                future.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                if granted:
+                    self.release(tenant)
+                raise
+            if not granted:
+                with self._lock:
+                    raise self._reject("wait_timeout")
+
+        get_histogram(WAIT_HISTOGRAM).observe(time.perf_counter() - started)
+
+    def _ungrant(self, tenant: str) -> None:
+        self._in_flight -= 1
+        self._tenant_in_flight[tenant] -= 1
+        if self._tenant_in_flight[tenant] <= 0:
+            del self._tenant_in_flight[tenant]
+
+    def release(self, tenant: str, service_seconds: Optional[float] = None) -> None:
+        """Give back the slot of a finished generation"""
+        with self._lock:
+            self._ungrant(tenant)
+            if service_seconds is not None:
+                if self._service_ewma is None:
+                    self._service_ewma = service_seconds
+                else:
+                    self._service_ewma += EWMA_ALPHA * (service_seconds - self._service_ewma)
+            self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, tenant: str):
+        """Hold a generation slot for ``tenant`` for the enclosed block"""
+        await self.acquire(tenant)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(tenant, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tenants = set(self._queues) | set(self._tenant_in_flight)
+            return {
+                "inFlight": self._in_flight,
+                "maxConcurrency": self.max_concurrency,
+                "queueDepth": self._queued,
+                "maxQueue": self.max_queue,
+                "tenants": {
+                    t: {
+                        "inFlight": self._tenant_in_flight.get(t, 0),
+                        "queued": len(self._queues.get(t, ())),
+                        "weight": self._weight(t),
+                    }
+                    for t in sorted(tenants)
+                },
+                "admitted": self.admitted,
+                "queuedTotal": self.queued_total,
+                "rejected": dict(self.rejected),
+                "serviceSecondsEwma": (
+                    round(self._service_ewma, 3) if self._service_ewma is not None else None
+                ),
+                "retryAfterSeconds": round(self._retry_after(), 3),
+            }
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Return the process-wide admission controller (None when disabled)"""
+    global _controller
+    if not settings.ADMISSION_CONTROL_ENABLED:
+        return None
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(
+                    max_concurrency=settings.ADMISSION_MAX_CONCURRENCY,
+                    max_queue=settings.ADMISSION_MAX_QUEUE,
+                    tenant_max_concurrency=settings.ADMISSION_TENANT_MAX_CONCURRENCY,
+                    tenant_max_queue=settings.ADMISSION_TENANT_MAX_QUEUE,
+                    max_wait=settings.ADMISSION_MAX_WAIT_SECONDS,
+                    weights=parse_weights(settings.ADMISSION_TENANT_WEIGHTS),
+                )
+    return _controller
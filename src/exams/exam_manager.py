@@ -6,8 +6,14 @@ Handles core exam operations: ID generation, test storage, retrieval.
 
 import uuid
 from typing import Optional, Dict, Any
-from src.storage.in_memory_store import store_test, get_test, test_exists
+from src.storage.in_memory_store import (
+    get_storage_backend,
+    get_test,
+    store_test,
+    test_exists,
+)
 from src.common.logger import get_logger
+from src.exams.student_view import get_student_view_cache
 
 logger = get_logger(__name__)
 
@@ -22,9 +28,21 @@ class ExamManager:
 
     @staticmethod
     def save_test(test_id: str, test_data: Dict[str, Any]) -> None:
-        """Save test to in-memory storage"""
+        """Save test to storage"""
         try:
             store_test(test_id, test_data)
+            get_student_view_cache().render(test_id, test_data)
+            logger.info(f"Test saved with ID: {test_id}")
+        except Exception as e:
+            logger.error(f"Error saving test: {str(e)}")
+            raise
+
+    @staticmethod
+    async def asave_test(test_id: str, test_data: Dict[str, Any]) -> None:
+        """Save test from async code without blocking on the storage backend"""
+        try:
+            await get_storage_backend().astore_test(test_id, test_data)
+            get_student_view_cache().render(test_id, test_data)
             logger.info(f"Test saved with ID: {test_id}")
         except Exception as e:
             logger.error(f"Error saving test: {str(e)}")
@@ -40,6 +58,16 @@ class ExamManager:
             logger.warning(f"Test not found: {test_id}")
         return test
 
+    @staticmethod
+    async def aget_test(test_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve test by ID from async code"""
+        test = await get_storage_backend().aget_test(test_id)
+        if test:
+            logger.info(f"Test retrieved: {test_id}")
+        else:
+            logger.warning(f"Test not found: {test_id}")
+        return test
+
     @staticmethod
     def test_exists(test_id: str) -> bool:
         """Check if test exists"""
@@ -2,115 +2,934 @@
 Exam Service Module
 ===================
 High-level business logic for exam operations:
-- Create exams with AI-generated questions
+- Create exams with AI-generated questions (generated concurrently)
 - Evaluate student answers
 - Calculate scores
 """
 
-from typing import Dict, List, Any, Optional
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from src.config.settings import settings
 from src.generator.question_generator import QuestionGenerator
+from src.generator.question_pool import get_question_pool
 from src.exams.exam_manager import ExamManager
+from src.exams.student_view import RenderedView, get_student_view_cache, student_view
 from src.storage.in_memory_store import store_submission, get_submissions
 from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
+from src.common.metrics import get_histogram
+from src.llm.usage import UsageCollector, get_usage_ledger, track_llm_usage
+from src.llm.circuit_breaker import CircuitOpenError
+from src.generator.hedging import (
+    get_hedge_budget,
+    hedge_delay,
+    observe_unit_latency,
+    overprovision_count,
+)
+from src.storage.question_cache import normalize_topic, question_fingerprint
+from src.storage.near_duplicates import exam_dedup_scope, new_exam_index
+from src.common.deadline import (
+    deadline_after,
+    deadline_scope,
+    seconds_until,
+    time_remaining,
+)
 
 logger = get_logger(__name__)
 
+TTFQ_HISTOGRAM = "create_test_time_to_first_question_seconds"
+
+QUESTION_SOURCES = ("llm", "bank", "mixed")
+
 
 class ExamService:
     """Service for exam operations"""
 
     def __init__(self):
         self.question_generator = QuestionGenerator()
+        self.question_pool = get_question_pool()
         self.exam_manager = ExamManager()
+        # single-flight create-test generations by (loop, request key)
+        self._inflight: Dict[Tuple, "asyncio.Future"] = {}
+        self.coalesced_requests = 0
 
     def create_exam(
         self,
         topic: str,
         difficulty: str,
         num_questions: int,
-        question_type: str = "mcq"
+        question_type: str = "mcq",
+        batch: Optional[bool] = None,
+        hedged: Optional[bool] = None,
+        deadline_seconds: Optional[float] = None,
+        coalesce: Optional[bool] = None,
+        source: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create a new exam with AI-generated questions
 
+        Synchronous wrapper around acreate_exam for scripts and other
+        callers without an event loop.
+
         Args:
             topic: Subject topic
             difficulty: Easy, Medium, or Hard
             num_questions: Number of questions to generate
             question_type: 'mcq' or 'fill_blank'
+            batch: Use batched prompts (default: BATCH_GENERATION setting)
+            hedged: Tail-latency mode (default: HEDGED_GENERATION setting)
+            deadline_seconds: Time budget (default: CREATE_TEST_DEADLINE_SECONDS)
+            coalesce: Share identical in-flight generations (default:
+                COALESCE_CREATE_TEST setting)
+            source: 'llm', 'bank' or 'mixed' (default: QUESTION_SOURCE setting)
 
         Returns:
             Dictionary with testId and test details
         """
+        return self._run_sync(
+            self.acreate_exam(
+                topic, difficulty, num_questions, question_type, batch, hedged,
+                deadline_seconds, coalesce, source
+            )
+        )
+
+    async def acreate_exam(
+        self,
+        topic: str,
+        difficulty: str,
+        num_questions: int,
+        question_type: str = "mcq",
+        batch: Optional[bool] = None,
+        hedged: Optional[bool] = None,
+        deadline_seconds: Optional[float] = None,
+        coalesce: Optional[bool] = None,
+        source: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a new exam with AI-generated questions without blocking
+        the event loop
+
+        Args:
+            topic: Subject topic
+            difficulty: Easy, Medium, or Hard
+            num_questions: Number of questions to generate
+            question_type: 'mcq' or 'fill_blank'
+            batch: Use batched prompts (default: BATCH_GENERATION setting)
+            hedged: Over-provision and hedge slow calls, see
+                _agenerate_hedged (default: HEDGED_GENERATION setting)
+            deadline_seconds: Time budget for generation (default:
+                CREATE_TEST_DEADLINE_SECONDS). Once spent, no new LLM
+                attempt starts, calls in flight are cancelled and the
+                exam keeps the questions collected so far.
+            coalesce: Join an identical (topic, difficulty, count, type)
+                generation already in flight instead of starting another;
+                the exam gets the same questions under its own test ID,
+                within the first request's deadline (default:
+                COALESCE_CREATE_TEST setting)
+            source: Where questions come from (default: QUESTION_SOURCE
+                setting): 'llm' (pool, cache, then the LLM), 'bank'
+                (question bank only, no LLM call) or 'mixed' (question
+                bank first, the LLM only for the shortfall)
+
+        Returns:
+            Dictionary with testId and test details; ``partial`` and
+            ``missing`` report a shortfall against num_questions,
+            ``degraded`` that previously generated questions were served
+            because the LLM circuit breaker was open, and ``coalesced``
+            that the questions came from another request's generation;
+            ``sources`` counts questions per origin
+
+        Raises:
+            CircuitOpenError: the circuit is open and no previously
+                generated question is available
+        """
         try:
-            # Normalize difficulty
-            difficulty = difficulty.lower()
-            if difficulty not in ["easy", "medium", "hard"]:
-                difficulty = "medium"
+            difficulty = self._normalize_difficulty(difficulty)
 
             logger.info(
                 f"Creating exam: topic={topic}, difficulty={difficulty}, "
                 f"questions={num_questions}, type={question_type}"
             )
 
-                # Generate questions, retrying individual failures without aborting
-            questions = []
-            for i in range(num_questions):
-                try:
-                    if question_type.lower() == "fill_blank":
-                        question = self.question_generator.generate_fill_blank(
-                            topic, difficulty
-                        )
-                    else:
-                        question = self.question_generator.generate_mcq(
-                            topic, difficulty
+            if batch is None:
+                batch = settings.BATCH_GENERATION
+            if hedged is None:
+                hedged = settings.HEDGED_GENERATION
+            if deadline_seconds is None:
+                deadline_seconds = settings.CREATE_TEST_DEADLINE_SECONDS
+            if coalesce is None:
+                coalesce = settings.COALESCE_CREATE_TEST
+            source = (source or settings.QUESTION_SOURCE).lower()
+            if source not in QUESTION_SOURCES:
+                raise CustomException(
+                    f"Invalid question source: {source}",
+                    ValueError(f"Expected one of {', '.join(QUESTION_SOURCES)}")
+                )
+            deadline = deadline_after(deadline_seconds)
+
+            def collect() -> Awaitable[Dict[str, Any]]:
+                return self._agenerate_exam_questions(
+                    topic, difficulty, num_questions, question_type, batch, hedged,
+                    deadline, source
+                )
+
+            coalesced = False
+            if coalesce:
+                key = (
+                    normalize_topic(topic), difficulty, num_questions,
+                    question_type.lower(), batch, hedged, source
+                )
+                generation, coalesced = await self._acoalesce(key, collect)
+            else:
+                generation = await collect()
+
+            # every caller gets its own copies and its own test ID
+            questions = [dict(q) for q in generation["questions"]]
+            usage = generation["usage"]
+
+            result = await self._asave_exam(topic, difficulty, question_type, questions)
+            result["partial"] = len(questions) < num_questions
+            result["missing"] = num_questions - len(questions)
+            result["degraded"] = generation["degraded"]
+            result["coalesced"] = coalesced
+            result["sources"] = generation["sources"]
+            result["generationTime"] = generation["generationTime"]
+            # the request that ran the generation accounts for its tokens
+            result["llmUsage"] = get_usage_ledger().store(
+                result["testId"], usage, coalesced=coalesced
+            )
+            return result
+
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error(f"Error creating exam: {str(e)}")
+            raise CustomException("Failed to create exam", e)
+
+    async def _agenerate_exam_questions(
+        self,
+        topic: str,
+        difficulty: str,
+        num_questions: int,
+        question_type: str,
+        batch: bool,
+        hedged: bool,
+        deadline: Optional[float],
+        source: str = "llm"
+    ) -> Dict[str, Any]:
+        """
+        Collect the questions of one exam: question bank first (bank and
+        mixed sources), then the pool and the LLM (llm and mixed), then
+        (circuit open) previously generated questions
+
+        Returns:
+            Dictionary with questions, generationTime, degraded, sources
+            and the usage collector of the LLM calls made
+        """
+        # fingerprints already used in this exam, so cached picks don't
+        # repeat; near-duplicates of its questions are rejected on generation
+        exclude = set()
+        dedup = new_exam_index()
+
+        banked = []
+        bank = self.question_generator.bank
+        if bank is not None:
+            # read the key from disk off the event loop
+            await bank.aload(topic, difficulty, self._cache_type(question_type))
+        if source in ("bank", "mixed") and bank is not None:
+            banked = bank.sample(
+                topic, difficulty, self._cache_type(question_type), num_questions, exclude
+            )
+            logger.info(f"Drew {len(banked)}/{num_questions} questions from the bank")
+
+        # Hot topics are served from the pre-warmed pool first
+        pooled = []
+        if source != "bank" and self.question_pool is not None:
+            pooled = self.question_pool.draw(
+                topic, difficulty, question_type, num_questions - len(banked), exclude
+            )
+            logger.info(f"Drew {len(pooled)}/{num_questions} questions from pool")
+        if dedup is not None:
+            dedup.add_questions(banked + pooled)
+
+        # Generate the rest concurrently; failed slots are skipped
+        usage = UsageCollector()
+        generated, generation_time = [], {}
+        missing = num_questions - len(banked) - len(pooled)
+        if source != "bank" and missing > 0 and not self._circuit_open():
+            generate = self._agenerate_hedged if hedged else self._agenerate_questions
+            with track_llm_usage(usage), deadline_scope(deadline), exam_dedup_scope(dedup):
+                generated, generation_time = await generate(
+                    topic, difficulty, missing, question_type, batch, exclude
+                )
+        questions = banked + pooled + generated
+
+        # Circuit open (before or during generation): top up with
+        # previously generated questions instead of calling the LLM
+        fallback = []
+        if len(questions) < num_questions and self._circuit_open():
+            fallback = await self._afallback_questions(
+                topic, difficulty, question_type, num_questions - len(questions), exclude
+            )
+            logger.warning(
+                f"LLM circuit open: served {len(fallback)} previously generated questions"
+            )
+            questions += fallback
+
+        if len(questions) == 0:
+            if self._circuit_open():
+                raise CircuitOpenError(self.question_generator.breaker.retry_after())
+            if source == "bank":
+                raise CustomException(
+                    "No banked questions for this topic",
+                    Exception("Question bank is empty for this key")
+                )
+            raise CustomException(
+                "Failed to generate any questions",
+                Exception("No questions generated")
+            )
+
+        return {
+            "questions": questions,
+            "generationTime": generation_time,
+            "degraded": bool(fallback),
+            "sources": {
+                "bank": len(banked),
+                "pool": len(pooled),
+                "llm": len(generated),
+                "fallback": len(fallback)
+            },
+            "usage": usage
+        }
+
+    async def _acoalesce(
+        self,
+        key: Tuple,
+        generate: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Single-flight: share one in-flight generation between identical
+        concurrent requests on this event loop
+
+        The generation runs as its own task, so a caller going away does
+        not cancel it for the others.
+
+        Returns:
+            Tuple of (generation result, whether an in-flight generation
+            was joined)
+        """
+        key = (id(asyncio.get_running_loop()),) + key
+        task = self._inflight.get(key)
+        joined = task is not None
+        if task is None:
+            task = asyncio.ensure_future(generate())
+            self._inflight[key] = task
+
+            def forget(done: "asyncio.Task") -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+                if not done.cancelled():
+                    done.exception()  # retrieved even if every caller left
+
+            task.add_done_callback(forget)
+        else:
+            self.coalesced_requests += 1
+            logger.info("Joined an identical in-flight exam generation")
+        return await asyncio.shield(task), joined
+
+    def _circuit_open(self) -> bool:
+        breaker = self.question_generator.breaker
+        return breaker is not None and breaker.is_open()
+
+    def _fallback_questions(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        count: int,
+        exclude: Set[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Previously generated and validated questions for this key, served
+        while the LLM circuit is open: the question bank first, then
+        whatever the question cache holds, regardless of
+        QUESTION_CACHE_MIN_VARIETY
+        """
+        cache_type = self._cache_type(question_type)
+        questions = []
+        bank = self.question_generator.bank
+        if bank is not None and count > 0:
+            questions += bank.sample(topic, difficulty, cache_type, count, exclude)
+        cache = self.question_generator.cache
+        if cache is not None and count > len(questions):
+            questions += cache.get_many(
+                topic, difficulty, cache_type, count - len(questions), exclude, min_variety=1
+            )
+        return questions
+
+    async def _afallback_questions(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        count: int,
+        exclude: Set[str]
+    ) -> List[Dict[str, Any]]:
+        """``_fallback_questions`` with the bank and cache keys loaded off the event loop"""
+        cache_type = self._cache_type(question_type)
+        bank = self.question_generator.bank
+        if bank is not None:
+            await bank.aload(topic, difficulty, cache_type)
+        cache = self.question_generator.cache
+        if cache is not None:
+            await cache.aload(topic, difficulty, cache_type)
+        return self._fallback_questions(topic, difficulty, question_type, count, exclude)
+
+    @staticmethod
+    def _cache_type(question_type: str) -> str:
+        return "fill_blank" if question_type.lower() == "fill_blank" else "mcq"
+
+    @staticmethod
+    def _normalize_difficulty(difficulty: str) -> str:
+        """Lower-case the difficulty, falling back to medium"""
+        difficulty = difficulty.lower()
+        if difficulty not in ["easy", "medium", "hard"]:
+            difficulty = "medium"
+        return difficulty
+
+    async def _asave_exam(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        questions: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Store generated questions as a new test and return its summary"""
+        # Create test ID
+        test_id = self.exam_manager.generate_test_id()
+
+        # Store test data
+        test_data = {
+            "testId": test_id,
+            "topic": topic,
+            "difficulty": difficulty,
+            "questionType": question_type,
+            "totalQuestions": len(questions),
+            "questions": questions,
+            "revision": 1
+        }
+
+        await self.exam_manager.asave_test(test_id, test_data)
+
+        logger.info(f"Exam created successfully: {test_id}")
+
+        return {
+            "testId": test_id,
+            "totalQuestions": len(questions),
+            "testLink": f"/exam/{test_id}"
+        }
+
+    async def astream_exam(
+        self,
+        topic: str,
+        difficulty: str,
+        num_questions: int,
+        question_type: str = "mcq",
+        deadline_seconds: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Create a new exam, yielding each question as soon as it is validated
+
+        Yields ``{"event": "question", "index", "question"}`` events, then a
+        final ``{"event": "summary", "testId", ...}`` event, or an
+        ``{"event": "error", "detail"}`` event when nothing was generated.
+        Time-to-first-question is recorded in the
+        ``create_test_time_to_first_question_seconds`` histogram; LLM
+        usage is rolled up under the test ID as in acreate_exam, and
+        ``deadline_seconds`` bounds generation the same way.
+        """
+        started = time.perf_counter()
+        if deadline_seconds is None:
+            deadline_seconds = settings.CREATE_TEST_DEADLINE_SECONDS
+        deadline = deadline_after(deadline_seconds)
+        difficulty = self._normalize_difficulty(difficulty)
+        exclude = set()
+        questions = []
+        first_question_at = None
+        usage = UsageCollector()
+
+        logger.info(
+            f"Streaming exam: topic={topic}, difficulty={difficulty}, "
+            f"questions={num_questions}, type={question_type}"
+        )
+
+        def question_event(question: Dict[str, Any]) -> Dict[str, Any]:
+            nonlocal first_question_at
+            if first_question_at is None:
+                first_question_at = time.perf_counter() - started
+                get_histogram(TTFQ_HISTOGRAM).observe(first_question_at)
+            questions.append(question)
+            return {
+                "event": "question",
+                "index": len(questions) - 1,
+                "question": question
+            }
+
+        if self.question_pool is not None:
+            for question in self.question_pool.draw(
+                topic, difficulty, question_type, num_questions, exclude
+            ):
+                yield question_event(question)
+
+        remaining = num_questions - len(questions)
+        if remaining > 0 and not self._circuit_open():
+            dedup = new_exam_index(questions)
+            size = max(1, settings.BATCH_SIZE)
+            semaphore = asyncio.Semaphore(max(1, settings.GENERATION_CONCURRENCY))
+            queue: asyncio.Queue = asyncio.Queue()
+
+            async def pump(count: int) -> None:
+                async with semaphore:
+                    try:
+                        with track_llm_usage(usage), deadline_scope(deadline):
+                            async for question in self.question_generator.astream_batch(
+                                question_type, topic, difficulty, count, exclude
+                            ):
+                                await queue.put(question.dict())
+                    except Exception as e:
+                        logger.error(f"Streaming generation failed: {str(e)}")
+                    finally:
+                        # end-of-unit marker
+                        await queue.put(None)
+
+            # the pumps inherit the exam's near-duplicate index with the context
+            with exam_dedup_scope(dedup):
+                tasks = [
+                    asyncio.create_task(pump(min(size, remaining - start)))
+                    for start in range(0, remaining, size)
+                ]
+            try:
+                finished = 0
+                while finished < len(tasks):
+                    try:
+                        question = await asyncio.wait_for(
+                            queue.get(), seconds_until(deadline)
                         )
-                    questions.append(question.dict())
-                    logger.info(f"Question {i+1} generated successfully")
+                    except asyncio.TimeoutError:
+                        logger.warning("Deadline reached while streaming exam")
+                        break
+                    if question is None:
+                        finished += 1
+                        continue
+                    yield question_event(question)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        fallback = []
+        if len(questions) < num_questions and self._circuit_open():
+            fallback = await self._afallback_questions(
+                topic, difficulty, question_type, num_questions - len(questions), exclude
+            )
+            for question in fallback:
+                yield question_event(question)
+
+        if not questions:
+            if self._circuit_open():
+                error = CircuitOpenError(self.question_generator.breaker.retry_after())
+                logger.error(str(error))
+                yield {
+                    "event": "error",
+                    "detail": str(error),
+                    "retryAfterSeconds": round(error.retry_after, 3)
+                }
+                return
+            logger.error("Streaming exam produced no questions")
+            yield {"event": "error", "detail": "Failed to generate any questions"}
+            return
+
+        result = await self._asave_exam(topic, difficulty, question_type, questions)
+        result["partial"] = len(questions) < num_questions
+        result["missing"] = num_questions - len(questions)
+        result["degraded"] = bool(fallback)
+        result["llmUsage"] = get_usage_ledger().store(result["testId"], usage)
+        yield {
+            "event": "summary",
+            **result,
+            "timeToFirstQuestionSeconds": round(first_question_at, 3),
+            "totalSeconds": round(time.perf_counter() - started, 3)
+        }
+
+    async def _agenerate_questions(
+        self,
+        topic: str,
+        difficulty: str,
+        num_questions: int,
+        question_type: str,
+        batch: bool = False,
+        exclude: Optional[Set[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+        """
+        Fan out the LLM calls for an exam, capped by GENERATION_CONCURRENCY
+
+        In batch mode each call asks for up to BATCH_SIZE questions at
+        once; otherwise every question gets its own call.
+
+        Args:
+            topic: Subject topic
+            difficulty: Normalized difficulty
+            num_questions: Number of questions to generate
+            question_type: 'mcq' or 'fill_blank'
+            batch: Use batched multi-question prompts
+            exclude: Fingerprints of questions already in this exam
+
+        Returns:
+            Tuple of (generated questions in slot order, timing summary)
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.GENERATION_CONCURRENCY))
+        call_durations = []
+        if exclude is None:
+            exclude = set()
+
+        if batch:
+            size = max(1, settings.BATCH_SIZE)
+            counts = [
+                min(size, num_questions - start)
+                for start in range(0, num_questions, size)
+            ]
+        else:
+            counts = [1] * num_questions
+
+        # questions land here as they are validated, so a unit cut off by
+        # the deadline still contributes what it already produced
+        slots: List[List[Dict[str, Any]]] = [[] for _ in counts]
+
+        async def generate_unit(i: int, count: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    async for question in self._agenerate_unit(
+                        topic, difficulty, count, question_type, batch, exclude
+                    ):
+                        slots[i].append(question)
+                    logger.info(
+                        f"Generation unit {i+1}/{len(counts)}: "
+                        f"{len(slots[i])}/{count} questions generated"
+                    )
+                    observe_unit_latency(batch, time.perf_counter() - started)
                 except Exception as e:
                     logger.error(
-                        f"Failed to generate question {i+1}/{num_questions}: {str(e)}"
+                        f"Failed to generate unit {i+1}/{len(counts)}: {str(e)}"
                     )
-                    # continue with remaining questions
-                    continue
+                    # skip these slots, keep the remaining questions
+                finally:
+                    call_durations.append(time.perf_counter() - started)
 
-            logger.info(
-                f"Question generation complete: {len(questions)}/{num_questions} succeeded"
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(generate_unit(i, count))
+            for i, count in enumerate(counts)
+        ]
+        timed_out = set()
+        if tasks:
+            _, timed_out = await asyncio.wait(tasks, timeout=time_remaining())
+            for task in timed_out:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if timed_out:
+            logger.warning(f"Deadline reached with {len(timed_out)} units still running")
+        wall_clock = time.perf_counter() - started
+        summed = sum(call_durations)
+
+        questions = [q for unit in slots for q in unit]
+
+        logger.info(
+            f"Question generation complete: {len(questions)}/{num_questions} succeeded "
+            f"in {wall_clock:.2f}s wall-clock ({summed:.2f}s summed per-call)"
+        )
+
+        return questions, {
+            "wallClockSeconds": round(wall_clock, 3),
+            "summedCallSeconds": round(summed, 3),
+            "timedOutUnits": len(timed_out)
+        }
+
+    async def _agenerate_unit(
+        self,
+        topic: str,
+        difficulty: str,
+        count: int,
+        question_type: str,
+        batch: bool,
+        exclude: Set[str]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the questions of one generation unit as they are validated"""
+        if batch:
+            async for question in self.question_generator.astream_batch(
+                question_type, topic, difficulty, count, exclude
+            ):
+                yield question.dict()
+        elif question_type.lower() == "fill_blank":
+            question = await self.question_generator.agenerate_fill_blank(
+                topic, difficulty, exclude
             )
+            yield question.dict()
+        else:
+            question = await self.question_generator.agenerate_mcq(
+                topic, difficulty, exclude
+            )
+            yield question.dict()
+
+    async def _agenerate_hedged(
+        self,
+        topic: str,
+        difficulty: str,
+        num_questions: int,
+        question_type: str,
+        batch: bool = False,
+        exclude: Optional[Set[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+        """
+        Tail-latency variant of _agenerate_questions
+
+        Requests num_questions plus an over-provisioned extra (see
+        generator.hedging) and returns as soon as num_questions valid
+        questions have arrived, cancelling the units still running.
+        A unit still running past the learned p95 unit latency gets one
+        hedge (a duplicate unit) if the per-exam cap and the process-wide
+        hedge budget allow; the first of the two to finish wins. Surplus
+        questions are not wasted: the generator has already cached them.
 
-            if len(questions) == 0:
+        Returns:
+            Tuple of (generated questions in arrival order, timing and
+            hedging summary)
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.GENERATION_CONCURRENCY))
+        budget = get_hedge_budget()
+        queue: asyncio.Queue = asyncio.Queue()
+        if exclude is None:
+            exclude = set()
+
+        extra = overprovision_count(num_questions)
+        total = num_questions + extra
+        size = max(1, settings.BATCH_SIZE) if batch else 1
+        counts = [min(size, total - start) for start in range(0, total, size)]
+        delay = hedge_delay(batch)
+        hedges_left = settings.HEDGE_MAX_PER_EXAM
+        hedges_sent = 0
+        cancelled = 0
+
+        async def attempt(count: int) -> int:
+            produced = 0
+            async with semaphore:
+                async for question in self._agenerate_unit(
+                    topic, difficulty, count, question_type, batch, exclude
+                ):
+                    produced += 1
+                    await queue.put(question)
+            return produced
+
+        async def unit(count: int) -> None:
+            nonlocal hedges_left, hedges_sent, cancelled
+            started = time.perf_counter()
+            budget.deposit()
+            primary = asyncio.create_task(attempt(count))
+            running = {primary}
+            try:
+                if delay is not None:
+                    done, _ = await asyncio.wait(running, timeout=delay)
+                    if not done and hedges_left > 0 and budget.try_spend():
+                        hedges_left -= 1
+                        hedges_sent += 1
+                        logger.info(f"Hedging a unit still running after {delay:.2f}s")
+                        running.add(asyncio.create_task(attempt(count)))
+
+                while running:
+                    done, running = await asyncio.wait(
+                        running, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    winners = [t for t in done if t.exception() is None and t.result()]
+                    if winners:
+                        if primary in winners:
+                            observe_unit_latency(batch, time.perf_counter() - started)
+                        break
+                    for task in done:
+                        if task.exception() is not None:
+                            logger.error(f"Generation unit failed: {str(task.exception())}")
+            except asyncio.CancelledError:
+                # enough questions arrived while this unit's call was still running
+                if any(not task.done() for task in running):
+                    cancelled += 1
+                raise
+            finally:
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                await queue.put(None)
+
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(unit(count)) for count in counts]
+        questions = []
+        seen = set()
+        finished = 0
+        try:
+            while finished < len(tasks) and len(questions) < num_questions:
+                try:
+                    question = await asyncio.wait_for(queue.get(), time_remaining())
+                except asyncio.TimeoutError:
+                    logger.warning("Deadline reached during hedged generation")
+                    break
+                if question is None:
+                    finished += 1
+                    continue
+                # a hedge and its primary may both return the same question
+                fingerprint = question_fingerprint(question)
+                if fingerprint not in seen:
+                    seen.add(fingerprint)
+                    questions.append(question)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        wall_clock = time.perf_counter() - started
+        logger.info(
+            f"Hedged generation complete: {len(questions)}/{num_questions} "
+            f"in {wall_clock:.2f}s ({extra} extra requested, {hedges_sent} hedges, "
+            f"{cancelled} units cancelled)"
+        )
+
+        return questions, {
+            "wallClockSeconds": round(wall_clock, 3),
+            "extraRequested": extra,
+            "hedgesSent": hedges_sent,
+            "cancelledUnits": cancelled
+        }
+
+    @staticmethod
+    def _run_sync(coro):
+        """Run a coroutine to completion from synchronous code"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        # Already inside an event loop: use a private loop on a helper thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+
+    def regenerate_questions(self, test_id: str, question_ids: List[int]) -> Dict[str, Any]:
+        """Synchronous wrapper around aregenerate_questions"""
+        return self._run_sync(self.aregenerate_questions(test_id, question_ids))
+
+    async def aregenerate_questions(
+        self,
+        test_id: str,
+        question_ids: List[int]
+    ) -> Dict[str, Any]:
+        """
+        Replace specific questions of a stored test in place
+
+        Only the requested slots are generated (pool and cache first,
+        then the LLM), so fixing one question costs one call instead of
+        a whole new exam. The test's revision is bumped, submissions
+        made against an older revision are reported as stale, and the
+        replaced questions are dropped from the question cache and the
+        question bank so they are not served to other exams.
+
+        Args:
+            test_id: The test ID
+            question_ids: Indexes of the questions to replace
+
+        Returns:
+            replaced / notReplaced question IDs, the new revision, the
+            new questions by ID and the LLM usage of the regeneration
+        """
+        try:
+            test = await self.exam_manager.aget_test(test_id)
+
+            if not test:
                 raise CustomException(
-                    "Failed to generate any questions",
-                    Exception("No questions generated")
+                    f"Test not found: {test_id}",
+                    Exception("Test not found")
                 )
 
-            # Create test ID
-            test_id = self.exam_manager.generate_test_id()
+            questions = list(test.get("questions", []))
+            ids = list(dict.fromkeys(question_ids))
+            invalid = [i for i in ids if not 0 <= i < len(questions)]
+            if not ids or invalid:
+                raise CustomException(
+                    f"Invalid question IDs: {invalid or question_ids}",
+                    ValueError("Question IDs out of range")
+                )
 
-            # Store test data
-            test_data = {
-                "testId": test_id,
-                "topic": topic,
-                "difficulty": difficulty,
-                "questionType": question_type,
-                "totalQuestions": len(questions),
-                "questions": questions
-            }
+            topic = test.get("topic", "")
+            difficulty = test.get("difficulty", "medium")
+            question_type = test.get("questionType", "mcq")
+
+            logger.info(f"Regenerating questions {ids} of exam {test_id}")
+
+            # never bring back a question this test already has (or had)
+            exclude = {question_fingerprint(q) for q in questions}
+
+            fresh = []
+            if self.question_pool is not None:
+                fresh = self.question_pool.draw(
+                    topic, difficulty, question_type, len(ids), exclude
+                )
+
+            # nor a near-duplicate of any of its questions, old or kept
+            dedup = new_exam_index(questions + fresh)
+            usage = UsageCollector()
+            with track_llm_usage(usage), exam_dedup_scope(dedup):
+                generated, _ = await self._agenerate_questions(
+                    topic, difficulty, len(ids) - len(fresh), question_type,
+                    settings.BATCH_GENERATION, exclude
+                )
+            fresh += generated
+
+            replaced = ids[:len(fresh)]
+            discarded = [questions[i] for i in replaced]
+            for i, question in zip(replaced, fresh):
+                questions[i] = question
 
-            self.exam_manager.save_test(test_id, test_data)
+            revision = test.get("revision", 1)
+            if replaced:
+                revision += 1
+                await self.exam_manager.asave_test(
+                    test_id, {**test, "questions": questions, "revision": revision}
+                )
 
-            logger.info(f"Exam created successfully: {test_id}")
+                cache_type = self._cache_type(question_type)
+                cache = self.question_generator.cache
+                if cache is not None:
+                    await cache.adiscard(topic, difficulty, cache_type, discarded)
+                bank = self.question_generator.bank
+                if bank is not None:
+                    await bank.adiscard(topic, difficulty, cache_type, discarded)
+
+            logger.info(
+                f"Regenerated {len(replaced)}/{len(ids)} questions of exam {test_id} "
+                f"(revision {revision})"
+            )
 
             return {
                 "testId": test_id,
-                "totalQuestions": len(questions),
-                "testLink": f"/exam/{test_id}"
+                "revision": revision,
+                "replaced": replaced,
+                "notReplaced": ids[len(fresh):],
+                "questions": {i: questions[i] for i in replaced},
+                "llmUsage": usage.summary()
             }
 
+        except CustomException:
+            raise
         except Exception as e:
-            logger.error(f"Error creating exam: {str(e)}")
-            raise CustomException("Failed to create exam", e)
+            logger.error(f"Error regenerating questions: {str(e)}")
+            raise CustomException("Failed to regenerate questions", e)
 
     def get_exam_questions(self, test_id: str) -> Dict[str, Any]:
         """
@@ -132,31 +951,40 @@ class ExamService:
                 )
 
             # Remove correct answers from questions
-            questions_for_student = []
-            for idx, q in enumerate(test["questions"]):
-                question_item = {
-                    "questionId": idx,
-                    "question": q.get("question", ""),
-                }
+            return student_view(test_id, test)
 
-                # Include options for MCQ
-                if "options" in q:
-                    question_item["options"] = q["options"]
+        except CustomException:
+            raise
+        except Exception as e:
+            logger.error(f"Error retrieving exam questions: {str(e)}")
+            raise CustomException("Failed to retrieve exam", e)
 
-                questions_for_student.append(question_item)
+    async def aget_student_view(self, test_id: str) -> RenderedView:
+        """
+        Exam questions without answers, pre-rendered to JSON bytes
 
-            return {
-                "testId": test_id,
-                "topic": test.get("topic", ""),
-                "difficulty": test.get("difficulty", ""),
-                "totalQuestions": test.get("totalQuestions", 0),
-                "questions": questions_for_student
-            }
+        Args:
+            test_id: The test ID
+
+        Returns:
+            The rendered view (body and ETag) of the test's current revision
+        """
+        try:
+            test = await self.exam_manager.aget_test(test_id)
+
+            if not test:
+                get_student_view_cache().invalidate(test_id)
+                raise CustomException(
+                    f"Test not found: {test_id}",
+                    Exception("Test not found")
+                )
+
+            return get_student_view_cache().get(test_id, test)
 
         except CustomException:
             raise
         except Exception as e:
-            logger.error(f"Error retrieving exam questions: {str(e)}")
+            logger.error(f"Error retrieving exam view: {str(e)}")
             raise CustomException("Failed to retrieve exam", e)
 
     def evaluate_exam(
@@ -239,7 +1067,8 @@ class ExamService:
                 "wrong": wrong_count,
                 "totalAttempted": total_attempted,
                 "scorePercentage": round(score_percentage, 2),
-                "resultsDetails": results_details
+                "resultsDetails": results_details,
+                "revision": test.get("revision", 1)
             }
 
             store_submission(test_id, submission)
@@ -277,8 +1106,17 @@ class ExamService:
         try:
             submissions = get_submissions(test_id)
 
+            # questions regenerated after a submission make its score stale
+            test = self.exam_manager.get_test(test_id) or {}
+            revision = test.get("revision", 1)
+            submissions = [
+                {**s, "stale": s.get("revision", 1) != revision}
+                for s in submissions
+            ]
+
             return {
                 "testId": test_id,
+                "revision": revision,
                 "totalSubmissions": len(submissions),
                 "submissions": submissions
             }
@@ -0,0 +1,162 @@
+"""
+Pre-Rendered Student Exam View
+==============================
+What GET /api/exam/{test_id} returns (the questions without their
+answers) only changes when the test does, yet every student of a class
+asks for it, often several times. Instead of rebuilding and serializing
+the dict per request, the view is rendered once when the test is saved
+and kept as JSON bytes (orjson when available) with a strong ETag.
+
+- ExamManager.save_test / asave_test render the view (invalidating the
+  previous one); reads reuse it while the stored test's revision matches,
+  so a regenerate done on another replica is picked up on the next read
+- The ETag is a hash of the bytes: a client sending it back in
+  If-None-Match gets 304 Not Modified with no body
+- At most STUDENT_VIEW_CACHE_MAX_ENTRIES views are kept, least recently
+  read evicted first (they are re-rendered on demand)
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.config.settings import settings
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def student_view(test_id: str, test: Dict[str, Any]) -> Dict[str, Any]:
+    """The exam as a student sees it: questions without correct answers"""
+    questions_for_student = []
+    for idx, q in enumerate(test["questions"]):
+        question_item = {
+            "questionId": idx,
+            "question": q.get("question", ""),
+        }
+
+        # Include options for MCQ
+        if "options" in q:
+            question_item["options"] = q["options"]
+
+        questions_for_student.append(question_item)
+
+    return {
+        "testId": test_id,
+        "topic": test.get("topic", ""),
+        "difficulty": test.get("difficulty", ""),
+        "totalQuestions": test.get("totalQuestions", 0),
+        "questions": questions_for_student
+    }
+
+
+def _serialize(view: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(view)
+    # same bytes as FastAPI's JSONResponse
+    return json.dumps(
+        view, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 asks for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class RenderedView:
+    """Serialized student view of one revision of a test"""
+
+    __slots__ = ("body", "etag", "revision")
+
+    def __init__(self, body: bytes, revision: Any):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.revision = revision
+
+
+class StudentViewCache:
+    """Rendered views by test ID, bounded LRU"""
+
+    def __init__(self, max_entries: int = 10000, enabled: bool = True):
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled
+        self._views: "OrderedDict[str, RenderedView]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+        self.invalidations = 0
+
+    def render(self, test_id: str, test: Dict[str, Any]) -> RenderedView:
+        """Render the view of a (just saved) test and keep it"""
+        view = RenderedView(_serialize(student_view(test_id, test)), test.get("revision", 1))
+        with self._lock:
+            self.renders += 1
+            if self.enabled:
+                self._views[test_id] = view
+                self._views.move_to_end(test_id)
+                while len(self._views) > self.max_entries:
+                    self._views.popitem(last=False)
+        return view
+
+    def get(self, test_id: str, test: Dict[str, Any]) -> RenderedView:
+        """The view of ``test`` as stored now, rendered only if it changed"""
+        with self._lock:
+            view = self._views.get(test_id)
+            if view is not None and view.revision == test.get("revision", 1):
+                self._views.move_to_end(test_id)
+                self.hits += 1
+                return view
+        return self.render(test_id, test)
+
+    def invalidate(self, test_id: str) -> None:
+        with self._lock:
+            if self._views.pop(test_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._views.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._views),
+                "maxEntries": self.max_entries,
+                "bytes": sum(len(view.body) for view in self._views.values()),
+                "hits": self.hits,
+                "renders": self.renders,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache: Optional[StudentViewCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_student_view_cache() -> StudentViewCache:
+    """Return the process-wide rendered student view cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = StudentViewCache(
+                    max_entries=settings.STUDENT_VIEW_CACHE_MAX_ENTRIES,
+                    enabled=settings.STUDENT_VIEW_CACHE_ENABLED,
+                )
+    return _cache
@@ -0,0 +1,102 @@
+"""
+Hedged Generation Support
+=========================
+Budgets and learned latencies for the opt-in tail-latency mode of
+ExamService (``HEDGED_GENERATION`` or ``hedged=True`` per request):
+
+- Over-provisioning: ask for N+k questions, keep the first N valid ones
+  and cancel the rest. k is a ratio of N, capped per exam.
+- Hedging: when a generation unit (one batched call, or one question's
+  call plus retries) runs past the learned p95 latency for its kind, a
+  duplicate is sent and whichever finishes first wins. Hedges are
+  capped per exam and drawn from a process-wide HedgeBudget, so they
+  can never exceed a fixed share of primary calls.
+"""
+
+import math
+import threading
+from typing import Any, Dict, Optional
+
+from src.config.settings import settings
+from src.common.metrics import get_histogram
+
+UNIT_LATENCY_HISTOGRAM = "generation_unit_latency_seconds_{kind}"
+
+
+def unit_kind(batch: bool) -> str:
+    return "batch" if batch else "single"
+
+
+def observe_unit_latency(batch: bool, seconds: float) -> None:
+    """Record how long a completed (not cancelled) generation unit took"""
+    get_histogram(UNIT_LATENCY_HISTOGRAM.format(kind=unit_kind(batch))).observe(seconds)
+
+
+def hedge_delay(batch: bool) -> Optional[float]:
+    """
+    Learned latency after which a unit gets hedged, or None until
+    HEDGE_MIN_SAMPLES units of this kind have completed
+    """
+    histogram = get_histogram(UNIT_LATENCY_HISTOGRAM.format(kind=unit_kind(batch)))
+    if histogram.count < settings.HEDGE_MIN_SAMPLES:
+        return None
+    return histogram.percentile(settings.HEDGE_LATENCY_PERCENTILE)
+
+
+def overprovision_count(num_questions: int) -> int:
+    """Extra questions to request on top of ``num_questions``"""
+    extra = math.ceil(num_questions * settings.HEDGE_OVERPROVISION_RATIO)
+    return max(0, min(extra, settings.HEDGE_MAX_EXTRA_QUESTIONS))
+
+
+class HedgeBudget:
+    """
+    Retry-budget style limit on hedges: every primary unit deposits
+    ``ratio`` of a hedge, each hedge spends one, and the balance is
+    capped at ``burst``.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._balance = burst
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.denied = 0
+
+    def deposit(self, units: int = 1) -> None:
+        with self._lock:
+            self._balance = min(self.burst, self._balance + self.ratio * units)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._balance >= 1:
+                self._balance -= 1
+                self.granted += 1
+                return True
+            self.denied += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "balance": round(self._balance, 3),
+                "ratio": self.ratio,
+                "burst": self.burst,
+                "granted": self.granted,
+                "denied": self.denied,
+            }
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_hedge_budget() -> HedgeBudget:
+    """Return the process-wide hedge budget"""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                _budget = HedgeBudget(settings.HEDGE_BUDGET_RATIO, settings.HEDGE_BUDGET_BURST)
+    return _budget
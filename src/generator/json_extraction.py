@@ -0,0 +1,209 @@
+"""
+JSON Extraction
+===============
+Pulls question objects out of raw LLM output.
+
+The first complete top-level JSON value (object or array) is located
+with a linear bracket scanner that understands string literals, so stray
+braces in surrounding prose or code fences do not break parsing. Values
+are decoded with orjson when available (``json.raw_decode`` otherwise);
+on failure, common LLM slips (invalid escapes, trailing commas, raw
+control characters) are repaired, and objects are salvaged one by one
+from an array that is broken as a whole.
+
+Failures raise JSONExtractionError with a ``kind``:
+``no_json``, ``truncated``, ``malformed`` or ``no_objects``.
+"""
+
+import json
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+NO_JSON = "no_json"
+TRUNCATED = "truncated"
+MALFORMED = "malformed"
+NO_OBJECTS = "no_objects"
+
+# Backslashes not starting a valid JSON escape (e.g. LaTeX "\alpha")
+_INVALID_ESCAPE = re.compile(r'\\(?!["\\/bfnrtu])')
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_SPECIAL = re.compile(r'[{}\[\]"\\]')
+_OPENERS = re.compile(r"[{\[]")
+
+# a stray unclosed brace in prose forces a rescan after it; bound the rescans
+_MAX_RESCANS = 8
+
+_decoder = json.JSONDecoder(strict=False)
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+class JSONExtractionError(ValueError):
+    """No usable JSON object in LLM output; ``kind`` says why"""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(f"{message} [{kind}]")
+        self.kind = kind
+
+
+def _count(outcome: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def extraction_stats() -> Dict[str, int]:
+    """Outcome counts: ok, repaired, salvaged and each failure kind"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def decode_json(text: str) -> Tuple[Any, bool]:
+    """
+    Decode one JSON document, repairing common LLM slips if needed.
+
+    Returns (value, repaired). Raises ValueError when even the repaired
+    text does not decode.
+    """
+    try:
+        if orjson is not None:
+            return orjson.loads(text), False
+        return json.loads(text), False
+    except ValueError:
+        pass
+
+    repaired = _TRAILING_COMMA.sub(r"\1", _INVALID_ESCAPE.sub(r"\\\\", text))
+    return _decoder.decode(repaired), True
+
+
+def _scan(text: str, start: int, stop: int) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Linear scan of text[start:stop] for balanced top-level {...} / [...] spans.
+
+    Returns (spans, unclosed) where ``unclosed`` is the start of a value
+    still open at ``stop`` (-1 if none). Quotes only count inside a value,
+    since prose between values may contain unbalanced quotes.
+    """
+    spans = []
+    depth = 0
+    begin = -1
+    in_string = False
+    skip = -1
+
+    for match in _SPECIAL.finditer(text, start, stop):
+        i = match.start()
+        if i < skip:
+            continue
+        char = match.group()
+
+        if in_string:
+            if char == "\\":
+                skip = i + 2
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            if depth:
+                in_string = True
+        elif char == "{" or char == "[":
+            if depth == 0:
+                begin = i
+            depth += 1
+        elif char == "}" or char == "]":
+            if depth:
+                depth -= 1
+                if depth == 0:
+                    spans.append((begin, i + 1))
+
+    return spans, (begin if depth else -1)
+
+
+def _objects(value: Any) -> List[Dict[str, Any]]:
+    if isinstance(value, dict):
+        return [value]
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, dict)]
+    return []
+
+
+def _salvage(text: str, begin: int, end: int) -> List[Dict[str, Any]]:
+    """Decode the objects of a broken array one by one, skipping bad ones"""
+    spans, _ = _scan(text, begin + 1, end - 1)
+    salvaged = []
+    for inner_begin, inner_end in spans:
+        if text[inner_begin] != "{":
+            continue
+        try:
+            value, _ = decode_json(text[inner_begin:inner_end])
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            salvaged.append(value)
+    return salvaged
+
+
+def extract_json_objects(text: str) -> List[Dict[str, Any]]:
+    """
+    Return every object of the first complete JSON value in ``text``.
+
+    A top-level object yields a one-item list; an array yields its
+    object items in order.
+    """
+    first = _OPENERS.search(text)
+    if first is None:
+        _count(NO_JSON)
+        raise JSONExtractionError(NO_JSON, "No JSON object or array in LLM output")
+
+    # Fast path: well-formed output, possibly followed by prose
+    try:
+        value, _ = _decoder.raw_decode(text, first.start())
+        objects = _objects(value)
+        if objects:
+            _count("ok")
+            return objects
+    except ValueError:
+        pass
+
+    failure: Optional[str] = None
+    position = first.start()
+
+    for _ in range(_MAX_RESCANS):
+        spans, unclosed = _scan(text, position, len(text))
+
+        for begin, end in spans:
+            try:
+                value, repaired = decode_json(text[begin:end])
+            except ValueError:
+                if text[begin] == "[":
+                    salvaged = _salvage(text, begin, end)
+                    if salvaged:
+                        _count("salvaged")
+                        return salvaged
+                failure = failure or MALFORMED
+                continue
+
+            objects = _objects(value)
+            if objects:
+                _count("repaired" if repaired else "ok")
+                return objects
+            failure = failure or NO_OBJECTS
+
+        if unclosed == -1:
+            break
+        # everything after ``unclosed`` was swallowed by an unbalanced
+        # opener; it may be a stray brace in prose, so rescan past it
+        failure = failure or TRUNCATED
+        next_opener = _OPENERS.search(text, unclosed + 1)
+        if next_opener is None:
+            break
+        position = next_opener.start()
+
+    kind = failure or MALFORMED
+    _count(kind)
+    raise JSONExtractionError(kind, "No decodable JSON object in LLM output")
@@ -0,0 +1,84 @@
+"""
+Incremental JSON Parsing
+========================
+Pulls complete question objects out of an LLM token stream as soon as
+their closing brace arrives, so a batched response can be validated and
+forwarded item by item instead of after the whole array is generated.
+"""
+
+from typing import Any, Dict, List
+
+from src.generator.json_extraction import decode_json
+
+
+class JSONObjectStreamParser:
+    """
+    Feed text chunks, get back every top-level JSON object completed so far.
+
+    Braces are tracked outside of string literals only; anything between
+    objects (the surrounding ``[``, commas, prose, code fences) is skipped.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._start = -1
+        self._in_string = False
+        self._escaped = False
+        self.errors: List[str] = []
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+
+        i = self._pos
+        while i < len(buffer):
+            char = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._depth > 0:
+                    self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif char == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    obj = self._decode(buffer[self._start:i + 1])
+                    if obj is not None:
+                        completed.append(obj)
+                    self._start = -1
+            i += 1
+
+        # keep only the unfinished object, if any
+        if self._depth > 0:
+            self._buffer = buffer[self._start:]
+            self._pos = i - self._start
+            self._start = 0
+        else:
+            self._buffer = ""
+            self._pos = 0
+
+        return completed
+
+    def _decode(self, text: str):
+        try:
+            value, _ = decode_json(text)
+            return value
+        except ValueError as e:
+            self.errors.append(str(e))
+            return None
+
+    @property
+    def incomplete(self) -> bool:
+        """True when the stream ended inside an object (truncated output)"""
+        return self._depth > 0
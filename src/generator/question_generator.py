@@ -1,55 +1,277 @@
 from src.models.question_schemas import MCQQuestion, FillBlankQuestion
-from src.prompts.templates import mcq_prompt_template, fill_blank_prompt_template
+from src.prompts.templates import (
+    mcq_prompt_template,
+    fill_blank_prompt_template,
+    mcq_batch_prompt_template,
+    fill_blank_batch_prompt_template,
+)
 from src.llm.groq_client import get_groq_llm
+from src.llm.model_router import get_model_router
+from src.llm.circuit_breaker import get_circuit_breaker
 from src.config.settings import settings
 from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
+from src.common.executor import run_blocking
+from src.llm.scheduler import get_llm_scheduler
+from src.storage.question_cache import get_question_cache, question_fingerprint
+from src.storage.question_bank import get_question_bank
+from src.storage.near_duplicates import (
+    NearDuplicateError,
+    current_exam_index,
+    note_exam_questions,
+)
+from src.generator.json_stream import JSONObjectStreamParser
+from src.generator.json_extraction import (
+    JSONExtractionError,
+    TRUNCATED,
+    extract_json_objects,
+)
+from src.common.deadline import capped_delay, check_deadline, deadline_expired
+from src.llm.usage import CALL_ERROR, CANCELLED, INVALID, OK, PARTIAL, LLMCall
 
-import re
-import json
+import time
+import asyncio
+from typing import AsyncIterator, List, Optional, Set, Union
 
 
 class QuestionGenerator:
     def __init__(self):
         self.llm = get_groq_llm()
+        self.router = get_model_router()
+        self.breaker = get_circuit_breaker()
+        self.cache = get_question_cache()
+        self.bank = get_question_bank()
         self.logger = get_logger(self.__class__.__name__)
 
-    def _retry_and_parse(self, prompt, topic, difficulty):
+    @staticmethod
+    def _cache_type(question_type: str) -> str:
+        return "fill_blank" if question_type.lower() == "fill_blank" else "mcq"
+
+    def _from_cache(self, question_type, topic, difficulty, count, exclude):
+        """Take up to ``count`` cached questions not already in ``exclude``"""
+        if self.cache is None:
+            return []
+        cached = self.cache.get_many(
+            topic, difficulty, self._cache_type(question_type), count, exclude
+        )
+        note_exam_questions(cached)
+        return cached
+
+    async def _afrom_cache(self, question_type, topic, difficulty, count, exclude):
+        """``_from_cache`` for async callers: the key is loaded off the event loop first"""
+        if self.cache is not None:
+            await self.cache.aload(topic, difficulty, self._cache_type(question_type))
+        return self._from_cache(question_type, topic, difficulty, count, exclude)
+
+    @staticmethod
+    def _mark_used(questions, exclude):
+        """Fresh questions as dicts, marked as used by the current exam"""
+        dicts = [q.dict() for q in questions]
+        if exclude is not None:
+            exclude.update(question_fingerprint(d) for d in dicts)
+        note_exam_questions(dicts)
+        return dicts
+
+    def _remember(self, question_type, topic, difficulty, questions, exclude):
+        """Store freshly generated questions (cache and bank) and mark them as used"""
+        dicts = self._mark_used(questions, exclude)
+        if self.cache is not None and dicts:
+            self.cache.put_many(
+                topic, difficulty, self._cache_type(question_type), dicts
+            )
+        if self.bank is not None and dicts:
+            self.bank.add_many(
+                topic, difficulty, self._cache_type(question_type), dicts
+            )
+
+    async def _aremember(self, question_type, topic, difficulty, questions, exclude):
+        """``_remember`` for async callers: the disk writes run off the event loop"""
+        dicts = self._mark_used(questions, exclude)
+        if self.cache is not None and dicts:
+            await self.cache.aput_many(
+                topic, difficulty, self._cache_type(question_type), dicts
+            )
+        if self.bank is not None and dicts:
+            await self.bank.aadd_many(
+                topic, difficulty, self._cache_type(question_type), dicts
+            )
+
+    async def _aload_bank(self, question_type, topic, difficulty):
+        """
+        Load the bank key (and its near-duplicate index) on the blocking
+        executor, so ``_distinct`` only queries it from the event loop
+        """
+        if self.bank is not None and settings.NEAR_DUPLICATE_DETECTION:
+            await self.bank.aload(topic, difficulty, self._cache_type(question_type))
+
+    def _distinct(self, question_type, topic, difficulty, validate):
+        """
+        Wrap ``validate`` so it also rejects (NearDuplicateError) a new
+        question that nearly duplicates one already in the current exam
+        or in the question bank for the topic
+        """
+        def check(data):
+            question = validate(data)
+            if not settings.NEAR_DUPLICATE_DETECTION:
+                return question
+            candidate = question.dict()
+            exam = current_exam_index()
+            match = exam.find(candidate) if exam is not None else None
+            if match is not None:
+                raise NearDuplicateError("exam", match[1])
+            if self.bank is not None:
+                match = self.bank.find_near_duplicate(
+                    topic, difficulty, self._cache_type(question_type), candidate
+                )
+                if match is not None:
+                    raise NearDuplicateError("bank", match[1])
+            return question
+
+        return check
+
+    def _parse_response(self, raw):
         """
-        Invoke LLM, extract first valid JSON object,
-        sanitize it, and return parsed dict.
+        Extract the first JSON object from raw LLM output and return it
+        as a dict. Raises JSONExtractionError (a ValueError) with the
+        failure kind when the output holds no usable object.
+        """
+        self.logger.info(f"RAW LLM OUTPUT:\n{raw}")
+
+        return extract_json_objects(raw)[0]
+
+    def _select_llm(self):
+        """
+        (model name, chat model) for the next call: the model router's
+        choice for the current lane when several models are configured,
+        otherwise ``self.llm``
+        """
+        if self.router is not None:
+            return self.router.choose()
+        return getattr(self.llm, "model_name", None), self.llm
+
+    def _check_circuit(self) -> None:
+        """Raise CircuitOpenError instead of calling a failing upstream"""
+        if self.breaker is not None:
+            self.breaker.before_call()
+
+    def _start_call(self, kind, attempt, model, requested=1) -> LLMCall:
+        observers = (self.breaker.observe,) if self.breaker is not None else ()
+        return LLMCall(kind, attempt, model, requested, observers)
+
+    @staticmethod
+    def _failure_outcome(error, response) -> str:
+        """Classify a failed attempt for usage accounting"""
+        if response is None:
+            return CALL_ERROR
+        if isinstance(error, JSONExtractionError):
+            return error.kind
+        return INVALID
+
+    def _retry_and_parse(self, prompt, topic, difficulty, validate):
+        """
+        Invoke LLM, extract the first JSON object and validate it,
+        retrying on call, parse and validation failures.
         """
 
         for attempt in range(settings.MAX_RETRIES):
+            # no new attempt once the request's deadline is spent, nor
+            # while the circuit breaker holds calls back
+            check_deadline()
+            self._check_circuit()
+            response = None
+            model, llm = self._select_llm()
+            call = self._start_call("single", attempt + 1, model)
             try:
                 self.logger.info(
                     f"Generating question for topic {topic} with difficulty {difficulty}"
                 )
 
-                response = self.llm.invoke(
+                response = llm.invoke(
                     prompt.format(topic=topic, difficulty=difficulty)
                 )
+                call.add_usage(response)
 
-                raw = response.content
-                cleaned = raw.strip()
+                question = validate(self._parse_response(response.content))
+                call.finish(OK, accepted=1)
+                return question
 
-                self.logger.info(f"RAW LLM OUTPUT:\n{raw}")
+            except Exception as e:
+                call.finish(self._failure_outcome(e, response))
+                self.logger.error(f"Generation attempt failed: {str(e)}")
 
-                # Extract first JSON object
-                match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-                if not match:
-                    raise ValueError("No JSON object found in LLM response")
+                if attempt == settings.MAX_RETRIES - 1:
+                    raise CustomException(
+                        f"Generation failed after {settings.MAX_RETRIES} attempts",
+                        e,
+                    )
 
-                json_str = match.group(0)
+                # the call itself failed (429, timeout...): back off before retrying
+                if response is None:
+                    time.sleep(capped_delay(get_llm_scheduler().backoff_delay(attempt)))
 
-                # Fix invalid escape sequences
-                json_str = re.sub(r'\\(?!["\\/bfnrtu])', r"\\\\", json_str)
+    async def _ainvoke(self, prompt_text, llm=None):
+        """
+        Call the LLM (``self.llm`` unless given) without blocking the
+        event loop: use its native ainvoke when available, otherwise run
+        invoke on the bounded blocking executor.
+        """
+        llm = llm or self.llm
+        if hasattr(llm, "ainvoke"):
+            return await llm.ainvoke(prompt_text)
+        return await run_blocking(llm.invoke, prompt_text)
 
-                data = json.loads(json_str)
+    async def _astream(
+        self, prompt_text, call: Optional[LLMCall] = None, llm=None
+    ) -> AsyncIterator[str]:
+        """
+        Yield the LLM's output text as it is generated. Clients without
+        astream produce a single chunk via ainvoke / the blocking executor.
+        Token usage reported by the chunks is added to ``call``.
+        """
+        llm = llm or self.llm
+        if hasattr(llm, "astream"):
+            async for chunk in llm.astream(prompt_text):
+                if call is not None:
+                    call.add_usage(chunk)
+                yield chunk.content
+        else:
+            response = await self._ainvoke(prompt_text, llm)
+            if call is not None:
+                call.add_usage(response)
+            yield response.content
 
-                return data
+    async def _aretry_and_parse(self, prompt, topic, difficulty, validate):
+        """
+        Async counterpart of _retry_and_parse, so several questions can
+        be generated concurrently.
+        """
+
+        for attempt in range(settings.MAX_RETRIES):
+            check_deadline()
+            self._check_circuit()
+            response = None
+            model, llm = self._select_llm()
+            call = self._start_call("single", attempt + 1, model)
+            try:
+                self.logger.info(
+                    f"Generating question for topic {topic} with difficulty {difficulty}"
+                )
+
+                response = await self._ainvoke(
+                    prompt.format(topic=topic, difficulty=difficulty), llm
+                )
+                call.add_usage(response)
+
+                question = validate(self._parse_response(response.content))
+                call.finish(OK, accepted=1)
+                return question
+
+            except asyncio.CancelledError:
+                call.finish(CANCELLED)
+                raise
 
             except Exception as e:
+                call.finish(self._failure_outcome(e, response))
                 self.logger.error(f"Generation attempt failed: {str(e)}")
 
                 if attempt == settings.MAX_RETRIES - 1:
@@ -58,24 +280,65 @@ class QuestionGenerator:
                         e,
                     )
 
+                # the call itself failed (429, timeout...): back off before retrying
+                if response is None:
+                    await asyncio.sleep(capped_delay(get_llm_scheduler().backoff_delay(attempt)))
+
     # ------------------ MCQ ------------------
 
-    def generate_mcq(self, topic: str, difficulty: str = "medium") -> MCQQuestion:
+    def _validate_mcq(self, data) -> MCQQuestion:
+        question = MCQQuestion(**data)
+
+        # Relaxed validation
+        options_normalized = [opt.strip().lower() for opt in question.options]
+
+        if len(options_normalized) != 4:
+            raise ValueError("Invalid MCQ Structure")
+
+        correct_normalized = question.correct_answer.strip().lower()
+
+        if correct_normalized not in options_normalized:
+            raise ValueError("Correct answer mismatch")
+
+        return question
+
+    def generate_mcq(
+        self, topic: str, difficulty: str = "medium", exclude: Optional[Set[str]] = None
+    ) -> MCQQuestion:
         try:
-            data = self._retry_and_parse(mcq_prompt_template, topic, difficulty)
+            cached = self._from_cache("mcq", topic, difficulty, 1, exclude)
+            if cached:
+                self.logger.info("Served MCQ from cache")
+                return self._validate_mcq(cached[0])
 
-            question = MCQQuestion(**data)
+            question = self._retry_and_parse(
+                mcq_prompt_template, topic, difficulty,
+                self._distinct("mcq", topic, difficulty, self._validate_mcq)
+            )
+            self._remember("mcq", topic, difficulty, [question], exclude)
 
-            # Relaxed validation
-            options_normalized = [opt.strip().lower() for opt in question.options]
+            self.logger.info("Generated valid MCQ")
+            return question
 
-            if len(options_normalized) != 4:
-                raise ValueError("Invalid MCQ Structure")
+        except Exception as e:
+            self.logger.error(f"Failed to generate MCQ: {str(e)}")
+            raise CustomException("MCQ generation failed", e)
 
-            correct_normalized = question.correct_answer.strip().lower()
+    async def agenerate_mcq(
+        self, topic: str, difficulty: str = "medium", exclude: Optional[Set[str]] = None
+    ) -> MCQQuestion:
+        try:
+            cached = await self._afrom_cache("mcq", topic, difficulty, 1, exclude)
+            if cached:
+                self.logger.info("Served MCQ from cache")
+                return self._validate_mcq(cached[0])
 
-            if correct_normalized not in options_normalized:
-                raise ValueError("Correct answer mismatch")
+            await self._aload_bank("mcq", topic, difficulty)
+            question = await self._aretry_and_parse(
+                mcq_prompt_template, topic, difficulty,
+                self._distinct("mcq", topic, difficulty, self._validate_mcq)
+            )
+            await self._aremember("mcq", topic, difficulty, [question], exclude)
 
             self.logger.info("Generated valid MCQ")
             return question
@@ -86,18 +349,198 @@ class QuestionGenerator:
 
     # ------------------ Fill in Blank ------------------
 
-    def generate_fill_blank(self, topic: str, difficulty: str = "medium") -> FillBlankQuestion:
+    def _validate_fill_blank(self, data) -> FillBlankQuestion:
+        question = FillBlankQuestion(**data)
+
+        if "___" not in question.question:
+            raise ValueError("Fill in blanks should contain '___'")
+
+        return question
+
+    def generate_fill_blank(
+        self, topic: str, difficulty: str = "medium", exclude: Optional[Set[str]] = None
+    ) -> FillBlankQuestion:
         try:
-            data = self._retry_and_parse(fill_blank_prompt_template, topic, difficulty)
+            cached = self._from_cache("fill_blank", topic, difficulty, 1, exclude)
+            if cached:
+                self.logger.info("Served Fill in Blank question from cache")
+                return self._validate_fill_blank(cached[0])
 
-            question = FillBlankQuestion(**data)
+            question = self._retry_and_parse(
+                fill_blank_prompt_template, topic, difficulty,
+                self._distinct("fill_blank", topic, difficulty, self._validate_fill_blank)
+            )
+            self._remember("fill_blank", topic, difficulty, [question], exclude)
 
-            if "___" not in question.question:
-                raise ValueError("Fill in blanks should contain '___'")
+            self.logger.info("Generated valid Fill in Blank question")
+            return question
+
+        except Exception as e:
+            self.logger.error(f"Failed to generate fill blank: {str(e)}")
+            raise CustomException("Fill in blanks generation failed", e)
+
+    async def agenerate_fill_blank(
+        self, topic: str, difficulty: str = "medium", exclude: Optional[Set[str]] = None
+    ) -> FillBlankQuestion:
+        try:
+            cached = await self._afrom_cache("fill_blank", topic, difficulty, 1, exclude)
+            if cached:
+                self.logger.info("Served Fill in Blank question from cache")
+                return self._validate_fill_blank(cached[0])
+
+            await self._aload_bank("fill_blank", topic, difficulty)
+            question = await self._aretry_and_parse(
+                fill_blank_prompt_template, topic, difficulty,
+                self._distinct("fill_blank", topic, difficulty, self._validate_fill_blank)
+            )
+            await self._aremember("fill_blank", topic, difficulty, [question], exclude)
 
             self.logger.info("Generated valid Fill in Blank question")
             return question
 
         except Exception as e:
             self.logger.error(f"Failed to generate fill blank: {str(e)}")
-            raise CustomException("Fill in blanks generation failed", e)
\ No newline at end of file
+            raise CustomException("Fill in blanks generation failed", e)
+
+
+    # ------------------ Batched ------------------
+
+    async def astream_batch(
+        self,
+        question_type: str,
+        topic: str,
+        difficulty: str,
+        count: int,
+        exclude: Optional[Set[str]] = None,
+    ) -> AsyncIterator[Union[MCQQuestion, FillBlankQuestion]]:
+        """
+        Generate ``count`` questions with a single LLM call returning a
+        JSON array, yielding each one as soon as it passes validation.
+
+        The token stream is parsed incrementally, so the first question
+        is available before the model finishes the array. Every item is
+        validated on its own; only the rejected slots are asked for
+        again, for up to MAX_RETRIES calls in total; near-duplicates of
+        questions already in the exam or the bank are rejected like
+        invalid items. Cached questions not in ``exclude`` fill slots
+        before any call.
+        """
+        if question_type.lower() == "fill_blank":
+            prompt = fill_blank_batch_prompt_template
+            validate = self._validate_fill_blank
+        else:
+            prompt = mcq_batch_prompt_template
+            validate = self._validate_mcq
+
+        produced = 0
+
+        cached = await self._afrom_cache(question_type, topic, difficulty, count, exclude)
+        for item in cached:
+            produced += 1
+            yield validate(item)
+        if produced:
+            self.logger.info(f"Served {produced}/{count} questions from cache")
+
+        if produced < count:
+            await self._aload_bank(question_type, topic, difficulty)
+        validate = self._distinct(question_type, topic, difficulty, validate)
+
+        for attempt in range(settings.MAX_RETRIES):
+            missing = count - produced
+            if missing <= 0:
+                break
+            if deadline_expired():
+                self.logger.warning(
+                    f"Deadline reached with {missing}/{count} questions missing"
+                )
+                break
+            self._check_circuit()
+
+            parser = JSONObjectStreamParser()
+            raw = []
+            accepted = 0
+            emitted = 0
+            model, llm = self._select_llm()
+            call = self._start_call("batch", attempt + 1, model, requested=missing)
+
+            try:
+                self.logger.info(
+                    f"Generating {missing} questions for topic {topic} "
+                    f"with difficulty {difficulty}"
+                )
+
+                async for text in self._astream(
+                    prompt.format(topic=topic, difficulty=difficulty, count=missing),
+                    call,
+                    llm,
+                ):
+                    raw.append(text)
+                    for item in parser.feed(text):
+                        emitted += 1
+                        if accepted >= missing:
+                            continue
+                        try:
+                            question = validate(item)
+                        except Exception as e:
+                            self.logger.warning(f"Rejected batch item: {str(e)}")
+                            continue
+
+                        await self._aremember(
+                            question_type, topic, difficulty, [question], exclude
+                        )
+                        accepted += 1
+                        produced += 1
+                        yield question
+
+                self.logger.info(f"RAW LLM OUTPUT:\n{''.join(raw)}")
+                if accepted:
+                    outcome = OK if accepted >= missing else PARTIAL
+                elif emitted:
+                    outcome = INVALID
+                elif parser.incomplete:
+                    outcome = TRUNCATED
+                else:
+                    try:
+                        extract_json_objects("".join(raw))
+                        outcome = INVALID
+                    except JSONExtractionError as e:
+                        outcome = e.kind
+                if parser.incomplete:
+                    self.logger.warning("Batch response ended mid-object (truncated)")
+                elif not emitted:
+                    self.logger.warning(f"Unusable batch response: {outcome}")
+                call.finish(outcome, accepted)
+
+            except (asyncio.CancelledError, GeneratorExit):
+                call.finish(CANCELLED, accepted)
+                raise
+
+            except Exception as e:
+                call.finish(PARTIAL if accepted else CALL_ERROR, accepted)
+                self.logger.error(f"Batch generation attempt failed: {str(e)}")
+
+                # the call itself failed (429, timeout...): back off before retrying
+                if attempt < settings.MAX_RETRIES - 1:
+                    await asyncio.sleep(capped_delay(get_llm_scheduler().backoff_delay(attempt)))
+
+        self.logger.info(f"Batch generation accepted {produced}/{count} questions")
+
+    async def agenerate_batch(
+        self,
+        question_type: str,
+        topic: str,
+        difficulty: str,
+        count: int,
+        exclude: Optional[Set[str]] = None,
+    ) -> List[Union[MCQQuestion, FillBlankQuestion]]:
+        """
+        Collect astream_batch into a list.
+
+        Returns the accepted questions, which may be fewer than ``count``.
+        """
+        return [
+            question
+            async for question in self.astream_batch(
+                question_type, topic, difficulty, count, exclude
+            )
+        ]
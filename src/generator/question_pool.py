@@ -0,0 +1,231 @@
+"""
+Question Pool Module
+====================
+Pre-warmed pools of validated questions for a configurable list of hot
+topics. Background workers keep every (topic, difficulty, type) pool at
+its target depth, so creating an exam on a hot topic is a pool draw
+instead of a round-trip to the LLM.
+
+Refills go through QuestionGenerator in the scheduler's BACKGROUND lane,
+so they share the provider rate limits with interactive exam creation
+but always yield to it.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.llm.scheduler import BACKGROUND, llm_priority
+from src.storage.question_cache import normalize_topic, question_fingerprint
+
+logger = get_logger(__name__)
+
+PoolKey = Tuple[str, str, str]
+
+
+class QuestionPool:
+    """Per-key queues of ready questions plus the workers that refill them"""
+
+    def __init__(
+        self,
+        hot_topics: List[str],
+        difficulties: List[str],
+        question_types: List[str],
+        target_depth: int = 20,
+        refill_interval: float = 30.0,
+        generator=None,
+    ):
+        self.target_depth = target_depth
+        self.refill_interval = refill_interval
+        self._generator = generator
+
+        self._pools: Dict[PoolKey, Deque[Dict[str, Any]]] = {}
+        self._topics: Dict[PoolKey, str] = {}
+        for topic in hot_topics:
+            for difficulty in difficulties:
+                for question_type in question_types:
+                    key = self.make_key(topic, difficulty, question_type)
+                    self._pools[key] = deque()
+                    self._topics[key] = topic
+
+        self._lock = threading.Lock()
+        self._filling: Set[PoolKey] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._supervisor: Optional[asyncio.Task] = None
+
+        self.draws = 0
+        self.drawn_questions = 0
+        self.short_draws = 0
+
+    @staticmethod
+    def make_key(topic: str, difficulty: str, question_type: str) -> PoolKey:
+        question_type = "fill_blank" if question_type.lower() == "fill_blank" else "mcq"
+        return (normalize_topic(topic), difficulty.lower(), question_type)
+
+    @property
+    def generator(self):
+        if self._generator is None:
+            from src.generator.question_generator import QuestionGenerator
+            self._generator = QuestionGenerator()
+        return self._generator
+
+    # ------------------ Draws ------------------
+
+    def draw(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        count: int,
+        exclude: Optional[Set[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Take up to ``count`` questions from the pool for this key.
+
+        Returns an empty list for keys that are not pooled. Fingerprints
+        of the drawn questions are added to ``exclude``.
+        """
+        pool = self._pools.get(self.make_key(topic, difficulty, question_type))
+        if pool is None:
+            return []
+
+        taken = []
+        with self._lock:
+            skipped = []
+            while pool and len(taken) < count:
+                question = pool.popleft()
+                if exclude is not None and question_fingerprint(question) in exclude:
+                    skipped.append(question)
+                    continue
+                taken.append(question)
+            pool.extendleft(reversed(skipped))
+
+            self.draws += 1
+            self.drawn_questions += len(taken)
+            if len(taken) < count:
+                self.short_draws += 1
+
+        if exclude is not None:
+            exclude.update(question_fingerprint(q) for q in taken)
+
+        self._wake()
+        return taken
+
+    def depth(self) -> Dict[str, int]:
+        """Current number of ready questions per pool key"""
+        with self._lock:
+            return {"|".join(key): len(pool) for key, pool in self._pools.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "targetDepth": self.target_depth,
+            "depth": self.depth(),
+            "filling": sorted("|".join(key) for key in self._filling),
+            "draws": self.draws,
+            "drawnQuestions": self.drawn_questions,
+            "shortDraws": self.short_draws,
+        }
+
+    # ------------------ Background refills ------------------
+
+    def _wake(self) -> None:
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self) -> None:
+        """Start the refill supervisor on the running event loop"""
+        if not self._pools or self._supervisor is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._supervisor = asyncio.create_task(self._supervise())
+        logger.info(f"Question pool started for {len(self._pools)} keys")
+
+    async def stop(self) -> None:
+        """Cancel the supervisor and any refill in progress"""
+        tasks = list(self._tasks)
+        if self._supervisor is not None:
+            tasks.append(self._supervisor)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._supervisor = None
+        self._loop = None
+        logger.info("Question pool stopped")
+
+    async def _supervise(self) -> None:
+        while True:
+            self._wakeup.clear()
+            for key, pool in self._pools.items():
+                if key not in self._filling and len(pool) < self.target_depth:
+                    self._filling.add(key)
+                    task = asyncio.create_task(self._fill(key))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fill(self, key: PoolKey) -> None:
+        _, difficulty, question_type = key
+        topic = self._topics[key]
+        pool = self._pools[key]
+        try:
+            while True:
+                with self._lock:
+                    deficit = self.target_depth - len(pool)
+                    exclude = {question_fingerprint(q) for q in pool}
+                if deficit <= 0:
+                    break
+
+                with llm_priority(BACKGROUND):
+                    questions = await self.generator.agenerate_batch(
+                        question_type,
+                        topic,
+                        difficulty,
+                        min(deficit, max(1, settings.BATCH_SIZE)),
+                        exclude,
+                    )
+                if not questions:
+                    # try again on the next draw or refill interval
+                    break
+
+                with self._lock:
+                    pool.extend(q.dict() for q in questions)
+                logger.info(f"Pool {'|'.join(key)} refilled to {len(pool)}")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Pool refill failed for {'|'.join(key)}: {str(e)}")
+        finally:
+            self._filling.discard(key)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_question_pool() -> Optional[QuestionPool]:
+    """Return the process-wide question pool, or None when no hot topics are configured"""
+    global _pool
+    if not settings.POOL_HOT_TOPICS:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = QuestionPool(
+                    hot_topics=settings.POOL_HOT_TOPICS,
+                    difficulties=settings.POOL_DIFFICULTIES,
+                    question_types=settings.POOL_QUESTION_TYPES,
+                    target_depth=settings.POOL_TARGET_DEPTH,
+                    refill_interval=settings.POOL_REFILL_INTERVAL_SECONDS,
+                )
+    return _pool
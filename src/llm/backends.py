@@ -0,0 +1,364 @@
+"""
+LLM Backends
+============
+Chat-model implementations selectable with ``LLM_BACKEND``:
+
+- ``groq``: the real ChatGroq client
+- ``record``: ChatGroq, with every response appended to a cassette file
+- ``replay``: answers from a recorded cassette, no network access
+- ``stub``: deterministic local generator with configurable latency and
+  failure rate, for offline load tests and reproducible benchmarks
+
+All backends expose the LangChain ``invoke`` / ``ainvoke`` / ``astream``
+surface used by QuestionGenerator and return ``AIMessage`` objects with
+``usage_metadata``.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+STREAM_CHUNK_CHARS = 32
+
+# Backends that talk to Groq over HTTP and can share pooled HTTP clients
+HTTP_BACKENDS = ("groq", "record")
+
+
+class StubLLMError(Exception):
+    """Simulated upstream failure raised by the stub backend"""
+
+
+class CassetteMissError(Exception):
+    """A replayed prompt has no recorded response"""
+
+
+def _prompt_text(prompt: Any) -> str:
+    return prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+
+
+def _usage(prompt_text: str, content: str) -> Dict[str, int]:
+    input_tokens = len(prompt_text) // 4
+    output_tokens = len(content) // 4
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+    }
+
+
+def _chunks(content: str) -> List[str]:
+    return [
+        content[i:i + STREAM_CHUNK_CHARS]
+        for i in range(0, len(content), STREAM_CHUNK_CHARS)
+    ] or [""]
+
+
+# ------------------ Stub ------------------
+
+class StubChatModel:
+    """
+    Deterministic offline chat model.
+
+    Answers question-generation prompts with valid JSON (a batch array
+    or a single object). The response, simulated latency and simulated
+    failures depend only on the seed, the prompt and how many times
+    that prompt was seen, so runs are reproducible.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        model_name: str = "stub",
+    ):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.model_name = model_name
+        self._seen: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    def _rng(self, prompt_text: str) -> random.Random:
+        digest = hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()
+        with self._lock:
+            occurrence = self._seen[digest]
+            self._seen[digest] += 1
+            self.calls += 1
+        return random.Random(f"{self.seed}:{digest}:{occurrence}")
+
+    def _plan(self, prompt: Any):
+        """Decide latency, failure and content for one call"""
+        prompt_text = _prompt_text(prompt)
+        rng = self._rng(prompt_text)
+        delay = max(0.0, self.latency + rng.uniform(-1, 1) * self.latency_jitter)
+        if rng.random() < self.failure_rate:
+            with self._lock:
+                self.failures += 1
+            return prompt_text, delay, None
+        return prompt_text, delay, self._content(prompt_text, rng)
+
+    @staticmethod
+    def _content(prompt_text: str, rng: random.Random) -> str:
+        topic_match = re.search(r"questions? about (.+?)\.\n", prompt_text)
+        topic = topic_match.group(1) if topic_match else "general knowledge"
+        count_match = re.search(r"Generate (\d+) distinct", prompt_text)
+        fill_blank = "fill-in-the-blank" in prompt_text
+
+        items = []
+        for _ in range(int(count_match.group(1)) if count_match else 1):
+            n = rng.randrange(10 ** 6)
+            if fill_blank:
+                items.append({
+                    "question": f"In {topic}, fact #{n} is about _____.",
+                    "answer": f"term{n % 97}",
+                })
+            else:
+                options = [f"Option {n}-{i}" for i in range(4)]
+                items.append({
+                    "question": f"Which statement about {topic} is true (#{n})?",
+                    "options": options,
+                    "correct_answer": options[rng.randrange(4)],
+                })
+        payload = items if count_match else items[0]
+        return json.dumps(payload, indent=2)
+
+    def _message(self, prompt_text: str, content: Optional[str]) -> AIMessage:
+        if content is None:
+            raise StubLLMError("Simulated LLM failure")
+        return AIMessage(content=content, usage_metadata=_usage(prompt_text, content))
+
+    def invoke(self, prompt, **kwargs) -> AIMessage:
+        prompt_text, delay, content = self._plan(prompt)
+        time.sleep(delay)
+        return self._message(prompt_text, content)
+
+    async def ainvoke(self, prompt, **kwargs) -> AIMessage:
+        prompt_text, delay, content = self._plan(prompt)
+        await asyncio.sleep(delay)
+        return self._message(prompt_text, content)
+
+    async def astream(self, prompt, **kwargs):
+        prompt_text, delay, content = self._plan(prompt)
+        # half the latency before the first token, the rest spread over the stream
+        await asyncio.sleep(delay / 2)
+        message = self._message(prompt_text, content)
+        pieces = _chunks(message.content)
+        for i, piece in enumerate(pieces):
+            await asyncio.sleep(delay / 2 / len(pieces))
+            last = i == len(pieces) - 1
+            yield AIMessageChunk(
+                content=piece,
+                usage_metadata=message.usage_metadata if last else None,
+            )
+
+
+# ------------------ Record / replay ------------------
+
+class CassetteChatModel:
+    """
+    Records real responses to a JSONL cassette, or replays them offline.
+
+    Entries are keyed by (model, prompt). A prompt seen several times
+    replays its recorded responses in order, wrapping around.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "replay",
+        inner: Any = None,
+        replay_latency: bool = False,
+        model_name: Optional[str] = None,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("Recording needs an inner chat model")
+
+        self.path = path
+        self.mode = mode
+        self.inner = inner
+        self.replay_latency = replay_latency
+        self.model_name = model_name or getattr(inner, "model_name", settings.MODEL_NAME)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._replayed: Dict[str, int] = defaultdict(int)
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]].append(entry)
+
+    def _key(self, prompt_text: str) -> str:
+        raw = f"{self.model_name}\n{prompt_text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _record(self, prompt_text: str, content: str, usage: Optional[Dict], latency: float):
+        entry = {
+            "key": self._key(prompt_text),
+            "model": self.model_name,
+            "prompt": prompt_text,
+            "content": content,
+            "usage": usage,
+            "latency": round(latency, 4),
+        }
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._entries[entry["key"]].append(entry)
+
+    def _replay(self, prompt_text: str) -> Dict[str, Any]:
+        key = self._key(prompt_text)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(
+                    f"No recorded response for prompt in {self.path}"
+                )
+            entry = entries[self._replayed[key] % len(entries)]
+            self._replayed[key] += 1
+        return entry
+
+    @staticmethod
+    def _message(entry: Dict[str, Any]) -> AIMessage:
+        return AIMessage(content=entry["content"], usage_metadata=entry.get("usage"))
+
+    def invoke(self, prompt, **kwargs) -> AIMessage:
+        prompt_text = _prompt_text(prompt)
+        if self.mode == "replay":
+            entry = self._replay(prompt_text)
+            if self.replay_latency:
+                time.sleep(entry.get("latency", 0))
+            return self._message(entry)
+
+        started = time.perf_counter()
+        response = self.inner.invoke(prompt, **kwargs)
+        self._record(
+            prompt_text, response.content,
+            getattr(response, "usage_metadata", None),
+            time.perf_counter() - started,
+        )
+        return response
+
+    async def ainvoke(self, prompt, **kwargs) -> AIMessage:
+        prompt_text = _prompt_text(prompt)
+        if self.mode == "replay":
+            entry = self._replay(prompt_text)
+            if self.replay_latency:
+                await asyncio.sleep(entry.get("latency", 0))
+            return self._message(entry)
+
+        started = time.perf_counter()
+        response = await self.inner.ainvoke(prompt, **kwargs)
+        self._record(
+            prompt_text, response.content,
+            getattr(response, "usage_metadata", None),
+            time.perf_counter() - started,
+        )
+        return response
+
+    async def astream(self, prompt, **kwargs):
+        prompt_text = _prompt_text(prompt)
+        if self.mode == "replay":
+            entry = self._replay(prompt_text)
+            pieces = _chunks(entry["content"])
+            for i, piece in enumerate(pieces):
+                if self.replay_latency:
+                    await asyncio.sleep(entry.get("latency", 0) / len(pieces))
+                last = i == len(pieces) - 1
+                yield AIMessageChunk(
+                    content=piece,
+                    usage_metadata=entry.get("usage") if last else None,
+                )
+            return
+
+        started = time.perf_counter()
+        parts = []
+        usage = None
+        async for chunk in self.inner.astream(prompt, **kwargs):
+            parts.append(chunk.content)
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk
+        self._record(prompt_text, "".join(parts), usage, time.perf_counter() - started)
+
+
+# ------------------ Factory ------------------
+
+def create_groq_chat_model(
+    model: Optional[str] = None,
+    http_client: Any = None,
+    http_async_client: Any = None,
+):
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        api_key=settings.GROQ_API_KEY,
+        model=model or settings.MODEL_NAME,
+        temperature=settings.TEMPERATURE,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
+
+
+def create_chat_model(
+    backend: Optional[str] = None,
+    model: Optional[str] = None,
+    http_client: Any = None,
+    http_async_client: Any = None,
+):
+    """
+    Build the chat model for ``backend`` (default: LLM_BACKEND setting).
+
+    ``http_client`` / ``http_async_client`` are shared httpx clients for
+    the HTTP backends; ChatGroq builds its own when they are omitted.
+    """
+    backend = (backend or settings.LLM_BACKEND).lower()
+
+    if backend == "groq":
+        return create_groq_chat_model(model, http_client, http_async_client)
+    if backend == "stub":
+        return StubChatModel(
+            latency=settings.LLM_STUB_LATENCY_SECONDS,
+            latency_jitter=settings.LLM_STUB_LATENCY_JITTER_SECONDS,
+            failure_rate=settings.LLM_STUB_FAILURE_RATE,
+            seed=settings.LLM_STUB_SEED,
+            model_name=model or settings.MODEL_NAME,
+        )
+    if backend == "record":
+        return CassetteChatModel(
+            settings.LLM_CASSETTE_PATH, mode="record",
+            inner=create_groq_chat_model(model, http_client, http_async_client),
+            model_name=model or settings.MODEL_NAME,
+        )
+    if backend == "replay":
+        return CassetteChatModel(
+            settings.LLM_CASSETTE_PATH, mode="replay",
+            replay_latency=settings.LLM_CASSETTE_REPLAY_LATENCY,
+            model_name=model or settings.MODEL_NAME,
+        )
+
+    raise ValueError(f"Unknown LLM_BACKEND: {backend}")
@@ -0,0 +1,171 @@
+"""
+LLM Circuit Breaker
+===================
+Stops question generation from hammering a failing upstream.
+
+- CLOSED: calls go through; ``failure_threshold`` consecutive failed
+  calls (errors, timeouts, 429s) open the circuit
+- OPEN: no call is started for ``open_seconds``; QuestionGenerator
+  raises CircuitOpenError instead of retrying, and ExamService serves
+  already generated questions (pool, question cache) or fails fast
+  with 503 and Retry-After
+- HALF_OPEN: after the cool-down up to ``half_open_max_calls`` probe
+  calls are let through; a success closes the circuit, a failure opens
+  it again
+
+QuestionGenerator attaches its breaker as an observer of every LLMCall
+it starts, so a breaker only sees the calls made through it. A call
+that returned a response counts as a success even if its output failed
+validation: the upstream is reachable.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.llm.usage import CALL_ERROR, CANCELLED, LLMCall
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The LLM circuit is open; no call was made"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            f"LLM temporarily unavailable (circuit open), retry in {retry_after:.0f}s"
+        )
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker around the LLM call path"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def _refresh(self) -> None:
+        # OPEN turns HALF_OPEN once the cool-down is over
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+            logger.info("LLM circuit half-open: probing upstream")
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes = 0
+        self.times_opened += 1
+        logger.warning(
+            f"LLM circuit open after {self._failures} failed calls; "
+            f"pausing calls for {self.open_seconds:.0f}s"
+        )
+
+    def _retry_after(self) -> float:
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def is_open(self) -> bool:
+        """True while calls are refused (open, or half-open with all probes out)"""
+        with self._lock:
+            self._refresh()
+            return self._state == OPEN or (
+                self._state == HALF_OPEN and self._probes >= self.half_open_max_calls
+            )
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe call through"""
+        with self._lock:
+            self._refresh()
+            return self._retry_after() if self._state == OPEN else 0.0
+
+    def before_call(self) -> None:
+        """Admit a call, or raise CircuitOpenError"""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self._retry_after() if self._state == OPEN else 1.0)
+
+    def observe(self, call: LLMCall) -> None:
+        """Record a finished call"""
+        with self._lock:
+            self._refresh()
+            if call.outcome == CANCELLED:
+                if self._state == HALF_OPEN and self._probes:
+                    self._probes -= 1
+                return
+
+            if call.outcome != CALL_ERROR:
+                if self._state == HALF_OPEN:
+                    logger.info("LLM circuit closed: upstream recovered")
+                self._state = CLOSED
+                self._failures = 0
+                return
+
+            self._failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._open()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return {
+                "state": self._state,
+                "consecutiveFailures": self._failures,
+                "failureThreshold": self.failure_threshold,
+                "retryAfterSeconds": round(self._retry_after(), 3) if self._state == OPEN else 0.0,
+                "timesOpened": self.times_opened,
+                "rejectedCalls": self.rejected,
+            }
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> Optional[CircuitBreaker]:
+    """Return the process-wide LLM circuit breaker (None when disabled)"""
+    global _breaker
+    if not settings.CIRCUIT_BREAKER_ENABLED:
+        return None
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker(
+                    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                    open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+                    half_open_max_calls=settings.CIRCUIT_HALF_OPEN_MAX_CALLS,
+                )
+    return _breaker
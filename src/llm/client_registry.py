@@ -0,0 +1,246 @@
+"""
+LLM Client Registry
+===================
+Process-wide home of the chat-model clients.
+
+Every ``get_groq_llm()`` caller (ExamService, the Streamlit QuizManager,
+question pools) gets the same ScheduledLLM per (backend, model), built
+lazily on first use. Groq-backed clients share one pooled HTTP transport
+with keep-alive, so TLS sessions and connections are reused instead of
+being set up per QuestionGenerator.
+
+The async transport keeps one connection pool per event loop: pooled
+connections are bound to the loop that opened them, and sync callers
+run exams on short-lived loops (``ExamService._run_sync``).
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.llm.backends import HTTP_BACKENDS, create_chat_model
+from src.llm.scheduler import ScheduledLLM, get_llm_scheduler
+
+logger = get_logger(__name__)
+
+# httpcore trace event emitted once per newly opened connection
+_CONNECT_EVENT = "connection.connect_tcp.complete"
+
+
+class ConnectionStats:
+    """Requests sent vs connections opened, across sync and async clients"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def connection(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            requests, opened = self.requests, self.connections_opened
+        reused = max(0, requests - opened)
+        return {
+            "requests": requests,
+            "connectionsOpened": opened,
+            "reusedRequests": reused,
+            "reuseRatio": round(reused / requests, 3) if requests else 0.0,
+        }
+
+
+class _CountingTransport(httpx.BaseTransport):
+    """Pooled sync transport that counts requests and new connections"""
+
+    def __init__(self, stats: ConnectionStats, limits: httpx.Limits):
+        self._stats = stats
+        self._inner = httpx.HTTPTransport(limits=limits)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._stats.request()
+        previous = request.extensions.get("trace")
+
+        def trace(name, info):
+            if name == _CONNECT_EVENT:
+                self._stats.connection()
+            if previous is not None:
+                previous(name, info)
+
+        request.extensions["trace"] = trace
+        return self._inner.handle_request(request)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class _LoopLocalAsyncTransport(httpx.AsyncBaseTransport):
+    """Pooled async transport with one connection pool per event loop"""
+
+    def __init__(self, stats: ConnectionStats, limits: httpx.Limits):
+        self._stats = stats
+        self._limits = limits
+        self._lock = threading.Lock()
+        self._transports = weakref.WeakKeyDictionary()
+
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(limits=self._limits)
+                self._transports[loop] = transport
+            return transport
+
+    @property
+    def loops(self) -> int:
+        with self._lock:
+            return len(self._transports)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._stats.request()
+        previous = request.extensions.get("trace")
+
+        async def trace(name, info):
+            if name == _CONNECT_EVENT:
+                self._stats.connection()
+            if previous is not None:
+                await previous(name, info)
+
+        request.extensions["trace"] = trace
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.pop(loop, None)
+        if transport is not None:
+            await transport.aclose()
+
+
+class LLMClientRegistry:
+    """Lazily built, thread-safe chat models and HTTP clients for the process"""
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 60.0,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.connection_stats = ConnectionStats()
+
+        self._lock = threading.RLock()
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+        self._async_transport: Optional[_LoopLocalAsyncTransport] = None
+        self._models: Dict[Tuple[str, str], ScheduledLLM] = {}
+
+    def http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    self._http_client = httpx.Client(
+                        transport=_CountingTransport(self.connection_stats, self.limits),
+                        timeout=self.timeout,
+                    )
+        return self._http_client
+
+    def http_async_client(self) -> httpx.AsyncClient:
+        if self._http_async_client is None:
+            with self._lock:
+                if self._http_async_client is None:
+                    self._async_transport = _LoopLocalAsyncTransport(
+                        self.connection_stats, self.limits
+                    )
+                    self._http_async_client = httpx.AsyncClient(
+                        transport=self._async_transport,
+                        timeout=self.timeout,
+                    )
+        return self._http_async_client
+
+    def get(self, backend: Optional[str] = None, model: Optional[str] = None) -> ScheduledLLM:
+        """Shared chat model for (backend, model), behind the LLM scheduler"""
+        backend = (backend or settings.LLM_BACKEND).lower()
+        model = model or settings.MODEL_NAME
+        key = (backend, model)
+
+        llm = self._models.get(key)
+        if llm is None:
+            with self._lock:
+                llm = self._models.get(key)
+                if llm is None:
+                    http_clients = {}
+                    if backend in HTTP_BACKENDS:
+                        http_clients = {
+                            "http_client": self.http_client(),
+                            "http_async_client": self.http_async_client(),
+                        }
+                    llm = ScheduledLLM(
+                        create_chat_model(backend, model, **http_clients),
+                        get_llm_scheduler(),
+                    )
+                    self._models[key] = llm
+                    logger.info(f"Created shared LLM client for {backend}/{model}")
+        return llm
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": sorted("/".join(key) for key in self._models),
+            "maxConnections": self.limits.max_connections,
+            "maxKeepaliveConnections": self.limits.max_keepalive_connections,
+            "eventLoops": self._async_transport.loops if self._async_transport else 0,
+            **self.connection_stats.snapshot(),
+        }
+
+    def close(self) -> None:
+        """Close the sync HTTP client and forget every model"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            self._http_async_client = None
+            self._async_transport = None
+            self._models.clear()
+
+    async def aclose(self) -> None:
+        """Also release the running loop's async connections, then close()"""
+        transport = self._async_transport
+        if transport is not None:
+            await transport.aclose()
+        self.close()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> LLMClientRegistry:
+    """Return the process-wide LLM client registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMClientRegistry(
+                    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                    timeout=settings.LLM_HTTP_TIMEOUT_SECONDS,
+                )
+    return _registry
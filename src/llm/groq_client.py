@@ -1,9 +1,5 @@
-from langchain_groq import ChatGroq
-from src.config.settings import settings
+from src.llm.client_registry import get_client_registry
 
 def get_groq_llm():
-    return ChatGroq(
-        api_key = settings.GROQ_API_KEY,
-        model = settings.MODEL_NAME,
-        temperature=settings.TEMPERATURE
-    )
\ No newline at end of file
+    """Shared chat model for the configured LLM_BACKEND, behind the LLM scheduler"""
+    return get_client_registry().get()
@@ -0,0 +1,217 @@
+"""
+Latency-Aware Model Routing
+===========================
+Chooses which Groq model serves each question-generation call when
+several are configured (``LLM_MODELS``, smallest/fastest first):
+
+- INTERACTIVE calls (create-test, streaming) go to the healthy model
+  with the lowest smoothed latency. Models not measured yet are tried
+  first, in configured order.
+- BACKGROUND calls (pool refills) go to the largest healthy model.
+
+Every finished LLM call is fed back through the usage listeners: the
+router keeps a latency EWMA, a window of recent validation results and
+a count of consecutive call errors per model. A model whose latency
+spikes, whose recent output keeps failing validation, or whose calls
+keep erroring is taken out of rotation for a cooldown; the next call
+(including the retry of the failed attempt) fails over to another
+model. After the cooldown it is probed again with fresh statistics.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.llm.client_registry import get_client_registry
+from src.llm.scheduler import BACKGROUND, INTERACTIVE, current_priority
+from src.llm.usage import CALL_ERROR, CANCELLED, OK, PARTIAL, LLMCall, add_call_listener
+
+logger = get_logger(__name__)
+
+EWMA_ALPHA = 0.3
+
+
+class ModelHealth:
+    """Live statistics of one model"""
+
+    def __init__(self, name: str, window: int):
+        self.name = name
+        self.window = window
+        self.latency_ewma: Optional[float] = None
+        self.results = deque(maxlen=window)  # True: output failed validation
+        self.call_errors = 0
+        self.calls = 0
+        self.routed = 0
+        self.ejections = 0
+        self.unhealthy_until = 0.0
+        self.reason: Optional[str] = None
+
+    def failure_rate(self) -> float:
+        return sum(self.results) / len(self.results) if self.results else 0.0
+
+    def eject(self, reason: str, cooldown: float) -> None:
+        self.unhealthy_until = time.monotonic() + cooldown
+        self.reason = reason
+        self.ejections += 1
+        # probe with fresh statistics once the cooldown is over
+        self.latency_ewma = None
+        self.results = deque(maxlen=self.window)
+        self.call_errors = 0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy(now),
+            "reason": self.reason if not self.healthy(now) else None,
+            "latencyEwmaSeconds": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "validationFailureRate": round(self.failure_rate(), 3),
+            "consecutiveCallErrors": self.call_errors,
+            "calls": self.calls,
+            "routed": self.routed,
+            "ejections": self.ejections,
+        }
+
+
+class ModelRouter:
+    """Routes calls between ``models`` (smallest/fastest first, largest last)"""
+
+    def __init__(
+        self,
+        models: List[str],
+        llm_factory: Callable[[str], Any],
+        latency_target: float = 10.0,
+        spike_factor: float = 2.0,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_samples: int = 5,
+        max_call_errors: int = 3,
+        cooldown: float = 60.0,
+    ):
+        if not models:
+            raise ValueError("ModelRouter needs at least one model")
+        self.models = list(models)
+        self.llm_factory = llm_factory
+        self.latency_target = latency_target
+        self.spike_factor = spike_factor
+        self.failure_rate = failure_rate
+        self.min_samples = min_samples
+        self.max_call_errors = max_call_errors
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._health = {name: ModelHealth(name, window) for name in self.models}
+
+    def _ranked(self, priority: str) -> List[str]:
+        now = time.monotonic()
+        healthy = [m for m in self.models if self._health[m].healthy(now)]
+        if not healthy:
+            # everything is cooling down: use whichever recovers first
+            return [min(self.models, key=lambda m: self._health[m].unhealthy_until)]
+
+        if priority == BACKGROUND:
+            return list(reversed(healthy))
+
+        # unmeasured models first (configured order), then by latency
+        order = {m: i for i, m in enumerate(self.models)}
+        return sorted(
+            healthy,
+            key=lambda m: (
+                self._health[m].latency_ewma is not None,
+                self._health[m].latency_ewma or 0.0,
+                order[m],
+            ),
+        )
+
+    def choose(self, priority: Optional[str] = None) -> Tuple[str, Any]:
+        """Return (model name, chat model) for a call in ``priority``'s lane"""
+        priority = priority or current_priority()
+        with self._lock:
+            name = self._ranked(priority)[0]
+            self._health[name].routed += 1
+        return name, self.llm_factory(name)
+
+    def observe(self, call: LLMCall) -> None:
+        """Update the model's health from a finished call"""
+        health = self._health.get(call.model)
+        if health is None or call.outcome == CANCELLED:
+            return
+
+        with self._lock:
+            health.calls += 1
+            if call.outcome == CALL_ERROR:
+                health.call_errors += 1
+                if health.call_errors >= self.max_call_errors:
+                    self._eject(health, "call_errors")
+                return
+
+            health.call_errors = 0
+            latency = call.latency or 0.0
+            if health.latency_ewma is None:
+                health.latency_ewma = latency
+            else:
+                health.latency_ewma += EWMA_ALPHA * (latency - health.latency_ewma)
+            health.results.append(call.outcome not in (OK, PARTIAL))
+
+            if latency > self.latency_target * self.spike_factor or (
+                health.latency_ewma > self.latency_target
+            ):
+                self._eject(health, "latency")
+            elif (
+                len(health.results) >= self.min_samples
+                and health.failure_rate() >= self.failure_rate
+            ):
+                self._eject(health, "validation_failures")
+
+    def _eject(self, health: ModelHealth, reason: str) -> None:
+        # never leave the router with no model in rotation
+        now = time.monotonic()
+        if not any(h.healthy(now) for h in self._health.values() if h is not health):
+            return
+        health.eject(reason, self.cooldown)
+        logger.warning(
+            f"Model {health.name} taken out of rotation for {self.cooldown:.0f}s ({reason})"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "models": {m: self._health[m].to_dict(now) for m in self.models},
+                "interactive": self._ranked(INTERACTIVE)[0],
+                "background": self._ranked(BACKGROUND)[0],
+            }
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> Optional[ModelRouter]:
+    """
+    Return the process-wide model router, or None when fewer than two
+    models are configured in LLM_MODELS
+    """
+    global _router
+    if len(settings.LLM_MODELS) < 2:
+        return None
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                registry = get_client_registry()
+                _router = ModelRouter(
+                    settings.LLM_MODELS,
+                    lambda model: registry.get(model=model),
+                    latency_target=settings.LLM_LATENCY_TARGET_SECONDS,
+                    spike_factor=settings.MODEL_ROUTER_SPIKE_FACTOR,
+                    failure_rate=settings.MODEL_ROUTER_FAILURE_RATE,
+                    window=settings.MODEL_ROUTER_WINDOW,
+                    min_samples=settings.MODEL_ROUTER_MIN_SAMPLES,
+                    max_call_errors=settings.MODEL_ROUTER_MAX_CALL_ERRORS,
+                    cooldown=settings.MODEL_ROUTER_COOLDOWN_SECONDS,
+                )
+                add_call_listener(_router.observe)
+    return _router
@@ -0,0 +1,388 @@
+"""
+LLM Scheduler
+=============
+Shared admission point for every call made through ``get_groq_llm()``.
+
+- Token buckets for requests-per-minute and tokens-per-minute limits
+- Priority lanes: interactive calls (create-test) go ahead of background
+  ones (pool refills), which may only use a share of the concurrency
+- AIMD adaptive concurrency: additive increase on healthy calls,
+  multiplicative decrease on 429s and on calls slower than the target
+- Jittered exponential backoff for retries and 429 cool-downs
+
+Waiting is done by short polling so the same scheduler serves async
+callers and sync callers (scripts, Streamlit) from any thread.
+"""
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run the enclosed LLM calls in the given lane (INTERACTIVE or BACKGROUND)"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def estimate_tokens(prompt_text: str) -> int:
+    """Rough prompt size (~4 chars per token) plus the expected completion"""
+    return len(str(prompt_text)) // 4 + settings.LLM_COMPLETION_TOKEN_ESTIMATE
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return "RateLimit" in type(error).__name__ or "429" in str(error)[:200]
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Retry-After header of a 429 response, if the client exposed it"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``per_minute / 60`` per second"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 when they are now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, amount: float, now: float) -> None:
+        """Debit (or, for negative amounts, refund) tokens; the balance may go negative"""
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class Ticket:
+    """One granted LLM call; report actual token usage through ``usage_tokens``"""
+
+    __slots__ = ("priority", "tokens", "started", "waited", "usage_tokens")
+
+    def __init__(self, priority: str, tokens: int, waited: float):
+        self.priority = priority
+        self.tokens = tokens
+        self.waited = waited
+        self.started = time.monotonic()
+        self.usage_tokens: Optional[int] = None
+
+
+class LLMScheduler:
+    """Rate-limit-aware, priority-laned, adaptively concurrent LLM call gate"""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        background_share: float = 0.5,
+        latency_target: float = 10.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        poll_interval: float = 0.02,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.background_share = background_share
+        self.latency_target = latency_target
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._cooldown_until = 0.0
+        self._consecutive_rate_limits = 0
+        self.in_flight = 0
+        self._lane_in_flight = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.wait_seconds = {INTERACTIVE: 0.0, BACKGROUND: 0.0}
+        self.rate_limited = 0
+        self.slow_calls = 0
+        self.errors = 0
+        self.latency_ewma: Optional[float] = None
+
+    # ------------------ Backoff ------------------
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry number ``attempt`` (0-based)"""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    # ------------------ Admission ------------------
+
+    def _try_acquire(self, priority: str, tokens: int) -> Tuple[Optional[Ticket], float]:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._cooldown_until:
+                return None, self._cooldown_until - now
+
+            if priority == BACKGROUND and self._waiting[INTERACTIVE] > 0:
+                return None, self.poll_interval
+
+            limit = max(self.min_concurrency, int(self.limit))
+            if self.in_flight >= limit:
+                return None, self.poll_interval
+            if priority == BACKGROUND:
+                background_limit = max(1, int(limit * self.background_share))
+                if self._lane_in_flight[BACKGROUND] >= background_limit:
+                    return None, self.poll_interval
+
+            wait = max(
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(tokens, now),
+            )
+            if wait > 0:
+                return None, wait
+
+            self.requests.take(1, now)
+            self.tokens.take(tokens, now)
+            self.in_flight += 1
+            self._lane_in_flight[priority] += 1
+            self.granted[priority] += 1
+            return Ticket(priority, tokens, 0.0), 0.0
+
+    def _wait_started(self, priority: str) -> float:
+        with self._lock:
+            self._waiting[priority] += 1
+        return time.monotonic()
+
+    def _wait_finished(self, priority: str, started: float, ticket: Optional[Ticket]) -> None:
+        waited = time.monotonic() - started
+        with self._lock:
+            self._waiting[priority] -= 1
+            if ticket is not None:
+                self.wait_seconds[priority] += waited
+        if ticket is not None:
+            ticket.waited = waited
+
+    async def acquire(self, priority: Optional[str] = None, tokens: int = 0) -> Ticket:
+        priority = priority or current_priority()
+        started = self._wait_started(priority)
+        ticket = None
+        try:
+            while ticket is None:
+                ticket, wait = self._try_acquire(priority, tokens)
+                if ticket is None:
+                    await asyncio.sleep(min(wait, self.poll_interval * 10))
+            return ticket
+        finally:
+            self._wait_finished(priority, started, ticket)
+
+    def acquire_blocking(self, priority: Optional[str] = None, tokens: int = 0) -> Ticket:
+        priority = priority or current_priority()
+        started = self._wait_started(priority)
+        ticket = None
+        try:
+            while ticket is None:
+                ticket, wait = self._try_acquire(priority, tokens)
+                if ticket is None:
+                    time.sleep(min(wait, self.poll_interval * 10))
+            return ticket
+        finally:
+            self._wait_finished(priority, started, ticket)
+
+    def release(self, ticket: Ticket, error: Optional[BaseException] = None) -> None:
+        """Return the slot and feed the outcome into the AIMD controller"""
+        now = time.monotonic()
+        latency = now - ticket.started
+        with self._lock:
+            self.in_flight -= 1
+            self._lane_in_flight[ticket.priority] -= 1
+
+            if ticket.usage_tokens is not None:
+                # settle the estimate against what the call really used
+                self.tokens.take(ticket.usage_tokens - ticket.tokens, now)
+
+            if error is not None and is_rate_limit_error(error):
+                self.rate_limited += 1
+                self._consecutive_rate_limits += 1
+                self.limit = max(float(self.min_concurrency), self.limit / 2)
+                cooldown = retry_after_seconds(error)
+                if cooldown is None:
+                    cooldown = self.backoff_delay(self._consecutive_rate_limits)
+                self._cooldown_until = max(self._cooldown_until, now + cooldown)
+                logger.warning(
+                    f"LLM rate limited; concurrency -> {self.limit:.1f}, "
+                    f"cooling down {cooldown:.2f}s"
+                )
+                return
+
+            if error is not None:
+                self.errors += 1
+                return
+
+            self._consecutive_rate_limits = 0
+            self.latency_ewma = (
+                latency if self.latency_ewma is None
+                else 0.8 * self.latency_ewma + 0.2 * latency
+            )
+            if latency > self.latency_target:
+                self.slow_calls += 1
+                self.limit = max(float(self.min_concurrency), self.limit * 0.9)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0, priority: Optional[str] = None):
+        ticket = await self.acquire(priority, tokens)
+        try:
+            yield ticket
+        except Exception as e:
+            self.release(ticket, e)
+            raise
+        except BaseException:
+            self.release(ticket)
+            raise
+        else:
+            self.release(ticket)
+
+    @contextmanager
+    def slot_blocking(self, tokens: int = 0, priority: Optional[str] = None):
+        ticket = self.acquire_blocking(priority, tokens)
+        try:
+            yield ticket
+        except Exception as e:
+            self.release(ticket, e)
+            raise
+        except BaseException:
+            self.release(ticket)
+            raise
+        else:
+            self.release(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "concurrencyLimit": round(self.limit, 2),
+                "maxConcurrency": self.max_concurrency,
+                "inFlight": self.in_flight,
+                "inFlightByLane": dict(self._lane_in_flight),
+                "waitingByLane": dict(self._waiting),
+                "grantedByLane": dict(self.granted),
+                "waitSecondsByLane": {
+                    lane: round(seconds, 3) for lane, seconds in self.wait_seconds.items()
+                },
+                "requestTokensAvailable": round(self.requests.tokens, 2),
+                "tpmTokensAvailable": round(self.tokens.tokens, 1),
+                "coolingDownSeconds": round(max(0.0, self._cooldown_until - now), 3),
+                "rateLimited": self.rate_limited,
+                "slowCalls": self.slow_calls,
+                "errors": self.errors,
+                "latencyEwmaSeconds": (
+                    round(self.latency_ewma, 3) if self.latency_ewma is not None else None
+                ),
+            }
+
+
+def _usage_tokens(message: Any) -> Optional[int]:
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens")
+    return None
+
+
+class ScheduledLLM:
+    """
+    Wraps a LangChain chat model so invoke / ainvoke / astream go through
+    the scheduler. Other attributes are forwarded to the wrapped model.
+    """
+
+    def __init__(self, llm: Any, scheduler: "LLMScheduler"):
+        self.llm = llm
+        self.scheduler = scheduler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def invoke(self, prompt, **kwargs):
+        with self.scheduler.slot_blocking(estimate_tokens(prompt)) as ticket:
+            response = self.llm.invoke(prompt, **kwargs)
+            ticket.usage_tokens = _usage_tokens(response)
+            return response
+
+    async def ainvoke(self, prompt, **kwargs):
+        async with self.scheduler.slot(estimate_tokens(prompt)) as ticket:
+            response = await self.llm.ainvoke(prompt, **kwargs)
+            ticket.usage_tokens = _usage_tokens(response)
+            return response
+
+    async def astream(self, prompt, **kwargs):
+        async with self.scheduler.slot(estimate_tokens(prompt)) as ticket:
+            async for chunk in self.llm.astream(prompt, **kwargs):
+                usage = _usage_tokens(chunk)
+                if usage is not None:
+                    ticket.usage_tokens = (ticket.usage_tokens or 0) + usage
+                yield chunk
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Return the process-wide LLM scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler(
+                    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+                    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+                    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                    min_concurrency=settings.LLM_MIN_CONCURRENCY,
+                    background_share=settings.LLM_BACKGROUND_SHARE,
+                    latency_target=settings.LLM_LATENCY_TARGET_SECONDS,
+                    backoff_base=settings.LLM_BACKOFF_BASE_SECONDS,
+                    backoff_max=settings.LLM_BACKOFF_MAX_SECONDS,
+                )
+    return _scheduler
@@ -0,0 +1,232 @@
+"""
+LLM Usage Accounting
+====================
+Structured record of every question-generation LLM call: model, prompt
+and completion tokens, latency, attempt number and how its output fared
+(parsed and accepted, rejected by validation, unparseable, failed call).
+
+Calls are recorded into:
+- process-wide histograms (latency, prompt and completion tokens) and
+  outcome counters
+- listeners such as the model router (per-model health)
+- the exam being created, when one is being tracked via
+  ``track_llm_usage()``; ExamService stores each exam's roll-up in the
+  usage ledger under its test ID
+
+The tracked exam travels in a context variable, so it follows the
+concurrent generation tasks of that exam without being passed around.
+"""
+
+import contextvars
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.common.metrics import get_histogram
+
+LATENCY_HISTOGRAM = "llm_call_latency_seconds"
+PROMPT_TOKENS_HISTOGRAM = "llm_call_prompt_tokens"
+COMPLETION_TOKENS_HISTOGRAM = "llm_call_completion_tokens"
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+# Call outcomes (parse failures use the JSONExtractionError kinds)
+OK = "ok"
+PARTIAL = "partial"
+INVALID = "invalid"
+CALL_ERROR = "call_error"
+CANCELLED = "cancelled"
+
+_collector: contextvars.ContextVar = contextvars.ContextVar("llm_usage", default=None)
+
+_outcomes = Counter()
+_outcomes_lock = threading.Lock()
+
+# callables notified of every finished call (e.g. the model router)
+_listeners: List[Callable[["LLMCall"], None]] = []
+
+
+class LLMCall:
+    """One LLM invocation; call ``finish`` once its outcome is known"""
+
+    __slots__ = (
+        "kind", "attempt", "model", "requested", "accepted",
+        "prompt_tokens", "completion_tokens", "started", "latency", "outcome",
+        "observers",
+    )
+
+    def __init__(
+        self,
+        kind: str,
+        attempt: int,
+        model: Optional[str] = None,
+        requested: int = 1,
+        observers: Tuple[Callable[["LLMCall"], None], ...] = (),
+    ):
+        self.kind = kind
+        self.attempt = attempt
+        self.model = model
+        self.requested = requested
+        self.accepted = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.started = time.perf_counter()
+        self.latency: Optional[float] = None
+        self.outcome: Optional[str] = None
+        # notified of this call only (e.g. the caller's circuit breaker)
+        self.observers = observers
+
+    def add_usage(self, message: Any) -> None:
+        """Add the token usage reported on a response or stream chunk"""
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            self.prompt_tokens += usage.get("input_tokens") or 0
+            self.completion_tokens += usage.get("output_tokens") or 0
+
+    def finish(self, outcome: str, accepted: int = 0) -> None:
+        if self.outcome is not None:
+            return
+        self.outcome = outcome
+        self.accepted = accepted
+        self.latency = time.perf_counter() - self.started
+        _record(self)
+        for observer in self.observers:
+            observer(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "attempt": self.attempt,
+            "model": self.model,
+            "requested": self.requested,
+            "accepted": self.accepted,
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+            "latencySeconds": round(self.latency, 3) if self.latency is not None else None,
+            "outcome": self.outcome,
+        }
+
+
+class UsageCollector:
+    """Calls made on behalf of one exam"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: List[LLMCall] = []
+
+    def add(self, call: LLMCall) -> None:
+        with self._lock:
+            self.calls.append(call)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self.calls)
+
+        prompt_tokens = sum(c.prompt_tokens for c in calls)
+        completion_tokens = sum(c.completion_tokens for c in calls)
+        return {
+            "calls": len(calls),
+            "retries": sum(1 for c in calls if c.attempt > 1),
+            "promptTokens": prompt_tokens,
+            "completionTokens": completion_tokens,
+            "totalTokens": prompt_tokens + completion_tokens,
+            "llmSeconds": round(sum(c.latency or 0 for c in calls), 3),
+            "questionsAccepted": sum(c.accepted for c in calls),
+            "outcomes": dict(Counter(c.outcome for c in calls)),
+            "models": sorted({c.model for c in calls if c.model}),
+        }
+
+    def details(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [c.to_dict() for c in self.calls]
+
+
+def _record(call: LLMCall) -> None:
+    get_histogram(LATENCY_HISTOGRAM).observe(call.latency)
+    if call.prompt_tokens or call.completion_tokens:
+        get_histogram(PROMPT_TOKENS_HISTOGRAM, TOKEN_BUCKETS).observe(call.prompt_tokens)
+        get_histogram(COMPLETION_TOKENS_HISTOGRAM, TOKEN_BUCKETS).observe(call.completion_tokens)
+    with _outcomes_lock:
+        _outcomes[call.outcome] += 1
+
+    collector = _collector.get()
+    if collector is not None:
+        collector.add(call)
+
+    for listener in list(_listeners):
+        listener(call)
+
+
+def add_call_listener(listener: Callable[[LLMCall], None]) -> None:
+    """Call ``listener(call)`` for every finished LLM call"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def call_outcomes() -> Dict[str, int]:
+    """Process-wide count of LLM calls per outcome"""
+    with _outcomes_lock:
+        return dict(_outcomes)
+
+
+@contextmanager
+def track_llm_usage(collector: Optional[UsageCollector] = None):
+    """Attribute the enclosed LLM calls (and tasks started inside) to one collector"""
+    collector = collector or UsageCollector()
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(token)
+
+
+class UsageLedger:
+    """Per-exam usage roll-ups by test ID, oldest evicted first"""
+
+    def __init__(self, max_exams: int = 1000):
+        self.max_exams = max_exams
+        self._lock = threading.Lock()
+        self._exams: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def store(
+        self, test_id: str, collector: UsageCollector, coalesced: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Save the collector's roll-up for ``test_id`` and return the summary.
+        A ``coalesced`` exam joined another request's generation: it is
+        recorded with no calls, the tokens being counted under that request.
+        """
+        if coalesced:
+            collector = UsageCollector()
+        summary = collector.summary()
+        with self._lock:
+            self._exams[test_id] = {
+                "testId": test_id,
+                **summary,
+                "coalesced": coalesced,
+                "callDetails": collector.details(),
+            }
+            self._exams.move_to_end(test_id)
+            while len(self._exams) > self.max_exams:
+                self._exams.popitem(last=False)
+        return summary
+
+    def get(self, test_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._exams.get(test_id)
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Return the process-wide usage ledger"""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = UsageLedger(settings.LLM_USAGE_MAX_EXAMS)
+    return _ledger
@@ -9,11 +9,11 @@ mcq_prompt_template = PromptTemplate(
         "- options: an array of exactly 4 possible answer strings\n"
         "- correct_answer: one of the options that is correct\n\n"
         "Example output:\n"
-        '[{\n'
+        '[{{\n'
         '    "question": "What is the capital of France?",\n'
         '    "options": ["London", "Berlin", "Paris", "Madrid"],\n'
         '    "correct_answer": "Paris"\n'
-        '}]\n\n'
+        '}}]\n\n'
         "Important: the entire response must be parsable as JSON."
     ),
     input_variables=["topic", "difficulty"]
@@ -27,11 +27,54 @@ fill_blank_prompt_template = PromptTemplate(
         "- question: a sentence containing _____ where the blank goes\n"
         "- answer: the correct word or phrase\n\n"
         "Example output:\n"
-        '[{\n'
+        '[{{\n'
         '    "question": "The capital of France is _____.",\n'
         '    "answer": "Paris"\n'
-        '}]\n\n'
+        '}}]\n\n'
         "Important: the entire response must be parsable as JSON."
     ),
     input_variables=["topic", "difficulty"]
-)
\ No newline at end of file
+)
+
+mcq_batch_prompt_template = PromptTemplate(
+    template=(
+        "Generate {count} distinct {difficulty} multiple-choice questions about {topic}.\n\n"
+        "Return ONLY a valid JSON array of {count} objects. Do not include explanations, markdown, backticks, or any extra text.\n"
+        "Each object must follow this exact schema with these fields:\n"
+        "- question: a clear, specific question string\n"
+        "- options: an array of exactly 4 possible answer strings\n"
+        "- correct_answer: one of the options that is correct\n\n"
+        "Example output for 2 questions:\n"
+        '[{{\n'
+        '    "question": "What is the capital of France?",\n'
+        '    "options": ["London", "Berlin", "Paris", "Madrid"],\n'
+        '    "correct_answer": "Paris"\n'
+        '}}, {{\n'
+        '    "question": "Which river flows through Cairo?",\n'
+        '    "options": ["Amazon", "Nile", "Danube", "Ganges"],\n'
+        '    "correct_answer": "Nile"\n'
+        '}}]\n\n'
+        "Important: the entire response must be parsable as JSON."
+    ),
+    input_variables=["topic", "difficulty", "count"]
+)
+
+fill_blank_batch_prompt_template = PromptTemplate(
+    template=(
+        "Generate {count} distinct {difficulty} fill-in-the-blank questions about {topic}.\n\n"
+        "Return ONLY a valid JSON array of {count} objects. Do not include explanations, markdown, backticks, or any extra text.\n"
+        "Each object must follow this schema:\n"
+        "- question: a sentence containing _____ where the blank goes\n"
+        "- answer: the correct word or phrase\n\n"
+        "Example output for 2 questions:\n"
+        '[{{\n'
+        '    "question": "The capital of France is _____.",\n'
+        '    "answer": "Paris"\n'
+        '}}, {{\n'
+        '    "question": "The _____ flows through Cairo.",\n'
+        '    "answer": "Nile"\n'
+        '}}]\n\n'
+        "Important: the entire response must be parsable as JSON."
+    ),
+    input_variables=["topic", "difficulty", "count"]
+)
@@ -3,54 +3,155 @@ Exam Routes
 ===========
 FastAPI endpoints for exam management:
 - Create test (Teacher)
+- Create test with streamed questions (Teacher)
+- Regenerate individual questions of a test (Teacher)
 - Get exam questions (Student)
 - Submit exam answers (Student)
 - View results (Teacher/Admin)
 """
 
-from fastapi import APIRouter, HTTPException, status
-from typing import Dict, Any
+import json
+import math
+import time
+from contextlib import nullcontext
+from fastapi import APIRouter, Header, HTTPException, Request, status
+from fastapi.responses import Response, StreamingResponse
+from typing import Dict, Any, Optional
 from src.schemas.create_test_schema import CreateTestSchema
 from src.schemas.submit_test_schema import SubmitTestSchema
+from src.schemas.regenerate_questions_schema import RegenerateQuestionsSchema
 from src.exams.exam_service import ExamService
+from src.exams.admission import AdmissionRejected, get_admission_controller
+from src.exams.student_view import etag_matches
 from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
+from src.common.executor import run_blocking
+from src.llm.circuit_breaker import CircuitOpenError
+from src.storage.in_memory_store import get_storage_backend
 
 router = APIRouter(prefix="/api", tags=["exams"])
 exam_service = ExamService()
 logger = get_logger(__name__)
 
 
+async def _with_storage(func, *args, **kwargs):
+    """
+    Run a synchronous service call that reads or writes storage: inline
+    for the in-memory store, on the blocking executor when the backend
+    does I/O, so the event loop is not held up by queries
+    """
+    if get_storage_backend().blocking:
+        return await run_blocking(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def _tenant(http_request: Request, teacher_id: Optional[str]) -> str:
+    """Admission-control tenant: the teacher ID, else the client address"""
+    if teacher_id:
+        return teacher_id
+    if http_request.client is not None:
+        return http_request.client.host
+    return "anonymous"
+
+
+def _too_many_requests(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """
+    Streaming response holding an admission slot until it is fully sent,
+    or abandoned (client gone before or during the body)
+    """
+
+    def __init__(self, *args, admission=None, tenant: str = "", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.admission = admission
+        self.tenant = tenant
+        self.admitted_at = time.perf_counter()
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self.admission is not None:
+                self.admission.release(self.tenant, time.perf_counter() - self.admitted_at)
+
+
 @router.post("/create-test", status_code=status.HTTP_201_CREATED)
-async def create_test(request: CreateTestSchema) -> Dict[str, Any]:
+async def create_test(
+    request: CreateTestSchema,
+    http_request: Request,
+    x_teacher_id: Optional[str] = Header(default=None)
+) -> Dict[str, Any]:
     """
     Create a new exam with AI-generated questions
 
     **Teacher Endpoint**
 
+    Requests are admitted per teacher (``X-Teacher-Id`` header, else the
+    client address) with fair queuing; responds 429 with Retry-After
+    when the generation queue is full.
+
     Request body:
     - topic: Subject topic (required)
     - difficulty: Easy, Medium, or Hard (optional, default: medium)
     - num_questions: 1-10 (optional, default: 5)
     - question_type: 'mcq' or 'fill_blank' (optional, default: mcq)
+    - hedged: tail-latency mode (optional, default: server setting)
+    - deadline_seconds: time budget (optional, default: server setting)
+    - coalesce: share the generation of identical concurrent requests
+      (optional, default: server setting)
+    - source: 'llm', 'bank' or 'mixed' (optional, default: server setting)
 
     Returns:
     - testId: Unique test identifier
     - totalQuestions: Number of questions generated
     - testLink: URL for students to access exam
+    - partial / missing: set when fewer questions than requested were
+      generated (e.g. the deadline was reached)
+    - degraded: previously generated questions were served because the
+      LLM circuit breaker is open
+    - coalesced: the questions came from an identical request already
+      in flight
+    - sources: number of questions from the bank, pool, LLM and fallback
+
+    Responds 503 with Retry-After while the circuit is open and no
+    previously generated question is available.
     """
     try:
         logger.info(f"Creating test with topic: {request.topic}")
 
-        result = exam_service.create_exam(
-            topic=request.topic,
-            difficulty=request.difficulty,
-            num_questions=request.num_questions,
-            question_type=request.question_type or "mcq"
-        )
+        admission = get_admission_controller()
+        tenant = _tenant(http_request, x_teacher_id)
+        async with admission.admit(tenant) if admission is not None else nullcontext():
+            result = await exam_service.acreate_exam(
+                topic=request.topic,
+                difficulty=request.difficulty,
+                num_questions=request.num_questions,
+                question_type=request.question_type or "mcq",
+                hedged=request.hedged,
+                deadline_seconds=request.deadline_seconds,
+                coalesce=request.coalesce,
+                source=request.source
+            )
 
         return result
 
+    except AdmissionRejected as e:
+        logger.warning(f"Create-test request from {tenant} not admitted: {e.reason}")
+        raise _too_many_requests(e)
+    except CircuitOpenError as e:
+        logger.error(f"LLM unavailable in create_test: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
     except CustomException as e:
         logger.error(f"Custom exception in create_test: {str(e)}")
         raise HTTPException(
@@ -65,8 +166,77 @@ async def create_test(request: CreateTestSchema) -> Dict[str, Any]:
         )
 
 
+@router.post("/create-test/stream", status_code=status.HTTP_200_OK)
+async def create_test_stream(
+    request: CreateTestSchema,
+    http_request: Request,
+    accept: Optional[str] = Header(default=None),
+    x_teacher_id: Optional[str] = Header(default=None)
+) -> StreamingResponse:
+    """
+    Create a new exam, streaming each question as soon as it is validated
+
+    **Teacher Endpoint**
+
+    Request body: same as POST /api/create-test (``hedged``, ``coalesce`` and
+    ``source`` do not apply)
+
+    Admitted like POST /api/create-test: responds 429 with Retry-After,
+    before any event is sent, when the generation queue is full. The
+    slot is held until the stream ends.
+
+    Response is NDJSON (one event per line), or Server-Sent Events when
+    the request sends ``Accept: text/event-stream``. Events:
+    - question: index and the validated question
+    - summary: testId, totalQuestions, testLink, partial, missing,
+      timeToFirstQuestionSeconds
+    - error: detail, when no question could be generated (plus
+      retryAfterSeconds while the LLM circuit breaker is open)
+    """
+    logger.info(f"Streaming test creation with topic: {request.topic}")
+    sse = "text/event-stream" in (accept or "")
+
+    admission = get_admission_controller()
+    tenant = _tenant(http_request, x_teacher_id)
+    if admission is not None:
+        try:
+            await admission.acquire(tenant)
+        except AdmissionRejected as e:
+            logger.warning(f"Create-test stream from {tenant} not admitted: {e.reason}")
+            raise _too_many_requests(e)
+
+    async def body():
+        try:
+            async for event in exam_service.astream_exam(
+                topic=request.topic,
+                difficulty=request.difficulty,
+                num_questions=request.num_questions,
+                question_type=request.question_type or "mcq",
+                deadline_seconds=request.deadline_seconds
+            ):
+                payload = json.dumps(event)
+                if sse:
+                    yield f"event: {event['event']}\ndata: {payload}\n\n"
+                else:
+                    yield payload + "\n"
+        except Exception as e:
+            logger.error(f"Unexpected error in create_test_stream: {str(e)}")
+            payload = json.dumps({"event": "error", "detail": "Internal server error"})
+            yield f"event: error\ndata: {payload}\n\n" if sse else payload + "\n"
+
+    return _AdmittedStreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        admission=admission,
+        tenant=tenant
+    )
+
+
 @router.get("/exam/{test_id}", status_code=status.HTTP_200_OK)
-async def get_exam(test_id: str) -> Dict[str, Any]:
+async def get_exam(
+    test_id: str,
+    if_none_match: Optional[str] = Header(default=None)
+) -> Response:
     """
     Retrieve exam questions for a student
 
@@ -75,19 +245,29 @@ async def get_exam(test_id: str) -> Dict[str, Any]:
     Path parameters:
     - test_id: The unique test identifier
 
+    Headers:
+    - If-None-Match: ETag of a copy the client already has (304 if current)
+
     Returns:
     - testId: Test identifier
     - topic: Subject topic
     - difficulty: Difficulty level
     - totalQuestions: Number of questions
     - questions: Array of questions (without correct answers)
+
+    The body is pre-rendered when the test is saved; the ETag header
+    changes whenever the questions do.
     """
     try:
         logger.info(f"Fetching exam: {test_id}")
 
-        result = exam_service.get_exam_questions(test_id)
+        view = await exam_service.aget_student_view(test_id)
 
-        return result
+        # no-cache: clients may keep the copy but revalidate each time
+        headers = {"ETag": view.etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, view.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=view.body, media_type="application/json", headers=headers)
 
     except CustomException as e:
         logger.error(f"Custom exception in get_exam: {str(e)}")
@@ -103,6 +283,53 @@ async def get_exam(test_id: str) -> Dict[str, Any]:
         )
 
 
+@router.post("/exam/{test_id}/regenerate", status_code=status.HTTP_200_OK)
+async def regenerate_questions(
+    test_id: str,
+    request: RegenerateQuestionsSchema
+) -> Dict[str, Any]:
+    """
+    Replace specific questions of an existing test in place
+
+    **Teacher Endpoint**
+
+    Path parameters:
+    - test_id: The unique test identifier
+
+    Request body:
+    - question_ids: Indexes of the questions to regenerate
+
+    Returns:
+    - replaced: Question IDs that got a new question
+    - notReplaced: Question IDs that could not be regenerated (kept as is)
+    - revision: New test revision; older submissions are marked stale
+    - questions: The new questions by question ID
+    """
+    if not await _with_storage(exam_service.exam_manager.test_exists, test_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+
+    try:
+        logger.info(f"Regenerating questions {request.question_ids} of exam: {test_id}")
+
+        return await exam_service.aregenerate_questions(test_id, request.question_ids)
+
+    except CustomException as e:
+        logger.error(f"Custom exception in regenerate_questions: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in regenerate_questions: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
 @router.post("/exam/{test_id}/submit", status_code=status.HTTP_200_OK)
 async def submit_exam(test_id: str, request: SubmitTestSchema) -> Dict[str, Any]:
     """
@@ -128,7 +355,8 @@ async def submit_exam(test_id: str, request: SubmitTestSchema) -> Dict[str, Any]
     try:
         logger.info(f"Submitting exam: {test_id} by student: {request.student_name}")
 
-        result = exam_service.evaluate_exam(
+        result = await _with_storage(
+            exam_service.evaluate_exam,
             test_id=test_id,
             student_name=request.student_name,
             answers=request.answers
@@ -168,7 +396,7 @@ async def get_results(test_id: str) -> Dict[str, Any]:
     try:
         logger.info(f"Fetching results for exam: {test_id}")
 
-        result = exam_service.get_exam_results(test_id)
+        result = await _with_storage(exam_service.get_exam_results, test_id)
 
         return result
 
@@ -0,0 +1,231 @@
+"""
+Metrics Routes
+==============
+Read-only operational endpoints for the question generation pipeline:
+- Question pool depth per (topic, difficulty, type)
+- LLM scheduler state (rate limits, lanes, adaptive concurrency)
+- Shared LLM clients and HTTP connection reuse
+- Per-model health used by latency-aware model routing
+- Create-test admission queue (depth, in-flight, rejections per tenant)
+- Question cache counters
+- Question bank size and draws
+- Test/submission storage backend (counts, approximate bytes per test,
+  evictions, pool, write batching)
+- Pre-rendered student exam views (entries, hits, renders)
+- Latency and token histograms (e.g. create-test time-to-first-question,
+  per-call LLM latency and tokens)
+- Per-exam LLM usage (tokens, calls, retries, outcomes) by test ID
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from typing import Dict, Any
+
+from src.common.metrics import export_histograms
+from src.exams.admission import get_admission_controller
+from src.exams.student_view import get_student_view_cache
+from src.generator.hedging import get_hedge_budget
+from src.generator.question_pool import get_question_pool
+from src.llm.circuit_breaker import get_circuit_breaker
+from src.llm.client_registry import get_client_registry
+from src.llm.model_router import get_model_router
+from src.llm.scheduler import get_llm_scheduler
+from src.llm.usage import call_outcomes, get_usage_ledger
+from src.storage.question_bank import get_question_bank
+from src.storage.question_cache import get_question_cache
+from src.storage.in_memory_store import get_storage_backend
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/pools", status_code=status.HTTP_200_OK)
+async def pool_metrics() -> Dict[str, Any]:
+    """
+    Pre-warmed question pool depth
+
+    Returns:
+    - enabled: Whether any hot topics are configured
+    - pools: Pool statistics including depth per key
+    """
+    pool = get_question_pool()
+    return {
+        "enabled": pool is not None,
+        "pools": pool.stats() if pool is not None else {},
+    }
+
+
+@router.get("/scheduler", status_code=status.HTTP_200_OK)
+async def scheduler_metrics() -> Dict[str, Any]:
+    """
+    Shared LLM scheduler state
+
+    Returns:
+    - scheduler: concurrency limit, in-flight/waiting/granted per lane,
+      rate-limit bucket levels, 429 and slow-call counters
+    - hedgeBudget: balance and granted/denied hedges of hedged generation
+    - circuitBreaker: state (closed/open/half_open), consecutive failures,
+      seconds until the next probe and rejected calls (null when disabled)
+    """
+    breaker = get_circuit_breaker()
+    return {
+        "scheduler": get_llm_scheduler().stats(),
+        "hedgeBudget": get_hedge_budget().stats(),
+        "circuitBreaker": breaker.stats() if breaker is not None else None,
+    }
+
+
+@router.get("/clients", status_code=status.HTTP_200_OK)
+async def client_metrics() -> Dict[str, Any]:
+    """
+    Shared LLM clients and HTTP connection reuse
+
+    Returns:
+    - clients: backend/model pairs built so far, pool limits, requests
+      sent, connections opened and the share of requests that reused one
+    """
+    return {"clients": get_client_registry().stats()}
+
+
+@router.get("/models", status_code=status.HTTP_200_OK)
+async def model_metrics() -> Dict[str, Any]:
+    """
+    Latency-aware model routing
+
+    Returns:
+    - enabled: Whether several models are configured in LLM_MODELS
+    - router: per-model health (latency EWMA, validation failure rate,
+      consecutive call errors, ejections) and the models currently
+      chosen for interactive and background calls
+    """
+    model_router = get_model_router()
+    return {
+        "enabled": model_router is not None,
+        "router": model_router.stats() if model_router is not None else {},
+    }
+
+
+@router.get("/admission", status_code=status.HTTP_200_OK)
+async def admission_metrics() -> Dict[str, Any]:
+    """
+    Create-test admission control, e.g. for autoscaling on queue depth
+
+    Returns:
+    - enabled: Whether admission control is enabled
+    - admission: in-flight and queued generations (overall and per
+      tenant), admitted/rejected counts and the current Retry-After
+      estimate; wait times are in the admission_wait_seconds histogram
+    """
+    controller = get_admission_controller()
+    return {
+        "enabled": controller is not None,
+        "admission": controller.stats() if controller is not None else {},
+    }
+
+
+@router.get("/cache", status_code=status.HTTP_200_OK)
+async def cache_metrics() -> Dict[str, Any]:
+    """
+    Question cache hit/miss/eviction counters
+
+    Returns:
+    - enabled: Whether the question cache is enabled
+    - cache: Cache statistics
+    """
+    cache = get_question_cache()
+    return {
+        "enabled": cache is not None,
+        "cache": cache.stats() if cache is not None else {},
+    }
+
+
+@router.get("/bank", status_code=status.HTTP_200_OK)
+async def bank_metrics() -> Dict[str, Any]:
+    """
+    Question bank counters
+
+    Returns:
+    - enabled: Whether the question bank is enabled
+    - bank: keys and questions loaded, questions added, duplicates
+      skipped, questions drawn and draws that came up short
+    """
+    bank = get_question_bank()
+    return {
+        "enabled": bank is not None,
+        "bank": bank.stats() if bank is not None else {},
+    }
+
+
+@router.get("/storage", status_code=status.HTTP_200_OK)
+async def storage_metrics() -> Dict[str, Any]:
+    """
+    Test and submission storage
+
+    Returns:
+    - backend: memory or sql
+    - storage: backend counters (tests and submissions held in memory,
+      approximate bytes, evictions and the largest tests; connection pool
+      status and group-commit batch sizes for sql)
+    """
+    backend = get_storage_backend()
+    return {"backend": backend.name, "storage": backend.stats()}
+
+
+@router.get("/storage/tests/{test_id}", status_code=status.HTTP_200_OK)
+async def storage_test_metrics(test_id: str) -> Dict[str, Any]:
+    """
+    Memory held by one test
+
+    Returns:
+    - resident: False when the test was spilled to disk
+    - submissions, approxBytes, idleSeconds
+    """
+    stats = get_storage_backend().test_stats(test_id)
+    if stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test not tracked by the storage backend"
+        )
+    return stats
+
+
+@router.get("/student-views", status_code=status.HTTP_200_OK)
+async def student_view_metrics() -> Dict[str, Any]:
+    """
+    Pre-rendered student exam views (GET /api/exam/{test_id})
+
+    Returns:
+    - views: entries and bytes held, hits (served without rendering),
+      renders and invalidations
+    """
+    return {"views": get_student_view_cache().stats()}
+
+
+@router.get("/latency", status_code=status.HTTP_200_OK)
+async def latency_metrics() -> Dict[str, Any]:
+    """
+    Latency and token histograms recorded by the service
+
+    Returns:
+    - histograms: count, sum, mean, p50/p95/p99 and cumulative buckets per histogram
+    - llmCallOutcomes: number of LLM calls per outcome (ok, partial,
+      invalid, call_error, cancelled, or the JSON parse failure kind)
+    """
+    return {"histograms": export_histograms(), "llmCallOutcomes": call_outcomes()}
+
+
+@router.get("/exams/{test_id}", status_code=status.HTTP_200_OK)
+async def exam_usage(test_id: str) -> Dict[str, Any]:
+    """
+    LLM usage of one exam's creation
+
+    Returns:
+    - calls, retries, prompt/completion/total tokens, summed LLM seconds,
+      outcome counts and models used
+    - callDetails: one entry per LLM call (attempt, tokens, latency, outcome)
+    """
+    usage = get_usage_ledger().get(test_id)
+    if usage is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No usage recorded for this exam"
+        )
+    return usage
@@ -26,6 +26,29 @@ class CreateTestSchema(BaseModel):
         default="mcq",
         description="Type of questions: 'mcq' or 'fill_blank'"
     )
+    hedged: Optional[bool] = Field(
+        default=None,
+        description="Tail-latency mode: over-provision and hedge slow LLM calls "
+                    "(default: server setting)"
+    )
+    deadline_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=300,
+        description="Time budget in seconds; questions collected by then are "
+                    "returned with partial=true (default: server setting)"
+    )
+    source: Optional[str] = Field(
+        default=None,
+        pattern="^(llm|bank|mixed)$",
+        description="'llm', 'bank' (question bank only, no LLM call) or 'mixed' "
+                    "(bank first, LLM for the shortfall) (default: server setting)"
+    )
+    coalesce: Optional[bool] = Field(
+        default=None,
+        description="Share the generation of identical concurrent requests; "
+                    "each still gets its own test ID (default: server setting)"
+    )
 
     class Config:
         example = {
@@ -0,0 +1,24 @@
+"""
+Regenerate Questions Schema
+===========================
+Pydantic model for replacing questions of an existing test
+"""
+
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class RegenerateQuestionsSchema(BaseModel):
+    """Schema for regenerating specific questions of a test"""
+
+    question_ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=10,
+        description="Indexes (questionId) of the questions to replace"
+    )
+
+    class Config:
+        example = {
+            "question_ids": [0, 3]
+        }
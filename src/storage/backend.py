@@ -0,0 +1,63 @@
+"""
+Storage Backend Interface
+=========================
+What ``src.storage.in_memory_store``'s functions (store_test, get_test,
+store_submission, get_submissions, test_exists) are delegated to.
+
+- ``InMemoryBackend`` (in_memory_store): per-process dicts, the default
+- ``SQLStorageBackend`` (sql_store): shared and durable, any SQLAlchemy
+  async URL; selected with STORAGE_BACKEND=sql
+
+Backends implement the synchronous methods; the ``a*`` counterparts are
+what async code awaits. Their default runs the sync method inline, which
+suits a dict-backed store; a backend doing I/O (``blocking = True``)
+overrides them so the event loop is never held up by a query.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+class StorageBackend:
+    """Tests by test ID, and the submissions of each test in order"""
+
+    name = "base"
+    # True when calls do I/O: sync callers on an event loop should go
+    # through run_blocking, async callers through the a* methods
+    blocking = False
+
+    def store_test(self, test_id: str, test_data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def get_test(self, test_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def store_submission(self, test_id: str, submission_data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def get_submissions(self, test_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def test_exists(self, test_id: str) -> bool:
+        return self.get_test(test_id) is not None
+
+    async def astore_test(self, test_id: str, test_data: Dict[str, Any]) -> None:
+        self.store_test(test_id, test_data)
+
+    async def aget_test(self, test_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_test(test_id)
+
+    async def astore_submission(self, test_id: str, submission_data: Dict[str, Any]) -> None:
+        self.store_submission(test_id, submission_data)
+
+    async def aget_submissions(self, test_id: str) -> List[Dict[str, Any]]:
+        return self.get_submissions(test_id)
+
+    def test_stats(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """Item counts and approximate size of one test, if the backend tracks them"""
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+    def close(self) -> None:
+        """Release connections / flush pending writes"""
@@ -8,40 +8,474 @@ In production, use a proper database (MongoDB, PostgreSQL, Firebase, etc.)
 
 Storage Structure:
 - TESTS: Dictionary mapping testId → test details with questions
-- SUBMISSIONS: Dictionary mapping testId → list of student submissions
+- SUBMISSIONS: Dictionary mapping testId → the test's submissions, held
+  column by column (src.storage.submission_table) and read back as dicts
+
+The module functions delegate to the configured storage backend
+(STORAGE_BACKEND): these dicts by default, or a shared SQL database
+(src.storage.sql_store) when several replicas must see the same tests.
+With STORAGE_WAL_ENABLED the dicts are made durable by a write-ahead
+log and snapshots (src.storage.wal_store). The dicts can be bounded:
+STORAGE_TEST_TTL_SECONDS, STORAGE_MEMORY_BUDGET_MB (LRU eviction) and
+STORAGE_SPILL_DIR (evicted tests go to disk instead of being dropped).
 """
 
+import hashlib
+import heapq
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.common.executor import run_blocking
+from src.common.logger import get_logger
+from src.config.settings import settings
+from src.storage.backend import StorageBackend
+from src.storage.submission_table import SubmissionTable
+
+logger = get_logger(__name__)
+
 # In-memory storage for tests
 # Format: {testId: {"topic": str, "difficulty": str, "questions": [...]}}
 TESTS = {}
 
 # In-memory storage for submissions
-# Format: {testId: [{"studentName": str, "answers": dict, "score": int, ...}]}
+# Format: {testId: SubmissionTable of {"studentName": str, "answers": dict, ...}}
 SUBMISSIONS = {}
 
 
+def new_submission_table(test_id: str, rows=()) -> SubmissionTable:
+    """An empty (or filled) submission table sized for the stored test's questions"""
+    test = TESTS.get(test_id) or {}
+    return SubmissionTable.from_rows(rows, width=len(test.get("questions") or ()))
+
+
+def approximate_size(value: Any) -> int:
+    """Approximate memory held by a JSON-like value (sys.getsizeof, recursively)"""
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        kind = type(item)
+        if kind is SubmissionTable:
+            size += item.nbytes()
+            continue
+        size += sys.getsizeof(item)
+        if kind is dict:
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif kind is list or kind is tuple:
+            stack.extend(item)
+    return size
+
+
+class InMemoryBackend(StorageBackend):
+    """
+    The module-level dicts: fast, per process, lost on restart
+
+    Optionally bounded:
+    - ttl: a test (with its submissions) is dropped this many seconds
+      after its last activity (store / read of it or its submissions)
+    - max_bytes: when the approximate size of everything held exceeds
+      this budget, the least recently active tests are evicted
+    - spill_dir: evicted tests are written there instead of dropped and
+      loaded back into memory on their next access. The store then does
+      file I/O (``blocking``): the a* methods run on the blocking
+      executor, and spill files are written after releasing the lock
+    """
+
+    name = "memory"
+
+    @property
+    def blocking(self) -> bool:
+        return bool(self.spill_dir)
+
+    def __init__(self, ttl: float = 0.0, max_bytes: int = 0, spill_dir: Optional[str] = None):
+        self.ttl = max(0.0, ttl)
+        self.max_bytes = max(0, max_bytes)
+        self.spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        # test ID → last activity (monotonic), least recently active first
+        self._activity: "OrderedDict[str, float]" = OrderedDict()
+        self._spilled: "OrderedDict[str, float]" = OrderedDict()
+        # evicted tests whose spill file is not written yet: read back
+        # from here, and written by the call that evicted them
+        self._spilling: Dict[str, Dict[str, Any]] = {}
+        self._unwritten: List[Tuple[str, Dict[str, Any]]] = []
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        # without a budget, tests are only sized when stats ask for it
+        self._unsized: Set[str] = set()
+        self.expirations = 0
+        self.evictions = 0
+        self.spills = 0
+        self.spill_loads = 0
+        self._reindex()
+
+    # ------------------ Accounting ------------------
+
+    def _reindex(self) -> None:
+        """Rebuild the accounting from the dicts (after a bulk load)"""
+        with self._lock:
+            now = time.monotonic()
+            self._activity = OrderedDict((test_id, now) for test_id in TESTS)
+            self._sizes = {}
+            self._bytes = 0
+            self._unsized = set(TESTS)
+            if self.max_bytes:
+                self._settle()
+
+    def _measure(self, test_id: str) -> int:
+        return approximate_size(TESTS.get(test_id)) + approximate_size(SUBMISSIONS.get(test_id))
+
+    def _settle(self) -> None:
+        """Size the tests changed since the last time"""
+        for test_id in self._unsized:
+            if test_id in self._activity:
+                size = self._measure(test_id)
+                self._bytes += size - self._sizes.get(test_id, 0)
+                self._sizes[test_id] = size
+        self._unsized.clear()
+
+    def _grow(self, test_id: str, size: int) -> None:
+        self._sizes[test_id] = self._sizes.get(test_id, 0) + size
+        self._bytes += size
+
+    def _touch(self, test_id: str) -> None:
+        self._activity[test_id] = time.monotonic()
+        self._activity.move_to_end(test_id)
+
+    def _expired(self, last_activity: float, now: float) -> bool:
+        return bool(self.ttl) and now - last_activity >= self.ttl
+
+    def _resident(self, test_id: str) -> bool:
+        """Whether the test is (now) in memory: expires or loads it back"""
+        now = time.monotonic()
+        if test_id in self._activity:
+            if self._expired(self._activity[test_id], now):
+                self._drop(test_id, expired=True)
+                return False
+            return True
+        if test_id in self._spilled:
+            if self._expired(self._spilled[test_id], now):
+                self._drop(test_id, expired=True)
+                return False
+            self._load_spilled(test_id)
+            return True
+        # put in the dicts directly rather than through the backend
+        return test_id in TESTS or test_id in SUBMISSIONS
+
+    def _drop(self, test_id: str, expired: bool = False) -> None:
+        """Forget a test and its submissions, in memory and on disk"""
+        TESTS.pop(test_id, None)
+        SUBMISSIONS.pop(test_id, None)
+        self._activity.pop(test_id, None)
+        self._unsized.discard(test_id)
+        self._bytes -= self._sizes.pop(test_id, 0)
+        if self._spilled.pop(test_id, None) is not None:
+            if self._spilling.pop(test_id, None) is None:
+                self._remove_spill_file(test_id)
+        if expired:
+            self.expirations += 1
+
+    def _enforce(self, keep: Optional[str] = None) -> None:
+        """Drop expired tests, then evict the coldest ones over budget"""
+        now = time.monotonic()
+        for entries in (self._activity, self._spilled):
+            while entries:
+                test_id, last_activity = next(iter(entries.items()))
+                if not self._expired(last_activity, now):
+                    break
+                self._drop(test_id, expired=True)
+        if not self.max_bytes:
+            return
+        while self._bytes > self.max_bytes and self._activity:
+            test_id = next(iter(self._activity))
+            if test_id == keep:
+                break
+            self._evict(test_id)
+
+    # ------------------ Spill ------------------
+
+    def _spill_path(self, test_id: str) -> str:
+        digest = hashlib.sha1(test_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.json")
+
+    def _remove_spill_file(self, test_id: str) -> None:
+        try:
+            os.remove(self._spill_path(test_id))
+        except OSError:
+            pass
+
+    def _evict(self, test_id: str) -> None:
+        self.evictions += 1
+        if not self.spill_dir:
+            self._drop(test_id)
+            return
+        last_activity = self._activity.pop(test_id)
+        state = {"test": TESTS.pop(test_id, None), "submissions": list(SUBMISSIONS.pop(test_id, ()))}
+        self._bytes -= self._sizes.pop(test_id, 0)
+        self._spilled[test_id] = last_activity
+        self._spilling[test_id] = state
+        self._unwritten.append((test_id, state))
+        self.spills += 1
+
+    def _write_spills(self) -> None:
+        """
+        Write the spill files of the tests this call evicted, without
+        holding the lock; a test read back (or evicted again) meanwhile
+        keeps its newer state
+        """
+        if not self._unwritten:
+            return
+        with self._lock:
+            unwritten, self._unwritten = self._unwritten, []
+        for test_id, state in unwritten:
+            path = self._spill_path(test_id)
+            temporary = f"{path}.{id(state):x}.tmp"
+            try:
+                with open(temporary, "w", encoding="utf-8") as f:
+                    json.dump(state, f, default=str)
+                error = None
+            except OSError as e:
+                error = e
+            with self._lock:
+                current = self._spilling.get(test_id) is state
+                if current:
+                    del self._spilling[test_id]
+                    if error is None:
+                        os.replace(temporary, path)
+                    else:
+                        logger.error(f"Spilling test {test_id} failed, dropping it: {str(error)}")
+                        self._spilled.pop(test_id, None)
+            if not current or error is not None:
+                try:
+                    os.remove(temporary)
+                except OSError:
+                    pass
+
+    def _load_spilled(self, test_id: str) -> None:
+        del self._spilled[test_id]
+        state = self._spilling.pop(test_id, None)
+        if state is None:
+            try:
+                with open(self._spill_path(test_id), "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Loading spilled test {test_id} failed: {str(e)}")
+                return
+            self._remove_spill_file(test_id)
+        TESTS[test_id] = state["test"]
+        if state["submissions"]:
+            SUBMISSIONS[test_id] = new_submission_table(test_id, state["submissions"])
+        self._grow(test_id, self._measure(test_id))
+        self._touch(test_id)
+        self.spill_loads += 1
+        self._enforce(keep=test_id)
+
+    # ------------------ StorageBackend ------------------
+
+    def store_test(self, test_id: str, test_data: dict) -> None:
+        with self._lock:
+            self._resident(test_id)
+            if self.max_bytes:
+                size = approximate_size(test_data)
+                if test_id in TESTS:
+                    size -= approximate_size(TESTS[test_id])
+                self._grow(test_id, size)
+            else:
+                self._unsized.add(test_id)
+            TESTS[test_id] = test_data
+            self._touch(test_id)
+            self._enforce(keep=test_id)
+        self._write_spills()
+
+    def get_test(self, test_id: str) -> dict:
+        with self._lock:
+            test = None
+            if self._resident(test_id):
+                self._touch(test_id)
+                test = TESTS.get(test_id)
+        self._write_spills()
+        return test
+
+    def store_submission(self, test_id: str, submission_data: dict) -> None:
+        with self._lock:
+            self._resident(test_id)
+            if test_id not in SUBMISSIONS:
+                SUBMISSIONS[test_id] = new_submission_table(test_id)
+            table = SUBMISSIONS[test_id]
+            if self.max_bytes:
+                before = approximate_size(table)
+                table.append(submission_data)
+                self._grow(test_id, approximate_size(table) - before)
+            else:
+                table.append(submission_data)
+                self._unsized.add(test_id)
+            self._touch(test_id)
+            self._enforce(keep=test_id)
+        self._write_spills()
+
+    def get_submissions(self, test_id: str) -> list:
+        with self._lock:
+            submissions = []
+            if self._resident(test_id):
+                self._touch(test_id)
+                # the submission dicts are rebuilt here, on request
+                submissions = list(SUBMISSIONS.get(test_id, ()))
+        self._write_spills()
+        return submissions
+
+    async def astore_test(self, test_id: str, test_data: dict) -> None:
+        if self.spill_dir:
+            await run_blocking(self.store_test, test_id, test_data)
+        else:
+            self.store_test(test_id, test_data)
+
+    async def aget_test(self, test_id: str) -> dict:
+        if self.spill_dir:
+            return await run_blocking(self.get_test, test_id)
+        return self.get_test(test_id)
+
+    async def astore_submission(self, test_id: str, submission_data: dict) -> None:
+        if self.spill_dir:
+            await run_blocking(self.store_submission, test_id, submission_data)
+        else:
+            self.store_submission(test_id, submission_data)
+
+    async def aget_submissions(self, test_id: str) -> list:
+        if self.spill_dir:
+            return await run_blocking(self.get_submissions, test_id)
+        return self.get_submissions(test_id)
+
+    def test_exists(self, test_id: str) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if test_id in self._activity:
+                return not self._expired(self._activity[test_id], now)
+            if test_id in self._spilled:
+                return not self._expired(self._spilled[test_id], now)
+            return test_id in TESTS
+
+    def test_stats(self, test_id: str) -> Optional[dict]:
+        with self._lock:
+            now = time.monotonic()
+            if test_id in self._activity:
+                self._settle()
+                return {
+                    "resident": True,
+                    "submissions": len(SUBMISSIONS.get(test_id, ())),
+                    "approxBytes": self._sizes.get(test_id, 0),
+                    "idleSeconds": round(now - self._activity[test_id], 3),
+                }
+            if test_id in self._spilled:
+                if test_id in self._spilling:
+                    size = approximate_size(self._spilling[test_id])
+                else:
+                    try:
+                        size = os.path.getsize(self._spill_path(test_id))
+                    except OSError:
+                        size = 0
+                return {
+                    "resident": False,
+                    "approxBytes": size,
+                    "idleSeconds": round(now - self._spilled[test_id], 3),
+                }
+            return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._enforce()
+            self._settle()
+            largest = heapq.nlargest(10, self._sizes.items(), key=lambda item: item[1])
+            stats = {
+                "backend": self.name,
+                "tests": len(TESTS),
+                "submissions": sum(len(s) for s in SUBMISSIONS.values()),
+                "approxBytes": self._bytes,
+                "budgetBytes": self.max_bytes,
+                "ttlSeconds": self.ttl,
+                "spilledTests": len(self._spilled),
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "spillLoads": self.spill_loads,
+                "largestTests": [
+                    {
+                        "testId": test_id,
+                        "submissions": len(SUBMISSIONS.get(test_id, ())),
+                        "approxBytes": size,
+                    }
+                    for test_id, size in largest
+                ],
+            }
+        self._write_spills()
+        return stats
+
+
+_backend: Optional[StorageBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_storage_backend() -> StorageBackend:
+    """Return the process-wide storage backend selected by STORAGE_BACKEND"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.STORAGE_BACKEND == "sql":
+                    from src.storage.sql_store import SQLStorageBackend
+
+                    _backend = SQLStorageBackend(
+                        settings.STORAGE_SQL_URL,
+                        pool_size=settings.STORAGE_SQL_POOL_SIZE,
+                        batch_size=settings.STORAGE_WRITE_BATCH_SIZE,
+                        batch_interval=settings.STORAGE_WRITE_LINGER_MS / 1000,
+                    )
+                elif settings.STORAGE_WAL_ENABLED:
+                    from src.storage.wal_store import DurableMemoryBackend
+
+                    _backend = DurableMemoryBackend(
+                        settings.STORAGE_WAL_DIR,
+                        ttl=settings.STORAGE_TEST_TTL_SECONDS,
+                        fsync=settings.STORAGE_WAL_FSYNC,
+                        group_commit_linger=settings.STORAGE_WAL_GROUP_COMMIT_MS / 1000,
+                        snapshot_every=settings.STORAGE_SNAPSHOT_EVERY,
+                    )
+                else:
+                    _backend = InMemoryBackend(
+                        ttl=settings.STORAGE_TEST_TTL_SECONDS,
+                        max_bytes=int(settings.STORAGE_MEMORY_BUDGET_MB * 1024 * 1024),
+                        spill_dir=settings.STORAGE_SPILL_DIR or None,
+                    )
+    return _backend
+
+
 def store_test(test_id: str, test_data: dict) -> None:
-    """Store a test in memory"""
-    TESTS[test_id] = test_data
+    """Store a test"""
+    get_storage_backend().store_test(test_id, test_data)
 
 
 def get_test(test_id: str) -> dict:
     """Retrieve a test by ID"""
-    return TESTS.get(test_id)
+    return get_storage_backend().get_test(test_id)
 
 
 def store_submission(test_id: str, submission_data: dict) -> None:
     """Store a student submission"""
-    if test_id not in SUBMISSIONS:
-        SUBMISSIONS[test_id] = []
-    SUBMISSIONS[test_id].append(submission_data)
+    get_storage_backend().store_submission(test_id, submission_data)
 
 
 def get_submissions(test_id: str) -> list:
     """Retrieve all submissions for a test"""
-    return SUBMISSIONS.get(test_id, [])
+    return get_storage_backend().get_submissions(test_id)
 
 
 def test_exists(test_id: str) -> bool:
     """Check if a test exists"""
-    return test_id in TESTS
+    return get_storage_backend().test_exists(test_id)
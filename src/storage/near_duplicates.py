@@ -0,0 +1,209 @@
+"""
+Near-Duplicate Question Detection
+=================================
+MinHash signatures over word shingles of a question's normalized text
+and answer, indexed with LSH banding, so a new question can be checked
+against thousands of stored ones without comparing it to each.
+
+- Shingles: word unigrams and bigrams of the lower-cased,
+  punctuation-free question text and correct answer
+- Signature: ``num_perm`` MinHash values; the signature is cut into
+  ``bands`` bands and each band is a bucket key. Questions sharing a
+  bucket are candidates (sub-linear in index size)
+- Candidates are confirmed with the exact Jaccard similarity of their
+  shingle sets against ``threshold``
+
+ExamService creates one index per exam (``new_exam_index``) and runs
+generation under ``exam_dedup_scope(index)``, which carries it in a
+context variable like the usage collector and the deadline;
+QuestionGenerator rejects new questions that nearly duplicate a question
+already in the exam or in the question bank for the topic.
+"""
+
+import contextvars
+import random
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+
+from src.config.settings import settings
+from src.storage.question_cache import question_fingerprint
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+_exam_index: contextvars.ContextVar = contextvars.ContextVar("exam_near_duplicates", default=None)
+
+
+class NearDuplicateError(ValueError):
+    """A generated question nearly duplicates one already accepted"""
+
+    def __init__(self, where: str, similarity: float):
+        self.where = where
+        self.similarity = similarity
+        super().__init__(f"Near-duplicate of a question in the {where} (similarity {similarity:.2f})")
+
+
+def shingles(question: Dict[str, Any]) -> FrozenSet[int]:
+    """
+    Hashed word unigrams and bigrams of a question's normalized text and
+    correct answer (questions differing in a number or in their answer
+    stay apart)
+    """
+    text = " ".join(
+        str(question.get(field) or "") for field in ("question", "correct_answer", "answer")
+    )
+    words = _NON_WORD.sub(" ", text.lower()).split()
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return frozenset(zlib.crc32(gram.encode("utf-8")) for gram in grams)
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """``num_perm`` universal hash functions, seeded for stable signatures"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, shingle_set: FrozenSet[int]) -> Tuple[int, ...]:
+        if not shingle_set:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in shingle_set)
+            for a, b in self._params
+        )
+
+
+class NearDuplicateIndex:
+    """LSH index of questions by MinHash signature"""
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 128, bands: int = 32):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = _hasher(num_perm)
+        self._lock = threading.Lock()
+        self._buckets: List[Dict[Tuple[int, ...], Set[Hashable]]] = [{} for _ in range(bands)]
+        self._entries: Dict[Hashable, Tuple[Tuple[int, ...], FrozenSet[int]]] = {}
+        self.candidates_checked = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, item_id: Hashable, question: Dict[str, Any]) -> None:
+        shingle_set = shingles(question)
+        signature = self.hasher.signature(shingle_set)
+        with self._lock:
+            if item_id in self._entries:
+                return
+            self._entries[item_id] = (signature, shingle_set)
+            for band, key in self._band_keys(signature):
+                self._buckets[band].setdefault(key, set()).add(item_id)
+
+    def add_questions(self, questions: Iterable[Dict[str, Any]]) -> None:
+        """Index questions under their content fingerprints"""
+        for question in questions:
+            self.add(question_fingerprint(question), question)
+
+    def remove(self, item_id: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.pop(item_id, None)
+            if entry is None:
+                return
+            for band, key in self._band_keys(entry[0]):
+                bucket = self._buckets[band].get(key)
+                if bucket is not None:
+                    bucket.discard(item_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+
+    def find(self, question: Dict[str, Any]) -> Optional[Tuple[Hashable, float]]:
+        """(id, similarity) of the most similar indexed near-duplicate, or None"""
+        shingle_set = shingles(question)
+        if not shingle_set:
+            return None
+        signature = self.hasher.signature(shingle_set)
+        with self._lock:
+            candidates = set()
+            for band, key in self._band_keys(signature):
+                candidates |= self._buckets[band].get(key, set())
+            self.candidates_checked += len(candidates)
+            best = None
+            for item_id in candidates:
+                similarity = jaccard(shingle_set, self._entries[item_id][1])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (item_id, similarity)
+        return best
+
+
+_hashers: Dict[int, MinHasher] = {}
+
+
+def _hasher(num_perm: int) -> MinHasher:
+    # one shared set of hash functions per size, so signatures are comparable
+    hasher = _hashers.get(num_perm)
+    if hasher is None:
+        hasher = _hashers.setdefault(num_perm, MinHasher(num_perm))
+    return hasher
+
+
+def new_exam_index(questions: Iterable[Dict[str, Any]] = ()) -> Optional[NearDuplicateIndex]:
+    """
+    A near-duplicate index for one exam, seeded with the questions it
+    already has (None when detection is disabled)
+    """
+    if not settings.NEAR_DUPLICATE_DETECTION:
+        return None
+    index = new_index()
+    index.add_questions(questions)
+    return index
+
+
+@contextmanager
+def exam_dedup_scope(index: Optional[NearDuplicateIndex]):
+    """Check and collect the enclosed generation's questions in ``index``"""
+    token = _exam_index.set(index)
+    try:
+        yield index
+    finally:
+        _exam_index.reset(token)
+
+
+def current_exam_index() -> Optional[NearDuplicateIndex]:
+    return _exam_index.get()
+
+
+def note_exam_questions(questions: Iterable[Dict[str, Any]]) -> None:
+    """Add questions placed in the current exam to its index"""
+    index = _exam_index.get()
+    if index is None:
+        return
+    index.add_questions(questions)
+
+
+def new_index() -> NearDuplicateIndex:
+    """An index configured from the NEAR_DUPLICATE_* settings"""
+    return NearDuplicateIndex(
+        threshold=settings.NEAR_DUPLICATE_THRESHOLD,
+        num_perm=settings.NEAR_DUPLICATE_NUM_PERM,
+        bands=settings.NEAR_DUPLICATE_BANDS,
+    )
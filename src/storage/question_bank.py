@@ -0,0 +1,382 @@
+"""
+Question Bank Module
+====================
+Persistent store of every validated question QuestionGenerator has
+produced, so exams can be assembled without LLM calls.
+
+- Indexed by (normalized topic, difficulty, question type); a question
+  is stored once per index key, deduplicated by its content hash
+  (``question_fingerprint``)
+- Each key's questions live in an array plus a fingerprint -> position
+  map: adding, removing (swap with the last element) and drawing a
+  random question are O(1); ``sample`` draws without replacement by a
+  partial Fisher-Yates shuffle of the array
+- SQLite write-through for persistence; a key is loaded from disk the
+  first time it is used. Async callers load it with ``aload`` and write
+  with ``aadd_many`` / ``adiscard`` on the blocking executor, so the event
+  loop never touches the disk; writes commit after releasing the bank
+  lock, so lookups never wait on a commit either
+- Each key also has a MinHash/LSH near-duplicate index, built with the
+  key's shelf as it is loaded (outside the bank lock) and kept in step
+  with adds and removes, so ``find_near_duplicate`` is sub-linear in the
+  size of the key and never builds anything itself
+
+Unlike the question cache, the bank does not expire questions or hold
+them back until a key has enough variety: it is the long-lived source
+for ``source="bank"`` / ``"mixed"`` exams.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.config.settings import settings
+from src.common.executor import run_blocking
+from src.common.logger import get_logger
+from src.storage.near_duplicates import NearDuplicateIndex, new_index
+from src.storage.question_cache import normalize_topic, question_fingerprint
+
+logger = get_logger(__name__)
+
+
+class _Shelf:
+    """The questions of one index key"""
+
+    __slots__ = ("questions", "fingerprints", "positions", "index")
+
+    def __init__(self):
+        self.questions: List[Dict[str, Any]] = []
+        self.fingerprints: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.index: Optional[NearDuplicateIndex] = (
+            new_index() if settings.NEAR_DUPLICATE_DETECTION else None
+        )
+
+    def add(self, fingerprint: str, question: Dict[str, Any]) -> bool:
+        if fingerprint in self.positions:
+            return False
+        self.positions[fingerprint] = len(self.questions)
+        self.questions.append(question)
+        self.fingerprints.append(fingerprint)
+        if self.index is not None:
+            self.index.add(fingerprint, question)
+        return True
+
+    def remove(self, fingerprint: str) -> bool:
+        position = self.positions.pop(fingerprint, None)
+        if position is None:
+            return False
+        if self.index is not None:
+            self.index.remove(fingerprint)
+        last = len(self.questions) - 1
+        if position != last:
+            self._move(last, position)
+        self.questions.pop()
+        self.fingerprints.pop()
+        return True
+
+    def _move(self, source: int, target: int) -> None:
+        self.questions[target] = self.questions[source]
+        self.fingerprints[target] = self.fingerprints[source]
+        self.positions[self.fingerprints[target]] = target
+
+    def swap(self, i: int, j: int) -> None:
+        if i == j:
+            return
+        self.questions[i], self.questions[j] = self.questions[j], self.questions[i]
+        self.fingerprints[i], self.fingerprints[j] = self.fingerprints[j], self.fingerprints[i]
+        self.positions[self.fingerprints[i]] = i
+        self.positions[self.fingerprints[j]] = j
+
+
+class QuestionBank:
+    """Thread-safe, persistent, indexed question bank"""
+
+    def __init__(self, path: Optional[str] = None, max_per_key: int = 2000):
+        self.path = path
+        self.max_per_key = max_per_key
+        self._shelves: Dict[str, _Shelf] = {}
+        self._lock = threading.Lock()
+        # guards the connection; taken after ``_lock`` when both are held
+        self._disk_lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+
+        self.added = 0
+        self.duplicates = 0
+        self.drawn = 0
+        self.short = 0
+        self.near_duplicates = 0
+
+    @staticmethod
+    def make_key(topic: str, difficulty: str, question_type: str) -> str:
+        return "|".join([normalize_topic(topic), difficulty.lower(), question_type.lower()])
+
+    @property
+    def blocking(self) -> bool:
+        """Whether writes do disk I/O (and so belong off the event loop)"""
+        return bool(self.path)
+
+    # ------------------ Disk ------------------
+
+    def _get_disk(self) -> Optional[sqlite3.Connection]:
+        """The SQLite connection, opened on first use; caller holds ``_disk_lock``"""
+        if not self.path:
+            return None
+        if self._disk is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._disk = sqlite3.connect(self.path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS question_bank ("
+                " bank_key TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " question TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (bank_key, fingerprint))"
+            )
+            self._disk.commit()
+        return self._disk
+
+    def _shelf(self, key: str) -> _Shelf:
+        """The key's shelf, loaded from disk on first use; caller holds the lock"""
+        shelf = self._shelves.get(key)
+        if shelf is None:
+            shelf = self._build_shelf(self._read_rows(key))
+            self._shelves[key] = shelf
+        return shelf
+
+    def _read_rows(self, key: str) -> List[Tuple[str, str]]:
+        """The key's banked rows"""
+        with self._disk_lock:
+            disk = self._get_disk()
+            if disk is None:
+                return []
+            return disk.execute(
+                "SELECT fingerprint, question FROM question_bank"
+                " WHERE bank_key = ? ORDER BY created_at LIMIT ?",
+                (key, self.max_per_key),
+            ).fetchall()
+
+    def _hand_over(self) -> None:
+        """
+        Take the disk lock before a write releases ``_lock``, so commits
+        land in the same order as the shelf updates they follow
+        """
+        self._disk_lock.acquire()
+
+    def _write(self, sql: str, rows: List[tuple]) -> None:
+        """Run a write and commit it, then release the disk lock ``_hand_over`` took"""
+        try:
+            disk = self._get_disk()
+            if disk is not None and rows:
+                disk.executemany(sql, rows)
+                disk.commit()
+        finally:
+            self._disk_lock.release()
+
+    @staticmethod
+    def _build_shelf(rows: List[Tuple[str, str]]) -> _Shelf:
+        """Decode the rows and index them (MinHash): the slow part of a load"""
+        shelf = _Shelf()
+        for fingerprint, payload in rows:
+            shelf.add(fingerprint, json.loads(payload))
+        return shelf
+
+    def is_loaded(self, topic: str, difficulty: str, question_type: str) -> bool:
+        with self._lock:
+            return self.make_key(topic, difficulty, question_type) in self._shelves
+
+    def load(self, topic: str, difficulty: str, question_type: str) -> None:
+        """
+        Load a key's shelf and build its near-duplicate index, holding
+        the lock only to install the result
+        """
+        key = self.make_key(topic, difficulty, question_type)
+        if self.is_loaded(topic, difficulty, question_type):
+            return
+        shelf = self._build_shelf(self._read_rows(key))
+        with self._lock:
+            # a write that loaded the key meanwhile wins: it is newer
+            self._shelves.setdefault(key, shelf)
+
+    async def aload(self, topic: str, difficulty: str, question_type: str) -> None:
+        """``load`` on the blocking executor, for async callers about to use a key"""
+        if not self.is_loaded(topic, difficulty, question_type):
+            await run_blocking(self.load, topic, difficulty, question_type)
+
+    # ------------------ Public API ------------------
+
+    def add_many(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        questions: Iterable[Dict[str, Any]],
+    ) -> int:
+        """Bank validated questions; returns how many were new"""
+        key = self.make_key(topic, difficulty, question_type)
+        rows = []
+
+        with self._lock:
+            shelf = self._shelf(key)
+            for question in questions:
+                if len(shelf.questions) >= self.max_per_key:
+                    break
+                fingerprint = question_fingerprint(question)
+                question = dict(question)
+                if shelf.add(fingerprint, question):
+                    rows.append((key, fingerprint, json.dumps(question), time.time()))
+                else:
+                    self.duplicates += 1
+            self.added += len(rows)
+            self._hand_over()
+
+        self._write(
+            "INSERT OR IGNORE INTO question_bank"
+            " (bank_key, fingerprint, question, created_at) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        return len(rows)
+
+    async def aadd_many(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        questions: Iterable[Dict[str, Any]],
+    ) -> int:
+        """``add_many`` for async callers: on the blocking executor when it commits to disk"""
+        if self.blocking:
+            return await run_blocking(self.add_many, topic, difficulty, question_type, questions)
+        return self.add_many(topic, difficulty, question_type, questions)
+
+    def sample(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        count: int,
+        exclude: Optional[Set[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Draw up to ``count`` distinct random questions not in ``exclude``,
+        in O(1) per question drawn. The fingerprints of the drawn
+        questions are added to ``exclude``.
+        """
+        key = self.make_key(topic, difficulty, question_type)
+        exclude = exclude if exclude is not None else set()
+        picked = []
+
+        with self._lock:
+            shelf = self._shelf(key)
+            size = len(shelf.questions)
+            i = 0
+            # partial Fisher-Yates: positions [0, i) hold this draw
+            while len(picked) < count and i < size:
+                shelf.swap(i, random.randrange(i, size))
+                fingerprint = shelf.fingerprints[i]
+                if fingerprint not in exclude:
+                    exclude.add(fingerprint)
+                    picked.append(dict(shelf.questions[i]))
+                i += 1
+            self.drawn += len(picked)
+            if len(picked) < count:
+                self.short += 1
+
+        return picked
+
+    def discard(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        questions: Iterable[Dict[str, Any]],
+    ) -> int:
+        """Remove questions (e.g. rejected by a teacher) from the bank"""
+        key = self.make_key(topic, difficulty, question_type)
+        fingerprints = {question_fingerprint(q) for q in questions}
+
+        with self._lock:
+            shelf = self._shelf(key)
+            removed = sum(1 for fingerprint in fingerprints if shelf.remove(fingerprint))
+            self._hand_over()
+
+        self._write(
+            "DELETE FROM question_bank WHERE bank_key = ? AND fingerprint = ?",
+            [(key, fingerprint) for fingerprint in fingerprints],
+        )
+        return removed
+
+    async def adiscard(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        questions: Iterable[Dict[str, Any]],
+    ) -> int:
+        """``discard`` for async callers: on the blocking executor when it commits to disk"""
+        if self.blocking:
+            return await run_blocking(self.discard, topic, difficulty, question_type, questions)
+        return self.discard(topic, difficulty, question_type, questions)
+
+    def find_near_duplicate(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        question: Dict[str, Any],
+    ) -> Optional[Tuple[str, float]]:
+        """
+        (fingerprint, similarity) of a banked near-duplicate of ``question``,
+        or None. Async callers ``aload`` the key first: the shelf (and its
+        index) is then ready and this only queries it.
+        """
+        key = self.make_key(topic, difficulty, question_type)
+        with self._lock:
+            index = self._shelf(key).index
+        if index is None:
+            return None
+        match = index.find(question)
+        if match is not None:
+            self.near_duplicates += 1
+        return match
+
+    def count(self, topic: str, difficulty: str, question_type: str) -> int:
+        with self._lock:
+            return len(self._shelf(self.make_key(topic, difficulty, question_type)).questions)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "keysLoaded": len(self._shelves),
+                "questionsLoaded": sum(len(s.questions) for s in self._shelves.values()),
+                "added": self.added,
+                "duplicates": self.duplicates,
+                "drawn": self.drawn,
+                "shortDraws": self.short,
+                "nearDuplicatesFound": self.near_duplicates,
+            }
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> Optional[QuestionBank]:
+    """Return the process-wide question bank, or None when disabled"""
+    global _bank
+    if not settings.QUESTION_BANK_ENABLED:
+        return None
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = QuestionBank(
+                    path=settings.QUESTION_BANK_PATH or None,
+                    max_per_key=settings.QUESTION_BANK_MAX_PER_KEY,
+                )
+    return _bank
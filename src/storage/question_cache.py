@@ -0,0 +1,455 @@
+"""
+Question Cache Module
+=====================
+Two-tier cache of validated questions sitting in front of the LLM.
+
+- Memory tier: LRU over cache keys, each entry expiring after a TTL
+- Disk tier: SQLite file that survives restarts and refills the memory tier;
+  rows older than the disk TTL are deleted when the file is opened and
+  then at most every DISK_PURGE_INTERVAL seconds, on a write
+- Writes update the memory tier under the cache lock and commit to disk
+  after releasing it; async callers use ``aput_many`` / ``adiscard`` to
+  run them on the blocking executor, and ``aload`` a key there before
+  looking it up, so a lookup from the event loop never reads the disk
+  (nor waits for another request's commit)
+
+A cache key is (normalized topic, difficulty, question type,
+temperature) and holds a list of distinct questions, so different exams
+on the same topic draw different random samples instead of repeating
+the same question set. The model is deliberately not part of the key:
+with several models configured (LLM_MODELS) the router picks one per
+call, and a validated question is as good whichever model wrote it.
+"""
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.config.settings import settings
+from src.common.executor import run_blocking
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+DISK_PURGE_INTERVAL = 3600.0
+
+
+def normalize_topic(topic: str) -> str:
+    """Lower-case and collapse whitespace so 'Indian  History' == 'indian history'"""
+    return " ".join(topic.lower().split())
+
+
+def question_fingerprint(question: Dict[str, Any]) -> str:
+    """Stable hash of a question's normalized text"""
+    text = " ".join(str(question.get("question", "")).lower().split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("questions", "fingerprints", "expires_at")
+
+    def __init__(self, expires_at: float):
+        self.questions: List[Dict[str, Any]] = []
+        self.fingerprints: Set[str] = set()
+        self.expires_at = expires_at
+
+
+class QuestionCache:
+    """Thread-safe two-tier cache of generated questions"""
+
+    def __init__(
+        self,
+        max_keys: int = 256,
+        ttl_seconds: float = 3600,
+        max_per_key: int = 50,
+        min_variety: int = 20,
+        disk_path: Optional[str] = None,
+        disk_ttl_seconds: float = 7 * 24 * 3600,
+    ):
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        self.max_per_key = max_per_key
+        self.min_variety = min_variety
+        self.disk_path = disk_path
+        self.disk_ttl_seconds = disk_ttl_seconds
+
+        self._memory: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # guards the connection; taken after ``_lock`` when both are held
+        self._disk_lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        self._next_purge = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_loads = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stores = 0
+        self.disk_expirations = 0
+
+    # ------------------ Keys ------------------
+
+    @staticmethod
+    def make_key(topic: str, difficulty: str, question_type: str) -> str:
+        return "|".join([
+            normalize_topic(topic),
+            difficulty.lower(),
+            question_type.lower(),
+            str(settings.TEMPERATURE),
+        ])
+
+    @property
+    def blocking(self) -> bool:
+        """Whether writes do disk I/O (and so belong off the event loop)"""
+        return bool(self.disk_path)
+
+    # ------------------ Disk tier ------------------
+
+    def _get_disk(self) -> Optional[sqlite3.Connection]:
+        """The SQLite connection, opened on first use; caller holds ``_disk_lock``"""
+        if not self.disk_path:
+            return None
+        if self._disk is None:
+            directory = os.path.dirname(self.disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._disk = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS question_cache ("
+                " cache_key TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " question TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (cache_key, fingerprint))"
+            )
+            self._disk.execute(
+                "CREATE INDEX IF NOT EXISTS question_cache_created_at"
+                " ON question_cache (created_at)"
+            )
+            self._disk.commit()
+            self._purge_expired()
+        return self._disk
+
+    def _purge_expired(self) -> None:
+        """Delete the rows past the disk TTL; caller holds ``_disk_lock``"""
+        cursor = self._disk.execute(
+            "DELETE FROM question_cache WHERE created_at <= ?",
+            (time.time() - self.disk_ttl_seconds,),
+        )
+        self._disk.commit()
+        self.disk_expirations += max(cursor.rowcount, 0)
+        self._next_purge = time.monotonic() + min(self.disk_ttl_seconds, DISK_PURGE_INTERVAL)
+
+    def _load_from_disk(self, key: str) -> Optional[_Entry]:
+        """The key's unexpired disk rows as an entry, or None; counted by the caller"""
+        with self._disk_lock:
+            disk = self._get_disk()
+            if disk is None:
+                return None
+
+            rows = disk.execute(
+                "SELECT fingerprint, question FROM question_cache"
+                " WHERE cache_key = ? AND created_at > ?"
+                " ORDER BY created_at DESC LIMIT ?",
+                (key, time.time() - self.disk_ttl_seconds, self.max_per_key),
+            ).fetchall()
+        if not rows:
+            return None
+
+        entry = _Entry(time.monotonic() + self.ttl_seconds)
+        for fingerprint, payload in rows:
+            entry.questions.append(json.loads(payload))
+            entry.fingerprints.add(fingerprint)
+        return entry
+
+    def _hand_over(self) -> None:
+        """
+        Take the disk lock before a write releases ``_lock``, so commits
+        land in the same order as the memory updates they follow
+        """
+        self._disk_lock.acquire()
+
+    def _write(self, sql: str, rows: List[tuple]) -> int:
+        """Run a write and commit it, then release the disk lock ``_hand_over`` took"""
+        try:
+            disk = self._get_disk()
+            if disk is None or not rows:
+                return 0
+            cursor = disk.executemany(sql, rows)
+            disk.commit()
+            if time.monotonic() >= self._next_purge:
+                self._purge_expired()
+            return cursor.rowcount
+        finally:
+            self._disk_lock.release()
+
+    # ------------------ Memory tier ------------------
+
+    def _live(self, key: str) -> Optional[_Entry]:
+        """The key's unexpired memory entry, dropping an expired one; caller holds the lock"""
+        entry = self._memory.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._memory[key]
+            self.expirations += 1
+            entry = None
+        return entry
+
+    def _install(self, key: str, entry: _Entry) -> None:
+        """Put an entry in the memory tier, evicting LRU keys; caller holds the lock"""
+        self._memory[key] = entry
+        while len(self._memory) > self.max_keys:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _entry(self, key: str, create: bool = False) -> Optional[_Entry]:
+        """Look up (and refresh the LRU position of) a key; caller holds the lock"""
+        entry = self._live(key)
+
+        if entry is None:
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                self.disk_loads += 1
+            elif create:
+                entry = _Entry(time.monotonic() + self.ttl_seconds)
+            else:
+                return None
+            self._install(key, entry)
+
+        self._memory.move_to_end(key)
+        return entry
+
+    def is_loaded(self, topic: str, difficulty: str, question_type: str) -> bool:
+        """Whether a lookup of the key would be served from memory"""
+        key = self.make_key(topic, difficulty, question_type)
+        with self._lock:
+            return self._live(key) is not None
+
+    def load(self, topic: str, difficulty: str, question_type: str) -> None:
+        """
+        Bring a key into the memory tier, reading the disk without holding
+        the cache lock. A key with no rows on disk is loaded empty, so
+        lookups do not go back to the disk for it until it expires.
+        """
+        key = self.make_key(topic, difficulty, question_type)
+        if self.is_loaded(topic, difficulty, question_type):
+            return
+        entry = self._load_from_disk(key)
+        with self._lock:
+            # a write that loaded the key meanwhile wins: it is newer
+            if self._live(key) is not None:
+                return
+            if entry is not None:
+                self.disk_loads += 1
+            self._install(key, entry or _Entry(time.monotonic() + self.ttl_seconds))
+
+    async def aload(self, topic: str, difficulty: str, question_type: str) -> None:
+        """``load`` on the blocking executor, for async callers about to look a key up"""
+        if self.blocking and not self.is_loaded(topic, difficulty, question_type):
+            await run_blocking(self.load, topic, difficulty, question_type)
+
+    # ------------------ Public API ------------------
+
+    def get_many(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        count: int,
+        exclude: Optional[Set[str]] = None,
+        min_variety: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return up to ``count`` distinct cached questions not in ``exclude``.
+
+        Keys holding fewer than ``min_variety`` questions (default: the
+        cache's setting) are reported as misses, so they keep growing
+        before exams start sharing them; pass ``min_variety=1`` to take
+        whatever is cached. The fingerprints of returned questions are
+        added to ``exclude``.
+        """
+        key = self.make_key(topic, difficulty, question_type)
+        exclude = exclude if exclude is not None else set()
+        if min_variety is None:
+            min_variety = self.min_variety
+
+        with self._lock:
+            entry = self._entry(key)
+            candidates = []
+            if entry is not None and len(entry.questions) >= min_variety:
+                candidates = [
+                    q for q in entry.questions
+                    if question_fingerprint(q) not in exclude
+                ]
+
+            picked = random.sample(candidates, min(count, len(candidates)))
+            self.hits += len(picked)
+            self.misses += count - len(picked)
+
+        for question in picked:
+            exclude.add(question_fingerprint(question))
+        return [dict(q) for q in picked]
+
+    def get(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        exclude: Optional[Set[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return one cached question not in ``exclude``, or None on a miss"""
+        picked = self.get_many(topic, difficulty, question_type, 1, exclude)
+        return picked[0] if picked else None
+
+    def put_many(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        questions: Iterable[Dict[str, Any]],
+    ) -> None:
+        """Add validated questions to both tiers, ignoring duplicates"""
+        key = self.make_key(topic, difficulty, question_type)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entry(key, create=True)
+            new_rows = []
+            for question in questions:
+                fingerprint = question_fingerprint(question)
+                if fingerprint in entry.fingerprints:
+                    continue
+                entry.questions.append(dict(question))
+                entry.fingerprints.add(fingerprint)
+                new_rows.append((key, fingerprint, json.dumps(question), now))
+                self.stores += 1
+
+            # keep the newest questions per key
+            while len(entry.questions) > self.max_per_key:
+                dropped = entry.questions.pop(0)
+                entry.fingerprints.discard(question_fingerprint(dropped))
+            self._hand_over()
+
+        self._write(
+            "INSERT OR IGNORE INTO question_cache"
+            " (cache_key, fingerprint, question, created_at)"
+            " VALUES (?, ?, ?, ?)",
+            new_rows,
+        )
+
+    async def aput_many(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        questions: Iterable[Dict[str, Any]],
+    ) -> None:
+        """``put_many`` for async callers: on the blocking executor when it commits to disk"""
+        if self.blocking:
+            await run_blocking(self.put_many, topic, difficulty, question_type, questions)
+        else:
+            self.put_many(topic, difficulty, question_type, questions)
+
+    def put(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        question: Dict[str, Any],
+    ) -> None:
+        self.put_many(topic, difficulty, question_type, [question])
+
+    def discard(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        questions: Iterable[Dict[str, Any]],
+    ) -> int:
+        """Remove questions (e.g. rejected by a teacher) from both tiers"""
+        key = self.make_key(topic, difficulty, question_type)
+        fingerprints = {question_fingerprint(q) for q in questions}
+        removed = 0
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                kept = [
+                    q for q in entry.questions
+                    if question_fingerprint(q) not in fingerprints
+                ]
+                removed = len(entry.questions) - len(kept)
+                entry.questions = kept
+                entry.fingerprints -= fingerprints
+            self._hand_over()
+
+        deleted = self._write(
+            "DELETE FROM question_cache WHERE cache_key = ? AND fingerprint = ?",
+            [(key, fingerprint) for fingerprint in fingerprints],
+        )
+        return max(removed, deleted)
+
+    async def adiscard(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        questions: Iterable[Dict[str, Any]],
+    ) -> int:
+        """``discard`` for async callers: on the blocking executor when it commits to disk"""
+        if self.blocking:
+            return await run_blocking(self.discard, topic, difficulty, question_type, questions)
+        return self.discard(topic, difficulty, question_type, questions)
+
+    def clear(self) -> None:
+        """Drop every cached question from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._hand_over()
+        self._write("DELETE FROM question_cache", [()])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "diskLoads": self.disk_loads,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stores": self.stores,
+                "diskExpirations": self.disk_expirations,
+                "keysInMemory": len(self._memory),
+                "questionsInMemory": sum(
+                    len(e.questions) for e in self._memory.values()
+                ),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_question_cache() -> Optional[QuestionCache]:
+    """Return the process-wide question cache, or None when disabled"""
+    global _cache
+    if not settings.QUESTION_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QuestionCache(
+                    max_keys=settings.QUESTION_CACHE_MAX_KEYS,
+                    ttl_seconds=settings.QUESTION_CACHE_TTL_SECONDS,
+                    max_per_key=settings.QUESTION_CACHE_MAX_PER_KEY,
+                    min_variety=settings.QUESTION_CACHE_MIN_VARIETY,
+                    disk_path=settings.QUESTION_CACHE_PATH or None,
+                )
+    return _cache
@@ -0,0 +1,321 @@
+"""
+SQL Storage Backend
+===================
+Tests and submissions in a SQL database shared by every replica, so a
+test created on one pod can be taken on another and survives restarts.
+Selected with STORAGE_BACKEND=sql; STORAGE_SQL_URL is any SQLAlchemy
+async URL (``sqlite+aiosqlite:///...`` locally, e.g.
+``postgresql+asyncpg://...`` in production).
+
+- SQLAlchemy's async engine runs on a private event loop thread, so the
+  backend serves both the synchronous store functions and async callers
+  (which await it without blocking their own loop)
+- Connections come from the engine's pool (STORAGE_SQL_POOL_SIZE);
+  file-based SQLite is switched to WAL so reads don't wait for writes
+- Writes are group-committed: a single writer task takes every write
+  queued while the previous transaction was running (up to
+  STORAGE_WRITE_BATCH_SIZE, optionally lingering STORAGE_WRITE_LINGER_MS
+  for more) and commits them in one transaction. A write returns once
+  its transaction has committed, so a read that follows sees it on any
+  replica.
+
+Values are stored as JSON: integer dict keys (e.g. a submission's
+``answers``) come back as strings.
+
+Requires the optional ``sqlalchemy`` package plus an async driver
+(``aiosqlite``, ``asyncpg``...).
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.common.custom_exception import CustomException
+from src.common.logger import get_logger
+from src.storage.backend import StorageBackend
+
+try:
+    from sqlalchemy import (
+        Column, Float, Integer, MetaData, String, Table, Text,
+        bindparam, event, insert, select, update,
+    )
+    from sqlalchemy.ext.asyncio import create_async_engine
+except ImportError:  # optional: pip install sqlalchemy aiosqlite
+    create_async_engine = None
+
+logger = get_logger(__name__)
+
+TEST = "test"
+SUBMISSION = "submission"
+
+if create_async_engine is not None:
+    metadata = MetaData()
+    tests_table = Table(
+        "exam_tests", metadata,
+        Column("test_id", String(64), primary_key=True),
+        Column("data", Text, nullable=False),
+        Column("updated_at", Float, nullable=False),
+    )
+    submissions_table = Table(
+        "exam_submissions", metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("test_id", String(64), nullable=False, index=True),
+        Column("data", Text, nullable=False),
+        Column("created_at", Float, nullable=False),
+    )
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+class SQLStorageBackend(StorageBackend):
+    """Async SQLAlchemy storage with pooled connections and group commit"""
+
+    name = "sql"
+    blocking = True
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 5,
+        batch_size: int = 100,
+        batch_interval: float = 0.0,
+        timeout: float = 30.0,
+    ):
+        if create_async_engine is None:
+            raise CustomException(
+                "STORAGE_BACKEND=sql needs SQLAlchemy and an async driver",
+                ImportError("pip install sqlalchemy aiosqlite"),
+            )
+        self.url = url
+        self.pool_size = max(1, pool_size)
+        self.batch_size = max(1, batch_size)
+        self.batch_interval = max(0.0, batch_interval)
+        self.timeout = timeout
+
+        self.writes = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.reads = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="sql-store", daemon=True
+        )
+        self._thread.start()
+        self._closed = False
+        self._run(self._start())
+
+    # ------------------ Event loop plumbing ------------------
+
+    def _run(self, coro):
+        """Run ``coro`` on the backend loop and wait for it (sync callers)"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(self.timeout)
+
+    async def _arun(self, coro):
+        """Run ``coro`` on the backend loop and await it (async callers)"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    async def _start(self) -> None:
+        options: Dict[str, Any] = {"pool_pre_ping": True}
+        sqlite = self.url.startswith("sqlite")
+        if sqlite:
+            path = self.url.split(":///", 1)[-1]
+            directory = os.path.dirname(path)
+            if path and ":memory:" not in path and directory:
+                os.makedirs(directory, exist_ok=True)
+        if not (sqlite and ":memory:" in self.url):
+            options.update(pool_size=self.pool_size, max_overflow=self.pool_size)
+
+        self._engine = create_async_engine(self.url, **options)
+        if sqlite:
+            @event.listens_for(self._engine.sync_engine, "connect")
+            def _sqlite_pragmas(connection, _record):
+                cursor = connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.close()
+
+        async with self._engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._writer = asyncio.ensure_future(self._write_loop())
+
+    # ------------------ Group-committed writes ------------------
+
+    async def _write(self, kind: str, test_id: str, payload: str) -> None:
+        done = self._loop.create_future()
+        self._queue.put_nowait((kind, test_id, payload, done))
+        await done
+
+    async def _next_batch(self) -> Optional[List[Tuple]]:
+        first = await self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        linger_until = self._loop.time() + self.batch_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = linger_until - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                # close(): commit what we have, then stop
+                self._queue.put_nowait(None)
+                break
+            batch.append(item)
+        return batch
+
+    async def _write_loop(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            if batch is None:
+                return
+            try:
+                await self._commit(batch)
+            except Exception as e:
+                logger.error(f"Storage write batch of {len(batch)} failed: {str(e)}")
+                for *_, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+                continue
+            for *_, done in batch:
+                if not done.done():
+                    done.set_result(None)
+
+    async def _commit(self, batch: List[Tuple]) -> None:
+        now = time.time()
+        tests: Dict[str, str] = {}
+        submissions = []
+        for kind, test_id, payload, _ in batch:
+            if kind == TEST:
+                tests[test_id] = payload  # last write of a test in the batch wins
+            else:
+                submissions.append({"test_id": test_id, "data": payload, "created_at": now})
+
+        async with self._engine.begin() as conn:
+            if tests:
+                existing = set(
+                    (await conn.execute(
+                        select(tests_table.c.test_id).where(tests_table.c.test_id.in_(list(tests)))
+                    )).scalars()
+                )
+                updates = [
+                    {"key": test_id, "data": data, "updated_at": now}
+                    for test_id, data in tests.items() if test_id in existing
+                ]
+                inserts = [
+                    {"test_id": test_id, "data": data, "updated_at": now}
+                    for test_id, data in tests.items() if test_id not in existing
+                ]
+                if updates:
+                    await conn.execute(
+                        update(tests_table)
+                        .where(tests_table.c.test_id == bindparam("key"))
+                        .values(data=bindparam("data"), updated_at=bindparam("updated_at")),
+                        updates,
+                    )
+                if inserts:
+                    await conn.execute(insert(tests_table), inserts)
+            if submissions:
+                await conn.execute(insert(submissions_table), submissions)
+
+        self.writes += len(batch)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+    # ------------------ Reads ------------------
+
+    async def _get_test(self, test_id: str) -> Optional[Dict[str, Any]]:
+        async with self._engine.connect() as conn:
+            row = (await conn.execute(
+                select(tests_table.c.data).where(tests_table.c.test_id == test_id)
+            )).first()
+        self.reads += 1
+        return json.loads(row[0]) if row else None
+
+    async def _get_submissions(self, test_id: str) -> List[Dict[str, Any]]:
+        async with self._engine.connect() as conn:
+            rows = await conn.execute(
+                select(submissions_table.c.data)
+                .where(submissions_table.c.test_id == test_id)
+                .order_by(submissions_table.c.id)
+            )
+            payloads = rows.scalars().all()
+        self.reads += 1
+        return [json.loads(payload) for payload in payloads]
+
+    async def _test_exists(self, test_id: str) -> bool:
+        async with self._engine.connect() as conn:
+            row = (await conn.execute(
+                select(tests_table.c.test_id).where(tests_table.c.test_id == test_id)
+            )).first()
+        self.reads += 1
+        return row is not None
+
+    # ------------------ StorageBackend ------------------
+
+    def store_test(self, test_id: str, test_data: Dict[str, Any]) -> None:
+        self._run(self._write(TEST, test_id, _dumps(test_data)))
+
+    def get_test(self, test_id: str) -> Optional[Dict[str, Any]]:
+        return self._run(self._get_test(test_id))
+
+    def store_submission(self, test_id: str, submission_data: Dict[str, Any]) -> None:
+        self._run(self._write(SUBMISSION, test_id, _dumps(submission_data)))
+
+    def get_submissions(self, test_id: str) -> List[Dict[str, Any]]:
+        return self._run(self._get_submissions(test_id))
+
+    def test_exists(self, test_id: str) -> bool:
+        return self._run(self._test_exists(test_id))
+
+    async def astore_test(self, test_id: str, test_data: Dict[str, Any]) -> None:
+        await self._arun(self._write(TEST, test_id, _dumps(test_data)))
+
+    async def aget_test(self, test_id: str) -> Optional[Dict[str, Any]]:
+        return await self._arun(self._get_test(test_id))
+
+    async def astore_submission(self, test_id: str, submission_data: Dict[str, Any]) -> None:
+        await self._arun(self._write(SUBMISSION, test_id, _dumps(submission_data)))
+
+    async def aget_submissions(self, test_id: str) -> List[Dict[str, Any]]:
+        return await self._arun(self._get_submissions(test_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "url": self._engine.url.render_as_string(hide_password=True),
+            "pool": self._engine.pool.status(),
+            "writes": self.writes,
+            "writeBatches": self.batches,
+            "meanBatchSize": round(self.writes / self.batches, 2) if self.batches else 0.0,
+            "largestBatch": self.largest_batch,
+            "reads": self.reads,
+        }
+
+    def close(self) -> None:
+        """Commit queued writes, close the pool and stop the loop thread"""
+        if self._closed:
+            return
+        self._closed = True
+
+        async def shutdown():
+            self._queue.put_nowait(None)
+            await self._writer
+            await self._engine.dispose()
+
+        self._run(shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(self.timeout)
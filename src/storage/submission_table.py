@@ -0,0 +1,247 @@
+"""
+Columnar Submission Storage
+===========================
+The submissions of one test, held column by column instead of as a list
+of dicts. A submission dict (see ExamService.evaluate_exam) repeats every
+key name, every answer string and the correct answer of each question in
+every row; here a row costs a few machine words per question.
+
+- studentName: interned strings
+- correct / wrong / totalAttempted / revision / scorePercentage: arrays
+- answers: a rows × questions matrix of codes into a per-test dictionary
+  of answer strings (0 = not answered)
+- correctAnswer: the correct answers of a row (its answer key) are
+  dictionary-encoded once per distinct key, a row stores the key's index
+- isCorrect: a packed rows × questions bit matrix
+
+The dict shape is rebuilt only when a row is read (``table[i]``,
+iteration, slicing), so it is exactly what was stored. Rows that don't
+have the evaluate_exam shape (other fields, question IDs out of range,
+non-string answers...) are kept as they are.
+"""
+
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, List, Optional, Tuple
+
+# answers keys were strings (the submission went through JSON)
+STR_KEYS = 1
+
+_FIELDS = frozenset({
+    "studentName", "answers", "correct", "wrong", "totalAttempted",
+    "scorePercentage", "resultsDetails", "revision",
+})
+_DETAIL_FIELDS = frozenset({"questionId", "studentAnswer", "correctAnswer", "isCorrect"})
+_UINT_MAX = 2 ** 32
+
+
+class SubmissionTable(Sequence):
+    """Append-only submissions of one test with ``width`` questions"""
+
+    def __init__(self, width: int = 0):
+        self.width = max(0, width)
+        self.stride = (self.width + 7) // 8
+        self._names: List[str] = []
+        self._correct = array("I")
+        self._wrong = array("I")
+        self._attempted = array("I")
+        self._revisions = array("I")
+        self._scores = array("d")
+        self._flags = array("B")
+        self._answers = array("I")
+        self._key_ids = array("I")
+        self._marks = bytearray()
+        self._values: List[str] = [""]
+        self._codes: Dict[str, int] = {}
+        self._keys: List[Tuple[int, ...]] = []
+        self._key_index: Dict[Tuple[int, ...], int] = {}
+        self._irregular: Dict[int, Dict[str, Any]] = {}
+        self._extra_bytes = 0
+
+    @classmethod
+    def from_rows(cls, rows, width: int = 0) -> "SubmissionTable":
+        table = cls(width)
+        for row in rows:
+            table.append(row)
+        return table
+
+    # ------------------ Encoding ------------------
+
+    def _code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._values.append(value)
+            self._codes[value] = code
+            self._extra_bytes += sys.getsizeof(value)
+        return code
+
+    def _key_id(self, key: Tuple[int, ...]) -> int:
+        key_id = self._key_index.get(key)
+        if key_id is None:
+            key_id = len(self._keys)
+            self._keys.append(key)
+            self._key_index[key] = key_id
+            self._extra_bytes += sys.getsizeof(key)
+        return key_id
+
+    def _parse(self, submission: Any) -> Optional[Tuple[int, List[Tuple[int, str, str, bool]]]]:
+        """(flags, answered questions) when the row has the evaluate_exam shape"""
+        if type(submission) is not dict or submission.keys() != _FIELDS:
+            return None
+        answers, details = submission["answers"], submission["resultsDetails"]
+        if (
+            type(submission["studentName"]) is not str
+            or type(answers) is not dict
+            or type(details) is not list
+            or len(details) != len(answers)
+            or type(submission["scorePercentage"]) is not float
+        ):
+            return None
+        for field in ("correct", "wrong", "totalAttempted", "revision"):
+            value = submission[field]
+            if type(value) is not int or not 0 <= value < _UINT_MAX:
+                return None
+        key_types = {type(key) for key in answers}
+        if len(key_types) > 1:
+            return None
+        flags = STR_KEYS if key_types == {str} else 0
+
+        answered = []
+        previous = -1
+        for (key, answer), detail in zip(answers.items(), details):
+            if flags & STR_KEYS:
+                if not key.isdigit() or str(int(key)) != key:
+                    return None
+                q = int(key)
+            elif type(key) is int:
+                q = key
+            else:
+                return None
+            # ascending question IDs, as rebuilt
+            if not previous < q < self.width:
+                return None
+            previous = q
+            if (
+                type(answer) is not str
+                or type(detail) is not dict
+                or detail.keys() != _DETAIL_FIELDS
+                or type(detail["questionId"]) is not int
+                or detail["questionId"] != q
+                or detail["studentAnswer"] != answer
+                or type(detail["correctAnswer"]) is not str
+                or type(detail["isCorrect"]) is not bool
+            ):
+                return None
+            answered.append((q, answer, detail["correctAnswer"], detail["isCorrect"]))
+        return flags, answered
+
+    def append(self, submission: Dict[str, Any]) -> None:
+        row = len(self._names)
+        parsed = self._parse(submission)
+        codes = [0] * self.width
+        key = [0] * self.width
+        marks = bytearray(self.stride)
+        if parsed is None:
+            self._irregular[row] = submission
+            self._names.append("")
+            flags = 0
+            numbers = (0, 0, 0, 0, 0.0)
+        else:
+            flags, answered = parsed
+            for q, answer, correct_answer, is_correct in answered:
+                codes[q] = self._code(answer)
+                key[q] = self._code(correct_answer)
+                if is_correct:
+                    marks[q >> 3] |= 1 << (q & 7)
+            name = sys.intern(submission["studentName"])
+            self._names.append(name)
+            self._extra_bytes += sys.getsizeof(name)
+            numbers = (
+                submission["correct"], submission["wrong"], submission["totalAttempted"],
+                submission["revision"], submission["scorePercentage"],
+            )
+        self._correct.append(numbers[0])
+        self._wrong.append(numbers[1])
+        self._attempted.append(numbers[2])
+        self._revisions.append(numbers[3])
+        self._scores.append(numbers[4])
+        self._flags.append(flags)
+        self._answers.extend(codes)
+        self._key_ids.append(self._key_id(tuple(key)))
+        self._marks += marks
+
+    def extend(self, submissions) -> None:
+        for submission in submissions:
+            self.append(submission)
+
+    # ------------------ Decoding ------------------
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        irregular = self._irregular.get(i)
+        if irregular is not None:
+            return irregular
+        str_keys = self._flags[i] & STR_KEYS
+        base = i * self.width
+        marks = i * self.stride
+        key = self._keys[self._key_ids[i]]
+        answers = {}
+        details = []
+        for q in range(self.width):
+            code = self._answers[base + q]
+            if not code:
+                continue
+            answer = self._values[code]
+            answers[str(q) if str_keys else q] = answer
+            details.append({
+                "questionId": q,
+                "studentAnswer": answer,
+                "correctAnswer": self._values[key[q]],
+                "isCorrect": bool(self._marks[marks + (q >> 3)] >> (q & 7) & 1),
+            })
+        return {
+            "studentName": self._names[i],
+            "answers": answers,
+            "correct": self._correct[i],
+            "wrong": self._wrong[i],
+            "totalAttempted": self._attempted[i],
+            "scorePercentage": self._scores[i],
+            "resultsDetails": details,
+            "revision": self._revisions[i],
+        }
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("submission index out of range")
+        return self._row(index)
+
+    def __repr__(self) -> str:
+        return f"SubmissionTable(rows={len(self)}, width={self.width})"
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table"""
+        from src.storage.in_memory_store import approximate_size
+
+        columns = (
+            self._correct, self._wrong, self._attempted, self._revisions,
+            self._scores, self._flags, self._answers, self._key_ids,
+        )
+        return (
+            sys.getsizeof(self)
+            + sum(column.itemsize * len(column) for column in columns)
+            + len(self._marks)
+            + sum(sys.getsizeof(container) for container in (
+                self._names, self._values, self._codes, self._keys,
+                self._key_index, self._irregular,
+            ))
+            + self._extra_bytes
+            + sum(approximate_size(row) for row in self._irregular.values())
+        )
@@ -0,0 +1,440 @@
+"""
+Write-Ahead Log Persistence for the In-Memory Store
+===================================================
+Keeps the dict-backed store (TESTS / SUBMISSIONS) as fast as before for
+reads, but makes every mutation durable, so a pod restart loses nothing.
+Enabled with STORAGE_WAL_ENABLED (STORAGE_BACKEND=memory).
+
+- Every store_test / store_submission is appended to a log segment as a
+  framed record (length, CRC32, JSON payload) with an increasing log
+  sequence number (LSN) before the call returns
+- Group commit: writers that arrive while an fsync is running are
+  written and fsynced together by the next one (optionally lingering
+  STORAGE_WAL_GROUP_COMMIT_MS for more), so N concurrent writes cost
+  about one fsync instead of N
+- Every STORAGE_SNAPSHOT_EVERY mutations a compacted snapshot of the
+  whole store is written in the background (to a temp file, fsynced,
+  renamed into place) and the log rolls over to a new segment; older
+  snapshots and segments are then deleted
+- Recovery loads the newest snapshot through mmap and replays only the
+  segments written after it, also through mmap; a torn or corrupt record
+  at the tail (crash mid-write) ends the replay and is truncated away
+- Tests expired by STORAGE_TEST_TTL_SECONDS are logged as drops; the
+  memory budget and spill directory don't apply (everything is resident)
+
+Files in STORAGE_WAL_DIR: ``snapshot-<lsn>.json`` and
+``wal-<first lsn>.log``.
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from src.common.executor import run_blocking
+from src.common.logger import get_logger
+from src.storage.in_memory_store import (
+    SUBMISSIONS, TESTS, InMemoryBackend, new_submission_table,
+)
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+logger = get_logger(__name__)
+
+HEADER = struct.Struct("<II")  # payload length, crc32
+OP_TEST = "t"
+OP_SUBMISSION = "s"
+OP_DROP = "d"
+_SEGMENT = re.compile(r"^wal-(\d{20})\.log$")
+_SNAPSHOT = re.compile(r"^snapshot-(\d{20})\.json$")
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str).encode("utf-8")
+
+
+def _loads(data) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
+
+
+def _fsync_dir(path: str) -> None:
+    # make a rename / new file durable
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class WriteAheadLog:
+    """Append-only, group-committed log segment writer"""
+
+    def __init__(self, directory: str, first_lsn: int, fsync: bool = True, linger: float = 0.0):
+        self.directory = directory
+        self.fsync = fsync
+        self.linger = max(0.0, linger)
+        self._cond = threading.Condition()
+        # framed records, and the first LSN of each segment to roll over to
+        self._pending: List[Union[bytes, int]] = []
+        self._pending_upto = first_lsn - 1
+        self._durable = first_lsn - 1
+        self._flushing = False
+        self._file = None
+        self._error: Optional[BaseException] = None
+        self.records = 0
+        self.flushes = 0
+        self.bytes_written = 0
+        self.open_segment(first_lsn)
+
+    @staticmethod
+    def segment_name(first_lsn: int) -> str:
+        return f"wal-{first_lsn:020d}.log"
+
+    def open_segment(self, first_lsn: int) -> None:
+        """Start a new segment; records written from now on go to it"""
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.directory, self.segment_name(first_lsn))
+        self._file = open(path, "ab", buffering=0)
+        _fsync_dir(self.directory)
+
+    def enqueue(self, lsn: int, payload: bytes) -> None:
+        """Queue a record (in LSN order, under the store's lock)"""
+        with self._cond:
+            self._pending.append(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._pending_upto = lsn
+
+    def rotate(self, first_lsn: int) -> None:
+        """
+        Roll over to a new segment starting at ``first_lsn`` after the
+        records queued so far; the flush that writes them fsyncs the old
+        segment and opens the new one, so no I/O happens here
+        """
+        with self._cond:
+            self._pending.append(first_lsn)
+
+    def wait_durable(self, lsn: int) -> None:
+        """Block until ``lsn`` is on disk, flushing as the group leader if needed"""
+        with self._cond:
+            while self._durable < lsn:
+                if self._error is not None:
+                    raise self._error
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                self._flushing = True
+                if self.linger:
+                    # let concurrent writers join this group
+                    self._cond.wait(self.linger)
+                chunk, upto = self._pending, self._pending_upto
+                self._pending = []
+                self._cond.release()
+                try:
+                    self._write(chunk)
+                except BaseException as e:
+                    self._error = e
+                finally:
+                    self._cond.acquire()
+                    self._flushing = False
+                    if self._error is None:
+                        self._durable = upto
+                        self.records += sum(isinstance(item, bytes) for item in chunk)
+                        self.flushes += 1
+                    self._cond.notify_all()
+
+    def _write(self, chunk: List[Union[bytes, int]]) -> None:
+        records: List[bytes] = []
+        for item in chunk:
+            if isinstance(item, int):
+                self._write_records(records)
+                records = []
+                self.open_segment(item)
+            else:
+                records.append(item)
+        self._write_records(records)
+
+    def _write_records(self, records: List[bytes]) -> None:
+        if not records:
+            return
+        data = b"".join(records)
+        self._file.write(data)
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.bytes_written += len(data)
+
+    def close(self) -> None:
+        with self._cond:
+            if self._pending:
+                self._write(self._pending)
+                self._pending = []
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_segment(path: str) -> Tuple[List[Any], int]:
+    """
+    Decode the records of a segment through mmap; returns the records
+    and the byte offset of the end of the last intact one
+    """
+    records = []
+    offset = 0
+    if os.path.getsize(path) == 0:
+        return records, 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            size = len(mm)
+            while offset + HEADER.size <= size:
+                length, crc = HEADER.unpack_from(mm, offset)
+                start = offset + HEADER.size
+                end = start + length
+                if end > size:
+                    break
+                with view[start:end] as payload:
+                    if zlib.crc32(payload) != crc:
+                        break
+                    records.append(_loads(payload))
+                offset = end
+        finally:
+            view.release()
+    return records, offset
+
+
+class DurableMemoryBackend(InMemoryBackend):
+    """The in-memory store, made durable with a WAL and snapshots"""
+
+    name = "memory+wal"
+    blocking = True
+
+    def __init__(
+        self,
+        directory: str,
+        fsync: bool = True,
+        group_commit_linger: float = 0.0,
+        snapshot_every: int = 10000,
+        ttl: float = 0.0,
+    ):
+        # everything stays resident: the log and snapshots, not a spill
+        # directory, are what the store is rebuilt from
+        super().__init__(ttl=ttl)
+        self.directory = directory
+        self.snapshot_every = max(1, snapshot_every)
+        os.makedirs(directory, exist_ok=True)
+        self._snapshotting = False
+        self._since_snapshot = 0
+        self.snapshots = 0
+        self.last_snapshot_seconds: Optional[float] = None
+
+        started = time.perf_counter()
+        self._lsn = self._recover()
+        self._reindex()
+        self.recovery_seconds = time.perf_counter() - started
+        logger.info(
+            f"Recovered {len(TESTS)} tests and {sum(len(s) for s in SUBMISSIONS.values())} "
+            f"submissions up to LSN {self._lsn} in {self.recovery_seconds:.3f}s"
+        )
+        self.wal = WriteAheadLog(directory, self._lsn + 1, fsync, group_commit_linger)
+
+    # ------------------ Files ------------------
+
+    def _files(self, pattern) -> List[Tuple[int, str]]:
+        found = []
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                found.append((int(match.group(1)), os.path.join(self.directory, name)))
+        return sorted(found)
+
+    # ------------------ Recovery ------------------
+
+    def _recover(self) -> int:
+        """Load the newest snapshot and replay the log after it; returns the last LSN"""
+        TESTS.clear()
+        SUBMISSIONS.clear()
+        lsn = 0
+
+        snapshots = self._files(_SNAPSHOT)
+        if snapshots:
+            lsn, path = snapshots[-1]
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    state = _loads(view)
+                finally:
+                    view.release()
+            TESTS.update(state["tests"])
+            for test_id, rows in state["submissions"].items():
+                SUBMISSIONS[test_id] = new_submission_table(test_id, rows)
+
+        segments = self._files(_SEGMENT)
+        # replay the segments that may hold records after the snapshot
+        tail = [
+            (first, path) for i, (first, path) in enumerate(segments)
+            if i + 1 == len(segments) or segments[i + 1][0] > lsn + 1
+        ]
+        for index, (first, path) in enumerate(tail):
+            records, end = read_segment(path)
+            for record in records:
+                if record["n"] <= lsn:
+                    continue
+                self._apply(record)
+                lsn = record["n"]
+            if end < os.path.getsize(path):
+                logger.warning(f"Truncating torn WAL tail of {os.path.basename(path)} at byte {end}")
+                with open(path, "r+b") as f:
+                    f.truncate(end)
+                # nothing after a torn record can be trusted
+                for _, later in tail[index + 1:]:
+                    os.remove(later)
+                break
+        return lsn
+
+    @staticmethod
+    def _apply(record: Dict[str, Any]) -> None:
+        if record["op"] == OP_TEST:
+            TESTS[record["id"]] = record["data"]
+        elif record["op"] == OP_SUBMISSION:
+            if record["id"] not in SUBMISSIONS:
+                SUBMISSIONS[record["id"]] = new_submission_table(record["id"])
+            SUBMISSIONS[record["id"]].append(record["data"])
+        else:
+            TESTS.pop(record["id"], None)
+            SUBMISSIONS.pop(record["id"], None)
+
+    # ------------------ Mutations ------------------
+
+    def _log(self, op: str, test_id: str, data: Optional[Dict[str, Any]]) -> int:
+        """Queue a record for a mutation just applied; caller holds the lock"""
+        self._lsn += 1
+        self.wal.enqueue(self._lsn, _dumps({"n": self._lsn, "op": op, "id": test_id, "data": data}))
+        self._since_snapshot += 1
+        return self._lsn
+
+    def _mutate(self, op: str, test_id: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            # applying may expire tests first: their drops are logged before it
+            if op == OP_TEST:
+                InMemoryBackend.store_test(self, test_id, data)
+            else:
+                InMemoryBackend.store_submission(self, test_id, data)
+            lsn = self._log(op, test_id, data)
+            snapshot = self._since_snapshot >= self.snapshot_every and not self._snapshotting
+            if snapshot:
+                state = self._begin_snapshot()
+        self.wal.wait_durable(lsn)
+        if snapshot:
+            threading.Thread(
+                target=self._write_snapshot, args=state, name="store-snapshot", daemon=True
+            ).start()
+
+    def store_test(self, test_id: str, test_data: dict) -> None:
+        self._mutate(OP_TEST, test_id, test_data)
+
+    def store_submission(self, test_id: str, submission_data: dict) -> None:
+        self._mutate(OP_SUBMISSION, test_id, submission_data)
+
+    def _drop(self, test_id: str, expired: bool = False) -> None:
+        super()._drop(test_id, expired)
+        self._log(OP_DROP, test_id, None)
+
+    async def astore_test(self, test_id: str, test_data: dict) -> None:
+        await run_blocking(self.store_test, test_id, test_data)
+
+    async def astore_submission(self, test_id: str, submission_data: dict) -> None:
+        await run_blocking(self.store_submission, test_id, submission_data)
+
+    # ------------------ Snapshots ------------------
+
+    def _begin_snapshot(self):
+        """
+        Copy the state and roll the log over after the last record; caller
+        holds the lock (the flush of the old segment runs after it's released)
+        """
+        self._snapshotting = True
+        self._since_snapshot = 0
+        lsn = self._lsn
+        tests = dict(TESTS)
+        # submissions are append-only: the rows so far are read back later
+        submissions = {test_id: (items, len(items)) for test_id, items in SUBMISSIONS.items()}
+        self.wal.rotate(lsn + 1)
+        return lsn, tests, submissions
+
+    def _write_snapshot(self, lsn: int, tests: dict, submissions: dict) -> None:
+        started = time.perf_counter()
+        try:
+            # the records the snapshot replaces are on disk before it's
+            # written (the roll-over itself rides on the next flush)
+            self.wal.wait_durable(lsn)
+            path = os.path.join(self.directory, f"snapshot-{lsn:020d}.json")
+            temp = path + ".tmp"
+            with open(temp, "wb") as f:
+                rows = {test_id: items[:count] for test_id, (items, count) in submissions.items()}
+                f.write(_dumps({"lsn": lsn, "tests": tests, "submissions": rows}))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, path)
+            _fsync_dir(self.directory)
+
+            # the snapshot covers everything up to lsn: drop what it replaces
+            for snapshot_lsn, old in self._files(_SNAPSHOT):
+                if snapshot_lsn < lsn:
+                    os.remove(old)
+            for first, old in self._files(_SEGMENT):
+                if first <= lsn:
+                    os.remove(old)
+            self.snapshots += 1
+            self.last_snapshot_seconds = time.perf_counter() - started
+            logger.info(f"Store snapshot at LSN {lsn} in {self.last_snapshot_seconds:.3f}s")
+        except Exception as e:
+            logger.error(f"Store snapshot at LSN {lsn} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._snapshotting = False
+
+    def snapshot(self) -> None:
+        """Take a snapshot now, in the calling thread"""
+        with self._lock:
+            if self._snapshotting:
+                return
+            state = self._begin_snapshot()
+        self._write_snapshot(*state)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update({
+            "lsn": self._lsn,
+            "walRecords": self.wal.records,
+            "walFlushes": self.wal.flushes,
+            "meanGroupCommit": (
+                round(self.wal.records / self.wal.flushes, 2) if self.wal.flushes else 0.0
+            ),
+            "walBytes": self.wal.bytes_written,
+            "snapshots": self.snapshots,
+            "lastSnapshotSeconds": (
+                round(self.last_snapshot_seconds, 3)
+                if self.last_snapshot_seconds is not None else None
+            ),
+            "recoverySeconds": round(self.recovery_seconds, 3),
+        })
+        return stats
+
+    def close(self) -> None:
+        self.wal.close()
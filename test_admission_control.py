@@ -0,0 +1,172 @@
+"""Unit tests for per-teacher admission control in front of create-test."""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.exams.admission import AdmissionController, AdmissionRejected, parse_weights
+
+
+def _run_jobs(controller, jobs, hold=0.01):
+    """Run (tenant, label) jobs through the controller, return the admission order"""
+    order = []
+
+    async def job(tenant, label):
+        async with controller.admit(tenant):
+            order.append(label)
+            await asyncio.sleep(hold)
+
+    async def main():
+        tasks = []
+        for tenant, label in jobs:
+            tasks.append(asyncio.create_task(job(tenant, label)))
+            await asyncio.sleep(0)  # queue in submission order
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    return order
+
+
+def test_round_robin_between_tenants():
+    controller = AdmissionController(max_concurrency=1, tenant_max_concurrency=1)
+    jobs = [("bulk", f"bulk{i}") for i in range(5)] + [("other", "other0"), ("other", "other1")]
+
+    order = _run_jobs(controller, jobs)
+
+    # the bulk teacher's backlog does not delay the other teacher to the end
+    assert order[:5] == ["bulk0", "bulk1", "other0", "bulk2", "other1"]
+
+
+def test_weights_share_capacity():
+    controller = AdmissionController(
+        max_concurrency=1, tenant_max_concurrency=1, weights={"a": 2}
+    )
+    jobs = [("a", f"a{i}") for i in range(5)] + [("b", f"b{i}") for i in range(3)]
+
+    order = _run_jobs(controller, jobs)
+
+    # after the first (immediate) admission, a gets two turns per b turn
+    assert "".join(label[0] for label in order[1:7]) in ("aabaab", "abaaba")
+
+
+def test_per_tenant_concurrency_cap():
+    controller = AdmissionController(max_concurrency=4, tenant_max_concurrency=2)
+    peak = {"now": 0, "max": 0}
+
+    async def job():
+        async with controller.admit("t"):
+            peak["now"] += 1
+            peak["max"] = max(peak["max"], peak["now"])
+            await asyncio.sleep(0.02)
+            peak["now"] -= 1
+
+    async def main():
+        await asyncio.gather(*(job() for _ in range(6)))
+
+    asyncio.run(main())
+    assert peak["max"] == 2
+    assert controller.stats()["inFlight"] == 0
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    controller = AdmissionController(
+        max_concurrency=1, max_queue=1, tenant_max_queue=1, max_wait=5
+    )
+
+    async def main():
+        await controller.acquire("a")
+        waiter = asyncio.create_task(controller.acquire("b"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as info:
+            await controller.acquire("c")
+        assert info.value.reason == "queue_full"
+        assert info.value.retry_after >= 1
+        controller.release("a")
+        await waiter
+        controller.release("b")
+
+    asyncio.run(main())
+    assert controller.stats()["rejected"] == {"queue_full": 1}
+
+
+def test_wait_timeout_and_cancelled_waiters_leave_no_trace():
+    controller = AdmissionController(max_concurrency=1, max_wait=0.05)
+
+    async def main():
+        await controller.acquire("a")
+        with pytest.raises(AdmissionRejected) as info:
+            await controller.acquire("b")
+        assert info.value.reason == "wait_timeout"
+
+        waiter = asyncio.create_task(controller.acquire("c"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        controller.release("a")
+
+    asyncio.run(main())
+    stats = controller.stats()
+    assert stats["inFlight"] == 0
+    assert stats["queueDepth"] == 0
+    assert stats["tenants"] == {}
+
+
+def test_parse_weights():
+    assert parse_weights("alice:3, bob:2,broken,:4") == {"alice": 3, "bob": 2}
+
+
+def test_create_test_returns_429_when_queue_is_full(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import exam_routes
+
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    asyncio.run(controller.acquire("busy-teacher"))
+    monkeypatch.setattr(exam_routes, "get_admission_controller", lambda: controller)
+
+    app = FastAPI()
+    app.include_router(exam_routes.router)
+    response = TestClient(app).post(
+        "/api/create-test", json={"topic": "Python"}, headers={"X-Teacher-Id": "t2"}
+    )
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_create_test_stream_is_admitted(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import exam_routes
+
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(exam_routes, "get_admission_controller", lambda: controller)
+
+    async def astream_exam(**kwargs):
+        # the slot is held while the events are produced
+        yield {"event": "summary", "inFlight": controller.stats()["inFlight"]}
+
+    monkeypatch.setattr(exam_routes.exam_service, "astream_exam", astream_exam)
+
+    app = FastAPI()
+    app.include_router(exam_routes.router)
+    client = TestClient(app)
+    headers = {"X-Teacher-Id": "t2"}
+
+    response = client.post("/api/create-test/stream", json={"topic": "Python"}, headers=headers)
+    assert response.status_code == 200
+    assert json.loads(response.text)["inFlight"] == 1
+    assert controller.stats()["inFlight"] == 0  # released once the stream ended
+
+    asyncio.run(controller.acquire("busy-teacher"))
+    response = client.post("/api/create-test/stream", json={"topic": "Python"}, headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
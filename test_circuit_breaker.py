@@ -0,0 +1,144 @@
+"""Unit tests for the LLM circuit breaker and its fallback."""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from conftest import FailingLLM
+from src.common.custom_exception import CustomException
+from src.llm.backends import StubChatModel
+from src.llm.circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError,
+)
+from src.llm.usage import CALL_ERROR, CANCELLED, INVALID, OK, LLMCall
+from src.storage.question_cache import QuestionCache
+
+
+def _finish(breaker, outcome):
+    breaker.before_call()
+    call = LLMCall("single", 1)
+    call.outcome = outcome
+    breaker.observe(call)
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=60)
+    _finish(breaker, CALL_ERROR)
+    _finish(breaker, CALL_ERROR)
+    _finish(breaker, OK)
+    _finish(breaker, CALL_ERROR)
+    _finish(breaker, CALL_ERROR)
+    assert breaker.state == CLOSED
+
+    _finish(breaker, CALL_ERROR)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_call()
+    assert 0 < info.value.retry_after <= 60
+    assert breaker.stats()["rejectedCalls"] == 1
+
+
+def test_invalid_output_is_not_an_upstream_failure():
+    breaker = CircuitBreaker(failure_threshold=1)
+    _finish(breaker, INVALID)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=0.05)
+    _finish(breaker, CALL_ERROR)
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+
+    # a single probe at a time
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    call = LLMCall("single", 1)
+    call.outcome = CALL_ERROR
+    breaker.observe(call)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    _finish(breaker, OK)
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_probe_frees_its_slot():
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=0)
+    _finish(breaker, CALL_ERROR)
+    _finish(breaker, CANCELLED)
+
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+
+
+def test_generator_stops_retrying_once_open(make_service):
+    llm = FailingLLM()
+    service = make_service(llm, breaker=CircuitBreaker(failure_threshold=2, open_seconds=60))
+
+    with pytest.raises(CustomException, match="circuit open"):
+        asyncio.run(service.question_generator.agenerate_mcq("Python", "easy"))
+    assert llm.calls == 2
+
+
+def test_open_circuit_serves_cached_questions(tmp_path, make_service):
+    cache = QuestionCache(min_variety=20, disk_path=str(tmp_path / "cache.sqlite3"))
+    warm = make_service(StubChatModel(seed=7), cache=cache)
+    warm.create_exam("Python", "easy", 4, "mcq")
+
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=60)
+    _finish(breaker, CALL_ERROR)
+    llm = FailingLLM()
+    service = make_service(llm, breaker=breaker, cache=cache)
+
+    result = service.create_exam("Python", "easy", 3, "mcq")
+
+    assert llm.calls == 0
+    assert result["totalQuestions"] == 3
+    assert result["degraded"] is True
+    assert result["partial"] is False
+
+
+def test_open_circuit_without_fallback_fails_fast(make_service):
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=60)
+    _finish(breaker, CALL_ERROR)
+    llm = FailingLLM()
+    service = make_service(llm, breaker=breaker)
+
+    started = time.perf_counter()
+    with pytest.raises(CircuitOpenError):
+        service.create_exam("Python", "easy", 3, "mcq")
+    assert time.perf_counter() - started < 0.5
+    assert llm.calls == 0
+
+
+def test_create_test_endpoint_returns_503():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import exam_routes
+
+    generator = exam_routes.exam_service.question_generator
+    original = generator.breaker, generator.cache, exam_routes.exam_service.question_pool
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=30)
+    _finish(breaker, CALL_ERROR)
+    generator.breaker, generator.cache = breaker, None
+    original_bank, generator.bank = generator.bank, None
+    exam_routes.exam_service.question_pool = None
+
+    app = FastAPI()
+    app.include_router(exam_routes.router)
+    try:
+        response = TestClient(app).post("/api/create-test", json={"topic": "Python"})
+        assert response.status_code == 503
+        assert 1 <= int(response.headers["Retry-After"]) <= 30
+    finally:
+        generator.breaker, generator.cache, exam_routes.exam_service.question_pool = original
+        generator.bank = original_bank
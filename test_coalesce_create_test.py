@@ -0,0 +1,107 @@
+"""Unit tests for single-flight coalescing of identical create-test requests."""
+
+import asyncio
+import os
+import sys
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from conftest import DelayedLLM
+from src.common.custom_exception import CustomException
+from src.llm.usage import get_usage_ledger
+from src.storage.in_memory_store import get_test
+
+
+def _create_many(service, requests):
+    async def run():
+        return await asyncio.gather(
+            *(service.acreate_exam(**request) for request in requests),
+            return_exceptions=True
+        )
+    return asyncio.run(run())
+
+
+def _request(topic="Python", num_questions=3, coalesce=True):
+    return {
+        "topic": topic, "difficulty": "easy", "num_questions": num_questions,
+        "question_type": "mcq", "batch": False, "coalesce": coalesce,
+    }
+
+
+def test_identical_requests_share_one_generation(make_service):
+    llm = DelayedLLM(delay=0.05)
+    service = make_service(llm)
+
+    results = _create_many(service, [_request(), _request(), _request(topic=" python ")])
+
+    assert llm.calls == 3
+    assert len({r["testId"] for r in results}) == 3
+    assert [r["coalesced"] for r in results] == [False, True, True]
+    assert service.coalesced_requests == 2
+    questions = [get_test(r["testId"])["questions"] for r in results]
+    assert questions[0] == questions[1] == questions[2]
+    # each test owns its copies
+    assert questions[0][0] is not questions[1][0]
+
+
+def test_shared_generation_usage_is_counted_once(make_service):
+    llm = DelayedLLM(delay=0.05)
+    service = make_service(llm)
+
+    results = _create_many(service, [_request(), _request(), _request()])
+
+    assert [r["llmUsage"]["calls"] for r in results] == [3, 0, 0]
+    ledger = [get_usage_ledger().get(r["testId"]) for r in results]
+    assert [entry["coalesced"] for entry in ledger] == [False, True, True]
+    assert sum(entry["calls"] for entry in ledger) == llm.calls
+
+
+def test_coalescing_is_opt_in_per_request(make_service):
+    llm = DelayedLLM(delay=0.05)
+    service = make_service(llm)
+
+    results = _create_many(service, [_request(), _request(coalesce=False)])
+
+    assert llm.calls == 6
+    assert [r["coalesced"] for r in results] == [False, False]
+
+
+def test_different_requests_are_not_coalesced(make_service):
+    llm = DelayedLLM(delay=0.05)
+    service = make_service(llm)
+
+    _create_many(service, [_request(num_questions=2), _request(num_questions=3)])
+
+    assert llm.calls == 5
+
+
+def test_finished_generation_is_not_reused(make_service):
+    llm = DelayedLLM(delay=0.05)
+    service = make_service(llm)
+
+    first = _create_many(service, [_request()])[0]
+    second = _create_many(service, [_request()])[0]
+
+    assert llm.calls == 6
+    assert second["coalesced"] is False
+    assert get_test(first["testId"])["questions"] != get_test(second["testId"])["questions"]
+    assert service._inflight == {}
+
+
+def test_failure_reaches_every_caller(make_service):
+    llm = DelayedLLM(delay=0.05, fail=True)
+    service = make_service(llm)
+
+    results = _create_many(service, [_request(num_questions=1)] * 2)
+
+    assert all(isinstance(r, CustomException) for r in results)
+    assert llm.calls == 3  # one question, MAX_RETRIES attempts, shared
+
+
+def test_schema_accepts_coalesce_flag():
+    from src.schemas.create_test_schema import CreateTestSchema
+
+    assert CreateTestSchema(topic="x").coalesce is None
+    assert CreateTestSchema(topic="x", coalesce=True).coalesce is True
@@ -0,0 +1,94 @@
+"""Unit tests for hedged / over-provisioned exam generation."""
+
+import os
+import sys
+import time
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from conftest import DelayedLLM
+from src.config.settings import settings
+from src.exams import exam_service as exam_service_module
+from src.generator.hedging import HedgeBudget, overprovision_count
+
+
+@pytest.fixture
+def hedge_settings(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGE_OVERPROVISION_RATIO", 0.2)
+    monkeypatch.setattr(settings, "HEDGE_MAX_EXTRA_QUESTIONS", 3)
+    monkeypatch.setattr(settings, "HEDGE_MAX_PER_EXAM", 2)
+    monkeypatch.setattr(settings, "GENERATION_CONCURRENCY", 10)
+    monkeypatch.setattr(settings, "BATCH_SIZE", 10)
+    return monkeypatch
+
+
+def test_overprovision_count_is_capped(hedge_settings):
+    assert overprovision_count(5) == 1
+    assert overprovision_count(10) == 2
+    hedge_settings.setattr(settings, "HEDGE_MAX_EXTRA_QUESTIONS", 1)
+    assert overprovision_count(10) == 1
+
+
+def test_overprovisioned_exam_skips_the_straggler(hedge_settings, make_service):
+    # no learned latency yet: over-provisioning only
+    hedge_settings.setattr(exam_service_module, "hedge_delay", lambda batch: None)
+    llm = DelayedLLM([5.0, 0, 0, 0, 0, 0])
+    service = make_service(llm)
+
+    started = time.perf_counter()
+    result = service.create_exam("Python", "easy", 5, "mcq", batch=False, hedged=True)
+    elapsed = time.perf_counter() - started
+
+    assert result["totalQuestions"] == 5
+    assert elapsed < 2.0
+    assert result["generationTime"]["extraRequested"] == 1
+    assert result["generationTime"]["cancelledUnits"] == 1
+    assert llm.cancelled == 1
+
+
+def test_slow_unit_is_hedged_and_loser_cancelled(hedge_settings, make_service):
+    hedge_settings.setattr(settings, "HEDGE_OVERPROVISION_RATIO", 0)
+    hedge_settings.setattr(exam_service_module, "hedge_delay", lambda batch: 0.05)
+    llm = DelayedLLM([5.0, 0])
+    service = make_service(llm)
+
+    started = time.perf_counter()
+    result = service.create_exam("Python", "easy", 3, "mcq", batch=True, hedged=True)
+
+    assert time.perf_counter() - started < 2.0
+    assert result["totalQuestions"] == 3
+    assert result["generationTime"]["hedgesSent"] == 1
+    assert llm.calls == 2
+    assert llm.cancelled == 1
+
+
+def test_per_exam_cap_disables_hedges(hedge_settings, make_service):
+    hedge_settings.setattr(settings, "HEDGE_OVERPROVISION_RATIO", 0)
+    hedge_settings.setattr(settings, "HEDGE_MAX_PER_EXAM", 0)
+    hedge_settings.setattr(exam_service_module, "hedge_delay", lambda batch: 0.01)
+    llm = DelayedLLM([0.2])
+    service = make_service(llm)
+
+    result = service.create_exam("Python", "easy", 2, "mcq", batch=True, hedged=True)
+
+    assert result["totalQuestions"] == 2
+    assert result["generationTime"]["hedgesSent"] == 0
+    assert llm.calls == 1
+
+
+def test_hedge_budget_limits_share_of_primary_calls():
+    budget = HedgeBudget(ratio=0.5, burst=1)
+
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+    budget.deposit()
+    assert not budget.try_spend()
+    budget.deposit()
+    assert budget.try_spend()
+    assert budget.stats()["granted"] == 2
+    assert budget.stats()["denied"] == 2
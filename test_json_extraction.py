@@ -0,0 +1,73 @@
+"""Unit tests for JSON extraction from raw LLM output."""
+
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.generator.json_extraction import (
+    JSONExtractionError,
+    NO_JSON,
+    TRUNCATED,
+    extract_json_objects,
+    extraction_stats,
+)
+from src.generator.question_generator import QuestionGenerator
+
+CORPUS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "benchmarks", "corpus", "llm_outputs.jsonl"
+)
+
+with open(CORPUS, encoding="utf-8") as f:
+    CASES = [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_corpus_outcomes(case):
+    if isinstance(case["expect"], int):
+        objects = extract_json_objects(case["text"])
+        assert len(objects) == case["expect"]
+        assert all(isinstance(obj, dict) and "question" in obj for obj in objects)
+    else:
+        with pytest.raises(JSONExtractionError) as excinfo:
+            extract_json_objects(case["text"])
+        assert excinfo.value.kind == case["expect"]
+
+
+def test_first_complete_value_wins():
+    text = 'Sure! {"question": "A?", "answer": "a"} and then {"question": "B?", "answer": "b"}'
+    assert extract_json_objects(text) == [{"question": "A?", "answer": "a"}]
+
+
+def test_array_objects_returned_in_order():
+    text = '[{"question": "1"}, "noise", {"question": "2"}]'
+    assert [obj["question"] for obj in extract_json_objects(text)] == ["1", "2"]
+
+
+def test_escaped_quotes_do_not_confuse_scanner():
+    text = 'Note {x} [{"question": "Say \\"}\\" twice", "answer": "ok"}]'
+    assert extract_json_objects(text)[0]["question"] == 'Say "}" twice'
+
+
+def test_failures_are_counted():
+    before = extraction_stats().get(NO_JSON, 0)
+    with pytest.raises(JSONExtractionError):
+        extract_json_objects("no json here")
+    assert extraction_stats()[NO_JSON] == before + 1
+
+
+def test_parse_response_accepts_prose_with_braces():
+    generator = QuestionGenerator.__new__(QuestionGenerator)
+    generator.logger = logging.getLogger("test")
+    raw = 'Here is your {question}:\n[{"question": "Q?", "answer": "A"}]'
+    assert generator._parse_response(raw) == {"question": "Q?", "answer": "A"}
+
+    with pytest.raises(ValueError) as excinfo:
+        generator._parse_response('[{"question": "Q?", "ans')
+    assert excinfo.value.kind == TRUNCATED
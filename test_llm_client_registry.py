@@ -0,0 +1,118 @@
+"""Unit tests for the shared LLM client registry and HTTP connection reuse."""
+
+import asyncio
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.llm.client_registry import LLMClientRegistry, get_client_registry
+from src.llm.groq_client import get_groq_llm
+from src.llm.scheduler import ScheduledLLM
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_models_are_built_once_per_backend_and_model():
+    registry = LLMClientRegistry()
+
+    llm = registry.get("stub", "model-a")
+    assert isinstance(llm, ScheduledLLM)
+    assert registry.get("stub", "model-a") is llm
+    assert registry.get("stub", "model-b") is not llm
+    # offline backends never build HTTP clients
+    assert registry._http_client is None
+    assert registry.stats()["clients"] == ["stub/model-a", "stub/model-b"]
+
+
+def test_concurrent_first_use_builds_a_single_client():
+    registry = LLMClientRegistry()
+    seen = []
+    barrier = threading.Barrier(16)
+
+    def worker():
+        barrier.wait()
+        seen.append(registry.get("stub", "m"))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(llm) for llm in seen}) == 1
+
+
+def test_groq_clients_share_pooled_http_clients():
+    registry = LLMClientRegistry()
+    first = registry.get("groq", "model-a").llm
+    second = registry.get("groq", "model-b").llm
+
+    assert first.http_client is registry.http_client()
+    assert second.http_client is registry.http_client()
+    assert first.http_async_client is registry.http_async_client()
+
+
+def test_get_groq_llm_returns_the_shared_client():
+    assert get_groq_llm() is get_groq_llm()
+    assert get_groq_llm() is get_client_registry().get()
+
+
+def test_sync_requests_reuse_one_connection(server_url):
+    registry = LLMClientRegistry(max_connections=4)
+    client = registry.http_client()
+
+    for _ in range(5):
+        assert client.get(server_url).text == "ok"
+
+    stats = registry.stats()
+    assert stats["requests"] == 5
+    assert stats["connectionsOpened"] == 1
+    assert stats["reusedRequests"] == 4
+    registry.close()
+
+
+def test_async_client_is_usable_from_several_event_loops(server_url):
+    registry = LLMClientRegistry()
+    client = registry.http_async_client()
+
+    async def burst():
+        for _ in range(3):
+            assert (await client.get(server_url)).text == "ok"
+
+    # each asyncio.run is a new loop, as in ExamService._run_sync
+    asyncio.run(burst())
+    asyncio.run(burst())
+
+    stats = registry.connection_stats.snapshot()
+    assert stats["requests"] == 6
+    assert stats["connectionsOpened"] == 2
+    assert stats["reuseRatio"] == pytest.approx(4 / 6, abs=0.001)
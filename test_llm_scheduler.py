@@ -0,0 +1,154 @@
+"""Unit tests for the shared rate-limit-aware LLM scheduler."""
+
+import asyncio
+import os
+import sys
+import time
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.llm.scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    LLMScheduler,
+    ScheduledLLM,
+    TokenBucket,
+    llm_priority,
+)
+
+
+def _scheduler(**overrides):
+    options = dict(
+        requests_per_minute=6000,
+        tokens_per_minute=1_000_000,
+        max_concurrency=4,
+        poll_interval=0.005,
+    )
+    options.update(overrides)
+    return LLMScheduler(**options)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(per_minute=60)
+    now = time.monotonic()
+    bucket.take(60, now)
+    assert bucket.wait_time(1, now) == 1.0
+    assert bucket.wait_time(1, now + 1.0) == 0.0
+
+
+def test_requests_per_minute_limit_delays_calls():
+    scheduler = _scheduler(requests_per_minute=600)  # 10 per second, burst 600
+    scheduler.requests.tokens = 0
+
+    async def scenario():
+        started = time.perf_counter()
+        for _ in range(3):
+            async with scheduler.slot():
+                pass
+        return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) >= 0.25
+
+
+def test_concurrency_cap():
+    scheduler = _scheduler(max_concurrency=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with scheduler.slot():
+            peak = max(peak, scheduler.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(*(call() for _ in range(8)))
+
+    asyncio.run(scenario())
+    assert peak == 2
+    assert scheduler.in_flight == 0
+
+
+def test_interactive_lane_goes_first():
+    scheduler = _scheduler(max_concurrency=1)
+    order = []
+
+    async def call(priority, delay):
+        await asyncio.sleep(delay)
+        with llm_priority(priority):
+            async with scheduler.slot():
+                order.append(priority)
+
+    async def scenario():
+        async with scheduler.slot():
+            waiters = [
+                asyncio.create_task(call(BACKGROUND, 0)),
+                asyncio.create_task(call(INTERACTIVE, 0.01)),
+            ]
+            await asyncio.sleep(0.05)
+        await asyncio.gather(*waiters)
+
+    asyncio.run(scenario())
+    assert order == [INTERACTIVE, BACKGROUND]
+
+
+def test_aimd_halves_on_429_and_grows_on_success():
+    scheduler = _scheduler(max_concurrency=8, backoff_base=0.01, backoff_max=0.01)
+
+    ticket = scheduler.acquire_blocking(INTERACTIVE)
+    scheduler.release(ticket, RateLimitError("429 Too Many Requests"))
+    assert scheduler.limit == 4
+    assert scheduler.rate_limited == 1
+
+    time.sleep(0.02)  # let the cool-down pass
+    for _ in range(5):
+        scheduler.release(scheduler.acquire_blocking(INTERACTIVE))
+    assert 4 < scheduler.limit <= 8
+
+
+def test_slow_calls_shrink_concurrency():
+    scheduler = _scheduler(max_concurrency=8, latency_target=0.0)
+    scheduler.release(scheduler.acquire_blocking(INTERACTIVE))
+    assert scheduler.limit < 8
+    assert scheduler.slow_calls == 1
+
+
+def test_backoff_is_jittered_and_capped():
+    scheduler = _scheduler(backoff_base=0.5, backoff_max=2.0)
+    delays = [scheduler.backoff_delay(5) for _ in range(200)]
+    assert all(0 <= d <= 2.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_scheduled_llm_settles_token_usage():
+    class Message:
+        content = "{}"
+        usage_metadata = {"total_tokens": 50}
+
+    class LLM:
+        model_name = "fake"
+
+        async def ainvoke(self, prompt):
+            return Message()
+
+    scheduler = _scheduler(tokens_per_minute=10_000)
+    llm = ScheduledLLM(LLM(), scheduler)
+
+    asyncio.run(llm.ainvoke("x" * 400))
+    assert llm.model_name == "fake"
+    assert 9_900 < scheduler.tokens.tokens <= 9_950 + 1
+    assert scheduler.granted[INTERACTIVE] == 1
+
+
+def test_get_groq_llm_goes_through_scheduler():
+    from src.llm.groq_client import get_groq_llm
+    from src.llm.scheduler import get_llm_scheduler
+
+    llm = get_groq_llm()
+    assert isinstance(llm, ScheduledLLM)
+    assert llm.scheduler is get_llm_scheduler()
@@ -0,0 +1,113 @@
+"""Unit tests for per-call LLM usage accounting and per-exam roll-ups."""
+
+import asyncio
+import json
+import os
+import sys
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from conftest import ScriptedLLM
+from src.common.metrics import export_histograms
+from src.llm.backends import StubChatModel
+from src.llm.usage import (
+    LATENCY_HISTOGRAM,
+    LLMCall,
+    UsageCollector,
+    call_outcomes,
+    get_usage_ledger,
+    track_llm_usage,
+)
+
+VALID_MCQ = json.dumps({
+    "question": "What is 2 + 2?",
+    "options": ["3", "4", "5", "6"],
+    "correct_answer": "4",
+})
+INVALID_MCQ = json.dumps({
+    "question": "What is 2 + 2?",
+    "options": ["3", "4"],
+    "correct_answer": "4",
+})
+
+
+def test_batch_exam_rolls_up_usage_under_test_id(make_service):
+    service = make_service(StubChatModel(model_name="stub"))
+
+    result = service.create_exam("Python", "easy", 4, "mcq", batch=True)
+
+    usage = result["llmUsage"]
+    assert usage["calls"] == 1
+    assert usage["retries"] == 0
+    assert usage["questionsAccepted"] == 4
+    assert usage["promptTokens"] > 0 and usage["completionTokens"] > 0
+    assert usage["totalTokens"] == usage["promptTokens"] + usage["completionTokens"]
+    assert usage["outcomes"] == {"ok": 1}
+    assert usage["models"] == ["stub"]
+
+    stored = get_usage_ledger().get(result["testId"])
+    assert stored["calls"] == 1
+    assert stored["callDetails"][0]["kind"] == "batch"
+    assert stored["callDetails"][0]["requested"] == 4
+    assert export_histograms()[LATENCY_HISTOGRAM]["count"] >= 1
+
+
+def test_validation_failure_is_recorded_and_retried(make_service):
+    service = make_service(ScriptedLLM([INVALID_MCQ, "Sorry, no JSON", VALID_MCQ]))
+
+    result = service.create_exam("Math", "easy", 1, "mcq", batch=False)
+
+    assert result["totalQuestions"] == 1
+    usage = get_usage_ledger().get(result["testId"])
+    assert [c["outcome"] for c in usage["callDetails"]] == ["invalid", "no_json", "ok"]
+    assert [c["attempt"] for c in usage["callDetails"]] == [1, 2, 3]
+    assert usage["retries"] == 2
+    assert usage["promptTokens"] == 300
+    assert usage["completionTokens"] == 120
+
+
+def test_stream_exam_summary_includes_usage(make_service):
+    service = make_service(StubChatModel(model_name="stub"))
+
+    async def collect():
+        return [event async for event in service.astream_exam("Python", "easy", 3, "mcq")]
+
+    summary = asyncio.run(collect())[-1]
+    assert summary["event"] == "summary"
+    assert summary["llmUsage"]["questionsAccepted"] == 3
+    assert get_usage_ledger().get(summary["testId"])["calls"] == summary["llmUsage"]["calls"]
+
+
+def test_calls_outside_an_exam_are_only_aggregated():
+    collector = UsageCollector()
+    before = call_outcomes().get("ok", 0)
+
+    LLMCall("single", 1).finish("ok", accepted=1)
+    with track_llm_usage(collector):
+        LLMCall("single", 1).finish("ok", accepted=1)
+
+    assert len(collector.calls) == 1
+    assert call_outcomes()["ok"] == before + 2
+
+
+def test_usage_endpoint_by_test_id(make_service):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import metrics_routes
+
+    service = make_service(StubChatModel(model_name="stub"))
+    test_id = service.create_exam("Python", "easy", 2, "fill_blank")["testId"]
+
+    app = FastAPI()
+    app.include_router(metrics_routes.router)
+    client = TestClient(app)
+
+    response = client.get(f"/api/metrics/exams/{test_id}")
+    assert response.status_code == 200
+    assert response.json()["testId"] == test_id
+    assert response.json()["callDetails"]
+
+    assert client.get("/api/metrics/exams/UNKNOWN").status_code == 404
+    assert "llmCallOutcomes" in client.get("/api/metrics/latency").json()
@@ -0,0 +1,142 @@
+"""Unit tests for latency-aware routing between several models."""
+
+import asyncio
+import json
+import os
+import sys
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from langchain_core.messages import AIMessage
+
+from src.generator.question_generator import QuestionGenerator
+from src.llm.model_router import ModelRouter
+from src.llm.scheduler import BACKGROUND, INTERACTIVE, llm_priority
+from src.llm.usage import CALL_ERROR, INVALID, OK, LLMCall, add_call_listener
+
+FAST, LARGE = "fast-model", "large-model"
+
+
+class ScriptedLLM:
+    """Returns a valid MCQ, or invalid JSON when ``valid`` is False"""
+
+    def __init__(self, valid=True):
+        self.valid = valid
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        if not self.valid:
+            return AIMessage(content=json.dumps({"question": "?", "options": []}))
+        return AIMessage(content=json.dumps({
+            "question": f"Routed question {self.calls}?",
+            "options": ["a", "b", "c", "d"],
+            "correct_answer": "a",
+        }))
+
+
+def _router(llms=None, **kwargs):
+    llms = llms or {FAST: ScriptedLLM(), LARGE: ScriptedLLM()}
+    options = dict(latency_target=1.0, min_samples=3, cooldown=60)
+    options.update(kwargs)
+    return ModelRouter([FAST, LARGE], llms.__getitem__, **options)
+
+
+def _observe(router, model, outcome=OK, latency=0.1):
+    call = LLMCall("single", 1, model)
+    call.outcome = outcome
+    call.latency = latency
+    router.observe(call)
+
+
+def test_interactive_and_background_lanes():
+    router = _router()
+
+    assert router.choose(INTERACTIVE)[0] == FAST
+    assert router.choose(BACKGROUND)[0] == LARGE
+    with llm_priority(BACKGROUND):
+        assert router.choose()[0] == LARGE
+
+
+def test_interactive_prefers_lowest_measured_latency():
+    router = _router()
+    _observe(router, FAST, latency=0.8)
+    _observe(router, LARGE, latency=0.2)
+
+    assert router.choose(INTERACTIVE)[0] == LARGE
+
+
+def test_latency_spike_fails_over():
+    router = _router()
+    _observe(router, FAST, latency=5.0)
+
+    stats = router.stats()
+    assert stats["models"][FAST]["healthy"] is False
+    assert stats["models"][FAST]["reason"] == "latency"
+    assert router.choose(INTERACTIVE)[0] == LARGE
+
+
+def test_repeated_validation_failures_fail_over():
+    router = _router()
+    for outcome in (INVALID, OK, INVALID):
+        _observe(router, LARGE, outcome)
+
+    assert router.stats()["models"][LARGE]["reason"] == "validation_failures"
+    assert router.choose(BACKGROUND)[0] == FAST
+
+
+def test_consecutive_call_errors_fail_over():
+    router = _router(max_call_errors=2)
+    _observe(router, FAST, CALL_ERROR)
+    assert router.stats()["models"][FAST]["healthy"] is True
+    _observe(router, FAST, CALL_ERROR)
+
+    assert router.choose(INTERACTIVE)[0] == LARGE
+
+
+def test_last_healthy_model_is_never_ejected():
+    router = _router()
+    _observe(router, FAST, latency=5.0)
+    _observe(router, LARGE, latency=5.0)
+
+    assert router.stats()["models"][LARGE]["healthy"] is True
+    assert router.choose(INTERACTIVE)[0] == LARGE
+
+
+def test_model_recovers_after_cooldown():
+    router = _router(cooldown=0)
+    _observe(router, FAST, latency=5.0)
+
+    assert router.choose(INTERACTIVE)[0] == FAST
+    assert router.stats()["models"][FAST]["latencyEwmaSeconds"] is None
+
+
+def test_generator_retries_on_the_failover_model():
+    bad, good = ScriptedLLM(valid=False), ScriptedLLM()
+    router = _router({FAST: bad, LARGE: good}, min_samples=1)
+    add_call_listener(router.observe)
+
+    generator = QuestionGenerator()
+    generator.cache = None
+    generator.bank = None
+    generator.router = router
+
+    question = asyncio.run(generator.agenerate_mcq("Python", "easy"))
+
+    assert question.question.startswith("Routed question")
+    assert (bad.calls, good.calls) == (1, 1)
+    assert router.stats()["models"][FAST]["reason"] == "validation_failures"
+
+
+def test_models_endpoint_reports_disabled_router():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import metrics_routes
+
+    app = FastAPI()
+    app.include_router(metrics_routes.router)
+
+    body = TestClient(app).get("/api/metrics/models").json()
+    assert body == {"enabled": False, "router": {}}
@@ -0,0 +1,152 @@
+"""Unit tests for MinHash/LSH near-duplicate rejection of generated questions."""
+
+import asyncio
+import os
+import random
+import sys
+import threading
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from conftest import ScriptedQuestionsLLM, mcq
+from src.config.settings import settings
+from src.storage.near_duplicates import (
+    NearDuplicateIndex,
+    exam_dedup_scope,
+    jaccard,
+    new_exam_index,
+    shingles,
+)
+from src.storage.in_memory_store import get_test
+from src.storage.question_bank import QuestionBank
+
+WORDS = (
+    "list tuple dict set string integer float module package class method "
+    "function decorator generator iterator closure lambda exception context "
+    "manager thread process socket file path import yield return await async"
+).split()
+
+
+@pytest.fixture(autouse=True)
+def near_duplicate_detection(monkeypatch):
+    """Detection is opt-in (NEAR_DUPLICATE_DETECTION); these tests turn it on"""
+    monkeypatch.setattr(settings, "NEAR_DUPLICATE_DETECTION", True)
+
+
+def test_rewording_is_similar_but_other_numbers_or_answers_are_not():
+    capital = shingles(mcq("What is the capital of France?", "Paris"))
+    reworded = shingles(mcq("Which city is the capital of France?", "Paris"))
+    assert jaccard(capital, reworded) >= 0.6
+
+    assert jaccard(
+        shingles(mcq("What is 2 + 2?", "4")), shingles(mcq("What is 3 + 5?", "8"))
+    ) < 0.3
+
+
+def test_index_finds_and_forgets_near_duplicates():
+    index = NearDuplicateIndex()
+    index.add("q1", mcq("What does the len function return in Python?"))
+
+    match = index.find(mcq("What does the len() function return in Python 3?"))
+    assert match is not None and match[0] == "q1"
+    assert index.find(mcq("How do you open a file for writing?")) is None
+
+    index.remove("q1")
+    assert len(index) == 0
+    assert index.find(mcq("What does the len function return in Python?")) is None
+
+
+def test_lookup_is_sub_linear_in_bank_size():
+    bank = QuestionBank()
+    rng = random.Random(3)
+    banked = [
+        mcq(" ".join(rng.sample(WORDS, 8)) + "?", f"answer {i}") for i in range(1000)
+    ]
+    bank.add_many("Python", "easy", "mcq", banked)
+    probe = dict(banked[500], question=banked[500]["question"].replace("?", " today?"))
+
+    assert bank.find_near_duplicate("Python", "easy", "mcq", probe) is not None
+    index = bank._shelves[bank.make_key("Python", "easy", "mcq")].index
+    # only LSH bucket-mates are compared, not all 1000 banked questions
+    assert index.candidates_checked < 50
+
+
+def test_bank_key_is_indexed_on_load_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "bank.sqlite3")
+    banked = [mcq(f"What does the {word} keyword do in Python?") for word in WORDS[:20]]
+    QuestionBank(path).add_many("Python", "easy", "mcq", banked)
+    bank = QuestionBank(path)
+    loaded_by = []
+    build = bank._build_shelf
+
+    def recording_build(rows):
+        loaded_by.append(threading.current_thread().name)
+        return build(rows)
+
+    bank._build_shelf = recording_build
+
+    async def scenario():
+        await bank.aload("Python", "easy", "mcq")
+        probe = dict(banked[5], question=banked[5]["question"].replace("?", " today?"))
+        return bank.find_near_duplicate("Python", "easy", "mcq", probe)
+
+    assert asyncio.run(scenario()) is not None
+    # built once, by the blocking executor, and the lookup only queried it
+    assert len(loaded_by) == 1 and loaded_by[0].startswith("blocking")
+    assert bank.is_loaded("Python", "easy", "mcq")
+
+
+def test_generated_near_duplicate_of_the_exam_is_retried(make_service):
+    llm = ScriptedQuestionsLLM([
+        "What is the capital of France?",
+        "Which city is the capital of France?",
+        "Who wrote the novel Don Quixote?",
+    ])
+    service = make_service(llm)
+
+    async def scenario():
+        with exam_dedup_scope(new_exam_index()):
+            first = await service.question_generator.agenerate_mcq("Geography", "easy")
+            second = await service.question_generator.agenerate_mcq("Geography", "easy")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first.question == "What is the capital of France?"
+    assert second.question == "Who wrote the novel Don Quixote?"
+    assert llm.calls == 3
+
+
+def test_generated_near_duplicate_of_the_bank_is_rejected(make_service):
+    bank = QuestionBank()
+    bank.add_many("Python", "easy", "mcq", [mcq("What keyword defines a function in Python?")])
+    llm = ScriptedQuestionsLLM([
+        "Which keyword defines a function in Python?",
+        "What does PEP 8 describe?",
+    ])
+
+    question = asyncio.run(make_service(llm, bank=bank).question_generator.agenerate_mcq("Python", "easy"))
+
+    assert question.question == "What does PEP 8 describe?"
+    assert bank.stats()["nearDuplicatesFound"] == 1
+    assert bank.count("Python", "easy", "mcq") == 2
+
+
+def test_batch_exam_asks_again_only_for_near_duplicate_slots(make_service):
+    llm = ScriptedQuestionsLLM([
+        "What is the capital of France?",
+        "What is the capital of France, in Europe?",
+        "Who painted the Mona Lisa?",
+        "What is the boiling point of water at sea level?",
+    ])
+
+    result = make_service(llm).create_exam("Trivia", "easy", 3, "mcq", batch=True)
+
+    texts = [q["question"] for q in get_test(result["testId"])["questions"]]
+    assert result["totalQuestions"] == 3
+    assert "What is the capital of France, in Europe?" not in texts
+    assert llm.calls == 2
@@ -0,0 +1,141 @@
+"""Unit tests for the indexed question bank and bank/mixed exam sources."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.common.custom_exception import CustomException
+from src.llm.backends import StubChatModel
+from src.storage.question_bank import QuestionBank
+from src.storage.question_cache import question_fingerprint
+
+
+def _questions(n, prefix="Bank question"):
+    return [
+        {"question": f"{prefix} {i}?", "options": ["a", "b", "c", "d"], "correct_answer": "a"}
+        for i in range(n)
+    ]
+
+
+def test_deduplicates_by_content_hash():
+    bank = QuestionBank()
+
+    assert bank.add_many("Python", "easy", "mcq", _questions(3)) == 3
+    # same text, different spacing / case: already banked
+    assert bank.add_many("  python ", "EASY", "mcq", [{"question": "bank QUESTION  1?"}]) == 0
+    assert bank.count("Python", "easy", "mcq") == 3
+    assert bank.stats()["duplicates"] == 1
+
+
+def test_sample_is_without_replacement_and_respects_exclude():
+    bank = QuestionBank()
+    bank.add_many("Python", "easy", "mcq", _questions(20))
+    exclude = {question_fingerprint(_questions(1)[0])}
+
+    drawn = bank.sample("Python", "easy", "mcq", 30, exclude)
+
+    fingerprints = [question_fingerprint(q) for q in drawn]
+    assert len(drawn) == 19
+    assert len(set(fingerprints)) == 19
+    assert question_fingerprint(_questions(1)[0]) not in fingerprints
+    assert bank.sample("Python", "easy", "mcq", 5, exclude) == []
+
+
+def test_discard_and_persistence(tmp_path):
+    path = str(tmp_path / "bank.sqlite3")
+    bank = QuestionBank(path)
+    bank.add_many("Python", "easy", "mcq", _questions(5))
+    bank.discard("Python", "easy", "mcq", _questions(2))
+
+    reopened = QuestionBank(path)
+    assert reopened.count("Python", "easy", "mcq") == 3
+    assert reopened.count("Python", "hard", "mcq") == 0
+
+
+def test_async_writes_commit_off_the_event_loop_and_the_bank_lock(tmp_path):
+    path = str(tmp_path / "bank.sqlite3")
+    bank = QuestionBank(path)
+    writes = []
+    write = bank._write
+
+    def recording_write(sql, rows):
+        writes.append((threading.current_thread().name, bank._lock.locked()))
+        return write(sql, rows)
+
+    bank._write = recording_write
+
+    async def scenario():
+        added = await bank.aadd_many("Python", "easy", "mcq", _questions(5))
+        removed = await bank.adiscard("Python", "easy", "mcq", _questions(2))
+        return added, removed
+
+    assert asyncio.run(scenario()) == (5, 2)
+    # both commits ran on the blocking executor, with lookups free to proceed
+    assert len(writes) == 2
+    assert all(name.startswith("blocking") and not locked for name, locked in writes)
+    assert QuestionBank(path).count("Python", "easy", "mcq") == 3
+
+
+def test_generated_questions_feed_the_bank(make_service):
+    bank = QuestionBank()
+    service = make_service(bank=bank)
+
+    service.create_exam("Chemistry", "easy", 4, "mcq", source="llm")
+
+    assert bank.count("Chemistry", "easy", "mcq") == 4
+
+
+def test_bank_source_makes_no_llm_call(make_service):
+    bank = QuestionBank()
+    bank.add_many("History", "medium", "mcq", _questions(50))
+    llm = StubChatModel(seed=12)
+    service = make_service(llm, bank=bank)
+
+    started = time.perf_counter()
+    result = service.create_exam("History", "medium", 10, "mcq", source="bank")
+
+    assert time.perf_counter() - started < 0.5
+    assert llm.calls == 0
+    assert result["totalQuestions"] == 10
+    assert result["sources"] == {"bank": 10, "pool": 0, "llm": 0, "fallback": 0}
+
+
+def test_bank_source_reports_shortfall_and_empty_bank(make_service):
+    bank = QuestionBank()
+    bank.add_many("History", "medium", "mcq", _questions(2))
+    service = make_service(bank=bank)
+
+    result = service.create_exam("History", "medium", 5, "mcq", source="bank")
+    assert result["partial"] is True
+    assert result["missing"] == 3
+
+    with pytest.raises(CustomException, match="No banked questions"):
+        service.create_exam("Geography", "medium", 5, "mcq", source="bank")
+
+
+def test_mixed_source_generates_only_the_shortfall(make_service):
+    bank = QuestionBank()
+    bank.add_many("Physics", "hard", "fill_blank", [
+        {"question": f"Banked blank {i} ____.", "answer": "x"} for i in range(3)
+    ])
+    service = make_service(bank=bank)
+
+    result = service.create_exam("Physics", "hard", 5, "fill_blank", batch=True, source="mixed")
+
+    assert result["totalQuestions"] == 5
+    assert result["sources"]["bank"] == 3
+    assert result["sources"]["llm"] == 2
+    assert result["llmUsage"]["calls"] == 1
+
+
+def test_invalid_source_is_rejected(make_service):
+    with pytest.raises(CustomException):
+        make_service(bank=QuestionBank()).create_exam("Python", "easy", 1, "mcq", source="web")
@@ -0,0 +1,197 @@
+"""Unit tests for the two-tier question cache."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.storage.question_cache import QuestionCache, question_fingerprint
+from src.generator.question_generator import QuestionGenerator
+
+
+def _questions(n, prefix="Q"):
+    return [
+        {
+            "question": f"{prefix} {i}?",
+            "options": ["a", "b", "c", "d"],
+            "correct_answer": "a",
+        }
+        for i in range(n)
+    ]
+
+
+def test_key_is_normalized():
+    assert (
+        QuestionCache.make_key("  Indian   History ", "Easy", "MCQ")
+        == QuestionCache.make_key("indian history", "easy", "mcq")
+    )
+
+
+def test_key_does_not_depend_on_the_routed_model(monkeypatch):
+    from src.config.settings import settings
+
+    key = QuestionCache.make_key("Python", "easy", "mcq")
+    monkeypatch.setattr(settings, "MODEL_NAME", "another-model")
+    assert QuestionCache.make_key("Python", "easy", "mcq") == key
+
+
+def test_key_below_min_variety_is_a_miss():
+    cache = QuestionCache(min_variety=5)
+    cache.put_many("Math", "easy", "mcq", _questions(4))
+
+    assert cache.get_many("Math", "easy", "mcq", 2) == []
+    assert cache.stats()["misses"] == 2
+
+    cache.put("Math", "easy", "mcq", _questions(5)[4])
+    assert len(cache.get_many("Math", "easy", "mcq", 2)) == 2
+    assert cache.stats()["hits"] == 2
+
+
+def test_returns_distinct_questions_and_honours_exclude():
+    cache = QuestionCache(min_variety=1)
+    cache.put_many("Math", "easy", "mcq", _questions(6))
+
+    exclude = set()
+    first = cache.get_many("Math", "easy", "mcq", 4, exclude)
+    second = cache.get_many("Math", "easy", "mcq", 4, exclude)
+
+    texts = [q["question"] for q in first + second]
+    assert len(texts) == 6
+    assert len(set(texts)) == 6
+    assert exclude == {question_fingerprint(q) for q in first + second}
+
+
+def test_lru_eviction_and_ttl_expiry():
+    cache = QuestionCache(max_keys=2, min_variety=1, ttl_seconds=0.05)
+    cache.put_many("A", "easy", "mcq", _questions(1))
+    cache.put_many("B", "easy", "mcq", _questions(1))
+    cache.get("A", "easy", "mcq")
+    cache.put_many("C", "easy", "mcq", _questions(1))
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("B", "easy", "mcq") is None
+    assert cache.get("A", "easy", "mcq") is not None
+
+    time.sleep(0.06)
+    assert cache.get("A", "easy", "mcq") is None
+    assert cache.stats()["expirations"] >= 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "questions.sqlite3")
+    QuestionCache(min_variety=1, disk_path=path).put_many(
+        "Math", "easy", "mcq", _questions(3)
+    )
+
+    restarted = QuestionCache(min_variety=1, disk_path=path)
+    assert len(restarted.get_many("Math", "easy", "mcq", 3)) == 3
+    assert restarted.stats()["diskLoads"] == 1
+
+
+def test_expired_disk_rows_are_deleted(tmp_path):
+    path = str(tmp_path / "questions.sqlite3")
+    cache = QuestionCache(min_variety=1, disk_path=path, disk_ttl_seconds=60)
+    cache.put_many("Math", "easy", "mcq", _questions(3))
+    with cache._disk_lock:
+        cache._get_disk().execute(
+            "UPDATE question_cache SET created_at = created_at - 120"
+            " WHERE question = (SELECT MIN(question) FROM question_cache)"
+        )
+        cache._get_disk().commit()
+
+    # deleted when the file is opened...
+    reopened = QuestionCache(min_variety=1, disk_path=path, disk_ttl_seconds=60)
+    assert len(reopened.get_many("Math", "easy", "mcq", 3)) == 2
+    assert reopened.stats()["diskExpirations"] == 1
+
+    # ...and by a write once the purge interval is over
+    with reopened._disk_lock:
+        reopened._get_disk().execute("UPDATE question_cache SET created_at = created_at - 120")
+        reopened._get_disk().commit()
+    reopened._next_purge = 0.0
+    reopened.put_many("Math", "easy", "mcq", _questions(1, prefix="New"))
+    assert reopened.stats()["diskExpirations"] == 3
+    with reopened._disk_lock:
+        assert reopened._get_disk().execute(
+            "SELECT COUNT(*) FROM question_cache"
+        ).fetchone()[0] == 1
+
+
+def test_async_writes_commit_off_the_event_loop_and_the_cache_lock(tmp_path):
+    path = str(tmp_path / "questions.sqlite3")
+    cache = QuestionCache(min_variety=1, disk_path=path)
+    writes = []
+    write = cache._write
+
+    def recording_write(sql, rows):
+        writes.append((threading.current_thread().name, cache._lock.locked()))
+        return write(sql, rows)
+
+    cache._write = recording_write
+
+    async def scenario():
+        await cache.aput_many("Math", "easy", "mcq", _questions(3))
+        return await cache.adiscard("Math", "easy", "mcq", _questions(1))
+
+    assert asyncio.run(scenario()) == 1
+    # both commits ran on the blocking executor, with lookups free to proceed
+    assert len(writes) == 2
+    assert all(name.startswith("blocking") and not locked for name, locked in writes)
+
+    restarted = QuestionCache(min_variety=1, disk_path=path)
+    assert len(restarted.get_many("Math", "easy", "mcq", 3)) == 2
+
+
+def test_cold_async_lookup_does_not_wait_on_a_commit_from_the_loop(tmp_path):
+    path = str(tmp_path / "questions.sqlite3")
+    QuestionCache(min_variety=3, disk_path=path).put_many("Math", "easy", "mcq", _questions(3))
+
+    class NoCallLLM:
+        async def ainvoke(self, prompt):
+            raise AssertionError("LLM should not be called on a cache hit")
+
+    generator = QuestionGenerator()
+    generator.llm = NoCallLLM()
+    generator.cache = cache = QuestionCache(min_variety=3, disk_path=path)
+    # another request's commit holds the connection for a while
+    cache._disk_lock.acquire()
+    threading.Timer(0.2, cache._disk_lock.release).start()
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        questions = await generator.agenerate_batch("mcq", "Math", "easy", 3)
+        task.cancel()
+        return ticks, questions
+
+    ticks, questions = asyncio.run(scenario())
+    assert len(questions) == 3
+    # the loop kept running while the key was read behind the commit
+    assert ticks >= 5
+    assert cache.stats()["diskLoads"] == 1
+
+
+def test_generator_serves_cache_before_calling_llm():
+    class NoCallLLM:
+        async def ainvoke(self, prompt):
+            raise AssertionError("LLM should not be called on a cache hit")
+
+    generator = QuestionGenerator()
+    generator.llm = NoCallLLM()
+    generator.cache = QuestionCache(min_variety=3)
+    generator.cache.put_many("Math", "easy", "mcq", _questions(3))
+
+    questions = asyncio.run(generator.agenerate_batch("mcq", "Math", "easy", 3))
+    assert len({q.question for q in questions}) == 3
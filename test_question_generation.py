@@ -0,0 +1,278 @@
+"""Unit tests for concurrent question generation in the exam service."""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from conftest import MCQ_JSON, FakeLLM, FakeResponse, distinct_mcq
+from src.storage.in_memory_store import get_test
+
+
+def test_create_exam_generates_concurrently(make_service):
+    service = make_service(FakeLLM(delay=0.2))
+
+    started = time.perf_counter()
+    result = service.create_exam("Geography", "easy", 5, "mcq", batch=False)
+    elapsed = time.perf_counter() - started
+
+    assert result["totalQuestions"] == 5
+    # five 0.2s calls in parallel, not back to back
+    assert elapsed < 0.6
+    timing = result["generationTime"]
+    assert timing["summedCallSeconds"] > timing["wallClockSeconds"]
+    assert len(get_test(result["testId"])["questions"]) == 5
+
+
+def test_failed_slot_is_skipped(make_service):
+    # first slot exhausts every retry with junk, the others succeed
+    llm = FakeLLM(delay=0, outputs=["not json"] * 3)
+    service = make_service(llm)
+
+    from src.config.settings import settings
+    original = settings.GENERATION_CONCURRENCY
+    settings.GENERATION_CONCURRENCY = 1
+    try:
+        result = service.create_exam("Geography", "easy", 3, "mcq", batch=False)
+    finally:
+        settings.GENERATION_CONCURRENCY = original
+
+    assert result["totalQuestions"] == 2
+    assert llm.calls == 5
+
+
+def test_concurrency_cap_is_respected(make_service):
+    in_flight = 0
+    peak = 0
+
+    class CountingLLM(FakeLLM):
+        async def ainvoke(self, prompt):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return self._next()
+
+    from src.config.settings import settings
+    original = settings.GENERATION_CONCURRENCY
+    settings.GENERATION_CONCURRENCY = 2
+    try:
+        result = make_service(CountingLLM()).create_exam(
+            "Geography", "easy", 6, "mcq", batch=False
+        )
+    finally:
+        settings.GENERATION_CONCURRENCY = original
+
+    assert result["totalQuestions"] == 6
+    assert peak == 2
+
+
+class SyncOnlyLLM:
+    """An LLM client without ainvoke; its blocking invoke must go to the executor"""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = 0
+
+    def invoke(self, prompt):
+        time.sleep(self.delay)
+        self.calls += 1
+        return FakeResponse(distinct_mcq(self.calls))
+
+
+async def _max_loop_stall(coro, tick=0.01):
+    """Await ``coro`` while measuring the longest gap between loop ticks"""
+    task = asyncio.ensure_future(coro)
+    worst = 0.0
+    last = time.perf_counter()
+    while not task.done():
+        await asyncio.sleep(tick)
+        now = time.perf_counter()
+        worst = max(worst, now - last - tick)
+        last = now
+    return task.result(), worst
+
+
+def test_acreate_exam_keeps_event_loop_responsive(make_service):
+    for llm in (FakeLLM(delay=0.2), SyncOnlyLLM(delay=0.2)):
+        service = make_service(llm)
+        result, stall = asyncio.run(
+            _max_loop_stall(
+                service.acreate_exam("Geography", "easy", 3, "mcq", batch=False)
+            )
+        )
+        assert result["totalQuestions"] == 3
+        assert stall < 0.1
+
+
+def test_health_answers_while_create_test_is_generating():
+    import httpx
+    from fastapi import FastAPI
+    from src.routes import exam_routes, health
+
+    app = FastAPI()
+    app.include_router(exam_routes.router)
+    app.include_router(health.router)
+    exam_routes.exam_service.question_generator.llm = SyncOnlyLLM(delay=0.5)
+    exam_routes.exam_service.question_generator.cache = None
+    exam_routes.exam_service.question_generator.bank = None
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            create = asyncio.ensure_future(client.post(
+                "/api/create-test",
+                json={"topic": "Geography", "num_questions": 2},
+            ))
+            await asyncio.sleep(0.05)
+            started = time.perf_counter()
+            health_response = await client.get("/health")
+            health_latency = time.perf_counter() - started
+            assert not create.done()
+            return health_response, health_latency, await create
+
+    health_response, health_latency, create_response = asyncio.run(scenario())
+
+    assert health_response.status_code == 200
+    assert health_latency < 0.2
+    assert create_response.status_code == 201
+
+
+class BatchLLM(FakeLLM):
+    """Answers batched prompts with a JSON array; ``bad`` items per call are invalid"""
+
+    def __init__(self, bad=None):
+        super().__init__(delay=0)
+        self.bad = list(bad or [])
+        self.requested = []
+
+    def _next(self, prompt=""):
+        self.calls += 1
+        count = int(re.search(r"Generate (\d+) distinct", prompt).group(1))
+        self.requested.append(count)
+        bad = self.bad.pop(0) if self.bad else 0
+        items = []
+        for i in range(count):
+            item = json.loads(MCQ_JSON)
+            item["question"] = f"Question {self.calls}.{i}?"
+            if i < bad:
+                item["options"] = item["options"][:3]
+            items.append(item)
+        return FakeResponse("Here you go:\n" + json.dumps(items))
+
+    async def ainvoke(self, prompt):
+        return self._next(prompt)
+
+
+def test_batch_mode_uses_one_call_per_batch(make_service):
+    llm = BatchLLM()
+    result = make_service(llm).create_exam("Geography", "easy", 7, "mcq", batch=True)
+
+    assert result["totalQuestions"] == 7
+    assert llm.calls == 1
+    assert llm.requested == [7]
+
+
+def test_batch_mode_only_requests_rejected_slots_again(make_service):
+    llm = BatchLLM(bad=[2])
+    result = make_service(llm).create_exam("Geography", "easy", 5, "mcq", batch=True)
+
+    assert result["totalQuestions"] == 5
+    assert llm.requested == [5, 2]
+
+
+def test_stream_parser_emits_objects_across_chunks():
+    from src.generator.json_stream import JSONObjectStreamParser
+
+    text = 'Sure! [{"question": "Is {x} \\alpha?", "answer": "a}"}, {"question": "b ___"'
+    parser = JSONObjectStreamParser()
+    emitted = []
+    for i in range(0, len(text), 7):
+        emitted.extend(parser.feed(text[i:i + 7]))
+
+    assert emitted == [{"question": "Is {x} \\alpha?", "answer": "a}"}]
+    assert parser.incomplete
+    assert parser.feed(', "answer": "c"}]') == [{"question": "b ___", "answer": "c"}]
+    assert not parser.incomplete
+
+
+class StreamingLLM:
+    """Streams a JSON array of ``count`` MCQs in small chunks"""
+
+    def __init__(self, chunk_delay=0.02):
+        self.chunk_delay = chunk_delay
+        self.finished_at = None
+
+    async def astream(self, prompt):
+        count = int(re.search(r"Generate (\d+) distinct", prompt).group(1))
+        items = []
+        for i in range(count):
+            item = json.loads(MCQ_JSON)
+            item["question"] = f"Streamed {i}?"
+            items.append(item)
+        text = json.dumps(items)
+        for i in range(0, len(text), 20):
+            await asyncio.sleep(self.chunk_delay)
+            yield FakeResponse(text[i:i + 20])
+        self.finished_at = time.perf_counter()
+
+
+def test_astream_exam_yields_questions_before_generation_ends(make_service):
+    from src.common.metrics import get_histogram
+    from src.exams.exam_service import TTFQ_HISTOGRAM
+
+    llm = StreamingLLM()
+    service = make_service(llm)
+    observed_before = get_histogram(TTFQ_HISTOGRAM).count
+
+    async def scenario():
+        return [
+            (time.perf_counter(), event)
+            async for event in service.astream_exam("Geography", "easy", 3, "mcq")
+        ]
+
+    events = asyncio.run(scenario())
+
+    assert [event["event"] for _, event in events] == [
+        "question", "question", "question", "summary"
+    ]
+    assert events[0][0] < llm.finished_at
+    summary = events[-1][1]
+    assert summary["totalQuestions"] == 3
+    assert summary["timeToFirstQuestionSeconds"] <= summary["totalSeconds"]
+    assert len(get_test(summary["testId"])["questions"]) == 3
+    assert get_histogram(TTFQ_HISTOGRAM).count == observed_before + 1
+
+
+def test_stream_endpoint_ndjson_and_sse():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import exam_routes
+
+    app = FastAPI()
+    app.include_router(exam_routes.router)
+    exam_routes.exam_service.question_generator.llm = StreamingLLM(chunk_delay=0)
+    exam_routes.exam_service.question_generator.cache = None
+    exam_routes.exam_service.question_generator.bank = None
+    client = TestClient(app)
+    body = {"topic": "Geography", "num_questions": 2}
+
+    response = client.post("/api/create-test/stream", json=body)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [e["event"] for e in events] == ["question", "question", "summary"]
+
+    response = client.post(
+        "/api/create-test/stream", json=body,
+        headers={"Accept": "text/event-stream"},
+    )
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.count("event: question\ndata: ") == 2
+    assert "event: summary\ndata: " in response.text
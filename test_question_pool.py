@@ -0,0 +1,104 @@
+"""Unit tests for the pre-warmed question pools."""
+
+import asyncio
+import os
+import sys
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.exams.exam_service import ExamService
+from src.generator.question_pool import QuestionPool
+from src.models.question_schemas import MCQQuestion
+
+
+class FakeGenerator:
+    """Produces numbered MCQs; records how many were requested per call"""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.requested = []
+        self.produced = 0
+
+    async def agenerate_batch(self, question_type, topic, difficulty, count, exclude=None):
+        self.requested.append(count)
+        await asyncio.sleep(self.delay)
+        questions = []
+        for _ in range(count):
+            self.produced += 1
+            questions.append(MCQQuestion(
+                question=f"{topic} question {self.produced}?",
+                options=["a", "b", "c", "d"],
+                correct_answer="a",
+            ))
+        return questions
+
+
+def _pool(generator, target_depth=5):
+    return QuestionPool(
+        hot_topics=["Python"],
+        difficulties=["easy"],
+        question_types=["mcq"],
+        target_depth=target_depth,
+        refill_interval=10,
+        generator=generator,
+    )
+
+
+async def _wait_for_depth(pool, key, depth, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while pool.depth()[key] < depth:
+        assert asyncio.get_running_loop().time() < deadline, pool.depth()
+        await asyncio.sleep(0.01)
+
+
+def test_pool_fills_and_refills_after_draw():
+    generator = FakeGenerator()
+    pool = _pool(generator)
+
+    async def scenario():
+        await pool.start()
+        try:
+            await _wait_for_depth(pool, "python|easy|mcq", 5)
+
+            drawn = pool.draw("  python ", "Easy", "mcq", 3)
+            assert len(drawn) == 3
+            assert pool.depth()["python|easy|mcq"] == 2
+
+            await _wait_for_depth(pool, "python|easy|mcq", 5)
+        finally:
+            await pool.stop()
+
+    asyncio.run(scenario())
+    assert generator.requested == [5, 3]
+    assert pool.stats()["draws"] == 1
+
+
+def test_unpooled_key_draws_nothing():
+    pool = _pool(FakeGenerator())
+    assert pool.draw("History", "easy", "mcq", 3) == []
+
+
+def test_create_exam_draws_from_pool_without_llm():
+    class NoCallLLM:
+        async def ainvoke(self, prompt):
+            raise AssertionError("LLM should not be called when the pool is full")
+
+    generator = FakeGenerator()
+    pool = _pool(generator)
+    service = ExamService()
+    service.question_generator.llm = NoCallLLM()
+    service.question_generator.cache = None
+    service.question_pool = pool
+
+    async def scenario():
+        await pool.start()
+        try:
+            await _wait_for_depth(pool, "python|easy|mcq", 5)
+            return await service.acreate_exam("Python", "easy", 4, "mcq")
+        finally:
+            await pool.stop()
+
+    result = asyncio.run(scenario())
+    assert result["totalQuestions"] == 4
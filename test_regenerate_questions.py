@@ -0,0 +1,130 @@
+"""Unit tests for regenerating individual questions of a stored exam."""
+
+import os
+import sys
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from conftest import FailingLLM
+from src.common.custom_exception import CustomException
+from src.config.settings import settings
+from src.llm.backends import StubChatModel
+from src.storage.in_memory_store import get_test
+from src.storage.question_cache import QuestionCache, question_fingerprint
+
+
+def test_regenerates_only_requested_slots_with_one_call(make_service, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_GENERATION", True)
+    llm = StubChatModel(seed=1)
+    service = make_service(llm)
+    test_id = service.create_exam("Python", "easy", 5, "mcq", batch=True)["testId"]
+    before = [dict(q) for q in get_test(test_id)["questions"]]
+    calls = llm.calls
+
+    result = service.regenerate_questions(test_id, [1, 3])
+
+    after = get_test(test_id)["questions"]
+    assert llm.calls == calls + 1
+    assert result["replaced"] == [1, 3]
+    assert result["notReplaced"] == []
+    assert result["revision"] == 2
+    assert set(result["questions"]) == {1, 3}
+    assert [after[i] for i in (0, 2, 4)] == [before[i] for i in (0, 2, 4)]
+    assert after[1] != before[1] and after[3] != before[3]
+    assert len({question_fingerprint(q) for q in after}) == 5
+
+
+def test_older_submissions_are_marked_stale(make_service):
+    service = make_service(StubChatModel(seed=2))
+    test_id = service.create_exam("Python", "easy", 3, "mcq")["testId"]
+    service.evaluate_exam(test_id, "Asha", {0: "x"})
+
+    assert service.get_exam_results(test_id)["submissions"][0]["stale"] is False
+
+    service.regenerate_questions(test_id, [0])
+    service.evaluate_exam(test_id, "Ravi", {0: "x"})
+
+    results = service.get_exam_results(test_id)
+    assert results["revision"] == 2
+    assert [s["stale"] for s in results["submissions"]] == [True, False]
+
+
+def test_replaced_question_is_dropped_from_cache(tmp_path, make_service):
+    service = make_service(StubChatModel(seed=3))
+    cache = QuestionCache(min_variety=1, disk_path=str(tmp_path / "cache.sqlite3"))
+    service.question_generator.cache = cache
+    test_id = service.create_exam("Math", "easy", 2, "fill_blank")["testId"]
+    rejected = dict(get_test(test_id)["questions"][0])
+
+    service.regenerate_questions(test_id, [0])
+
+    remaining = cache.get_many("Math", "easy", "fill_blank", 50)
+    assert question_fingerprint(rejected) not in {question_fingerprint(q) for q in remaining}
+    # the on-disk tier forgets it too
+    fresh = QuestionCache(min_variety=1, disk_path=str(tmp_path / "cache.sqlite3"))
+    assert rejected not in fresh.get_many("Math", "easy", "fill_blank", 50)
+
+
+def test_failed_regeneration_keeps_the_test_unchanged(make_service):
+    service = make_service(StubChatModel(seed=4))
+    test_id = service.create_exam("Python", "easy", 2, "mcq")["testId"]
+    before = [dict(q) for q in get_test(test_id)["questions"]]
+
+    service.question_generator.llm = FailingLLM()
+    result = service.regenerate_questions(test_id, [1])
+
+    assert result["replaced"] == []
+    assert result["notReplaced"] == [1]
+    assert result["revision"] == 1
+    assert get_test(test_id)["questions"] == before
+
+
+def test_invalid_question_ids_are_rejected(make_service):
+    service = make_service(StubChatModel(seed=5))
+    test_id = service.create_exam("Python", "easy", 2, "mcq")["testId"]
+
+    with pytest.raises(CustomException):
+        service.regenerate_questions(test_id, [2])
+
+
+def test_regenerate_endpoint():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import exam_routes
+
+    service = exam_routes.exam_service
+    original_llm, original_cache = service.question_generator.llm, service.question_generator.cache
+    original_bank, original_pool = service.question_generator.bank, service.question_pool
+    service.question_generator.llm = StubChatModel(seed=6)
+    service.question_generator.cache = None
+    service.question_generator.bank = None
+    service.question_pool = None
+
+    app = FastAPI()
+    app.include_router(exam_routes.router)
+    client = TestClient(app)
+    try:
+        test_id = service.create_exam("Python", "easy", 3, "mcq")["testId"]
+
+        response = client.post(f"/api/exam/{test_id}/regenerate", json={"question_ids": [2]})
+        assert response.status_code == 200
+        assert response.json()["replaced"] == [2]
+
+        assert client.post(
+            f"/api/exam/{test_id}/regenerate", json={"question_ids": [9]}
+        ).status_code == 400
+        assert client.post(
+            "/api/exam/UNKNOWN/regenerate", json={"question_ids": [0]}
+        ).status_code == 404
+        assert client.post(
+            f"/api/exam/{test_id}/regenerate", json={"question_ids": []}
+        ).status_code == 422
+    finally:
+        service.question_generator.llm = original_llm
+        service.question_generator.cache = original_cache
+        service.question_generator.bank = original_bank
+        service.question_pool = original_pool
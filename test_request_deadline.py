@@ -0,0 +1,139 @@
+"""Unit tests for deadline-aware exam creation with partial results."""
+
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from langchain_core.messages import AIMessageChunk
+
+from conftest import DelayedLLM, FailingLLM
+from src.common.custom_exception import CustomException
+from src.common.deadline import deadline_after, deadline_scope, time_remaining
+from src.llm.scheduler import get_llm_scheduler
+
+_ids = itertools.count()
+
+
+def _mcq():
+    n = next(_ids)
+    return {
+        "question": f"Deadline question {n}?",
+        "options": ["a", "b", "c", "d"],
+        "correct_answer": "a",
+    }
+
+
+class StallingStreamLLM:
+    """Streams two items of a batch array, then stalls"""
+
+    async def astream(self, prompt):
+        yield AIMessageChunk(content="[" + json.dumps(_mcq()) + ",")
+        yield AIMessageChunk(content=json.dumps(_mcq()) + ",")
+        await asyncio.sleep(10)
+        yield AIMessageChunk(content="]")
+
+
+def test_deadline_returns_questions_collected_so_far(make_service):
+    service = make_service(DelayedLLM([0, 0, 5, 5]))
+
+    started = time.perf_counter()
+    result = service.create_exam(
+        "Python", "easy", 4, "mcq", batch=False, deadline_seconds=0.5
+    )
+
+    assert time.perf_counter() - started < 2.0
+    assert result["totalQuestions"] == 2
+    assert result["partial"] is True
+    assert result["missing"] == 2
+    assert result["generationTime"]["timedOutUnits"] == 2
+
+
+def test_streamed_batch_items_survive_the_deadline(make_service):
+    service = make_service(StallingStreamLLM())
+
+    started = time.perf_counter()
+    result = service.create_exam(
+        "Python", "easy", 5, "mcq", batch=True, deadline_seconds=0.3
+    )
+
+    assert time.perf_counter() - started < 2.0
+    assert result["totalQuestions"] == 2
+    assert result["missing"] == 3
+
+
+def test_no_new_attempt_after_deadline(monkeypatch, make_service):
+    monkeypatch.setattr(get_llm_scheduler(), "backoff_delay", lambda attempt: 10.0)
+    llm = FailingLLM()
+    service = make_service(llm)
+
+    started = time.perf_counter()
+    with pytest.raises(CustomException):
+        service.create_exam("Python", "easy", 1, "mcq", batch=False, deadline_seconds=0.2)
+
+    # the backoff is cut short by the deadline and no retry follows
+    assert time.perf_counter() - started < 1.0
+    assert llm.calls == 1
+
+
+def test_sync_generation_respects_expired_deadline(make_service):
+    llm = FailingLLM()
+    service = make_service(llm)
+
+    with deadline_scope(deadline_after(0.001)):
+        time.sleep(0.01)
+        with pytest.raises(CustomException):
+            service.question_generator.generate_mcq("Python", "easy")
+
+    assert llm.calls == 0
+
+
+def test_nested_scopes_keep_the_earliest_deadline():
+    assert time_remaining() is None
+    with deadline_scope(deadline_after(1)):
+        with deadline_scope(deadline_after(60)):
+            assert time_remaining() <= 1
+        with deadline_scope(None):
+            assert time_remaining() <= 1
+    assert time_remaining() is None
+
+
+def test_full_exam_is_not_partial(make_service):
+    service = make_service(DelayedLLM([]))
+
+    result = service.create_exam("Python", "easy", 3, "mcq", batch=False)
+
+    assert result["partial"] is False
+    assert result["missing"] == 0
+
+
+def test_stream_summary_reports_partial(make_service):
+    service = make_service(StallingStreamLLM())
+
+    async def collect():
+        return [
+            event async for event in service.astream_exam(
+                "Python", "easy", 4, "mcq", deadline_seconds=0.3
+            )
+        ]
+
+    events = asyncio.run(collect())
+    assert [e["event"] for e in events] == ["question", "question", "summary"]
+    assert events[-1]["partial"] is True
+    assert events[-1]["missing"] == 2
+
+
+def test_deadline_is_validated_by_schema():
+    from src.schemas.create_test_schema import CreateTestSchema
+
+    assert CreateTestSchema(topic="x", deadline_seconds=10).deadline_seconds == 10
+    with pytest.raises(Exception):
+        CreateTestSchema(topic="x", deadline_seconds=0)
@@ -0,0 +1,415 @@
+"""Unit tests for the storage backends behind src.storage.in_memory_store."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.storage import in_memory_store
+from src.storage.in_memory_store import InMemoryBackend
+
+
+def _test(i, revision=1):
+    return {"testId": f"t{i}", "topic": "Python", "questions": [{"question": f"Q{i}?"}],
+            "revision": revision}
+
+
+def _sql_backend(path, **kwargs):
+    pytest.importorskip("aiosqlite")
+    from src.storage import sql_store
+
+    if sql_store.create_async_engine is None:
+        pytest.skip("sqlalchemy[asyncio] is not installed")
+    return sql_store.SQLStorageBackend(f"sqlite+aiosqlite:///{path}", **kwargs)
+
+
+@pytest.fixture
+def use_backend():
+    """Swap the process-wide backend for the duration of a test"""
+    original = in_memory_store._backend
+
+    def use(backend):
+        in_memory_store._backend = backend
+        return backend
+
+    yield use
+    in_memory_store._backend = original
+
+
+def test_memory_backend_is_the_default_and_backs_the_module_dicts():
+    assert isinstance(in_memory_store.get_storage_backend(), InMemoryBackend)
+
+    in_memory_store.store_test("mem-1", _test(1))
+    in_memory_store.store_submission("mem-1", {"studentName": "a"})
+
+    assert in_memory_store.TESTS["mem-1"]["topic"] == "Python"
+    assert in_memory_store.test_exists("mem-1")
+    assert in_memory_store.get_submissions("mem-1") == [{"studentName": "a"}]
+    assert in_memory_store.get_submissions("missing") == []
+
+
+def test_sql_backend_round_trips_and_updates(tmp_path):
+    backend = _sql_backend(tmp_path / "store.sqlite3")
+    try:
+        backend.store_test("t1", _test(1))
+        backend.store_test("t1", _test(1, revision=2))
+        for name in ("ann", "bob", "cy"):
+            backend.store_submission("t1", {"studentName": name, "answers": {0: "a"}})
+
+        assert backend.get_test("t1")["revision"] == 2
+        assert backend.get_test("missing") is None
+        assert backend.test_exists("t1") and not backend.test_exists("missing")
+        submissions = backend.get_submissions("t1")
+        assert [s["studentName"] for s in submissions] == ["ann", "bob", "cy"]
+        # stored as JSON: integer keys come back as strings
+        assert submissions[0]["answers"] == {"0": "a"}
+    finally:
+        backend.close()
+
+
+def test_sql_backend_is_shared_and_durable(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    pod_a, pod_b = _sql_backend(path), _sql_backend(path)
+    try:
+        pod_a.store_test("shared", _test(7))
+        assert pod_b.get_test("shared")["topic"] == "Python"
+    finally:
+        pod_a.close()
+        pod_b.close()
+
+    restarted = _sql_backend(path)
+    try:
+        assert restarted.test_exists("shared")
+    finally:
+        restarted.close()
+
+
+def test_concurrent_writes_are_group_committed(tmp_path):
+    backend = _sql_backend(tmp_path / "store.sqlite3", batch_interval=0.02)
+    try:
+        threads = [
+            threading.Thread(target=backend.store_submission, args=("t1", {"n": i}))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = backend.stats()
+        assert len(backend.get_submissions("t1")) == 20
+        assert stats["writes"] == 20
+        assert stats["writeBatches"] < 20
+        assert stats["largestBatch"] > 1
+    finally:
+        backend.close()
+
+
+def test_async_callers_await_the_sql_backend(tmp_path):
+    backend = _sql_backend(tmp_path / "store.sqlite3")
+
+    async def scenario():
+        await asyncio.gather(*(backend.astore_test(f"t{i}", _test(i)) for i in range(10)))
+        return await backend.aget_test("t3"), await backend.aget_submissions("t3")
+
+    try:
+        test, submissions = asyncio.run(scenario())
+        assert test["testId"] == "t3"
+        assert submissions == []
+    finally:
+        backend.close()
+
+
+def test_exam_flow_runs_on_the_sql_backend(tmp_path, use_backend):
+    from src.exams.exam_service import ExamService
+    from src.llm.backends import StubChatModel
+
+    backend = use_backend(_sql_backend(tmp_path / "store.sqlite3"))
+    try:
+        service = ExamService()
+        service.question_pool = None
+        service.question_generator.llm = StubChatModel(seed=21)
+        service.question_generator.cache = None
+        service.question_generator.bank = None
+
+        test_id = service.create_exam("Python", "easy", 3, "mcq")["testId"]
+        questions = service.get_exam_questions(test_id)["questions"]
+        service.evaluate_exam(test_id, "ann", {0: "whatever"})
+
+        assert len(questions) == 3
+        assert backend.get_test(test_id)["totalQuestions"] == 3
+        assert service.get_exam_results(test_id)["totalSubmissions"] == 1
+    finally:
+        backend.close()
+
+
+def _durable_backend(directory, **kwargs):
+    from src.storage.wal_store import DurableMemoryBackend
+
+    return DurableMemoryBackend(str(directory), **kwargs)
+
+
+@pytest.fixture
+def fresh_dicts():
+    """Give a backend empty module dicts and restore them after"""
+    tests, submissions = dict(in_memory_store.TESTS), dict(in_memory_store.SUBMISSIONS)
+    in_memory_store.TESTS.clear()
+    in_memory_store.SUBMISSIONS.clear()
+    yield
+    in_memory_store.TESTS.clear()
+    in_memory_store.TESTS.update(tests)
+    in_memory_store.SUBMISSIONS.clear()
+    in_memory_store.SUBMISSIONS.update(submissions)
+
+
+def test_wal_backend_recovers_after_restart(tmp_path, fresh_dicts):
+    backend = _durable_backend(tmp_path)
+    backend.store_test("t1", _test(1))
+    backend.store_test("t1", _test(1, revision=2))
+    backend.store_submission("t1", {"studentName": "ann"})
+    backend.close()
+    in_memory_store.TESTS.clear()
+    in_memory_store.SUBMISSIONS.clear()
+
+    restarted = _durable_backend(tmp_path)
+    try:
+        assert restarted.get_test("t1")["revision"] == 2
+        assert restarted.get_submissions("t1") == [{"studentName": "ann"}]
+        assert restarted.stats()["lsn"] == 3
+    finally:
+        restarted.close()
+
+
+def test_wal_snapshot_compacts_and_recovery_replays_only_the_tail(tmp_path, fresh_dicts):
+    from src.storage.wal_store import read_segment
+
+    backend = _durable_backend(tmp_path, snapshot_every=1000)
+    for i in range(10):
+        backend.store_test(f"t{i}", _test(i))
+    backend.snapshot()
+    backend.store_submission("t3", {"studentName": "late"})
+    backend.close()
+
+    files = sorted(os.listdir(tmp_path))
+    assert files == [f"snapshot-{10:020d}.json", f"wal-{11:020d}.log"]
+    records, _ = read_segment(str(tmp_path / files[1]))
+    assert [r["n"] for r in records] == [11]
+
+    restarted = _durable_backend(tmp_path)
+    try:
+        assert len(in_memory_store.TESTS) == 10
+        assert restarted.get_submissions("t3") == [{"studentName": "late"}]
+    finally:
+        restarted.close()
+
+
+def test_wal_torn_tail_is_truncated_on_recovery(tmp_path, fresh_dicts):
+    backend = _durable_backend(tmp_path)
+    backend.store_test("t1", _test(1))
+    backend.store_test("t2", _test(2))
+    backend.close()
+    segment = tmp_path / f"wal-{1:020d}.log"
+    intact = segment.stat().st_size
+    with open(segment, "ab") as f:
+        f.write(b"\x40\x00\x00\x00\x00\x00\x00\x00{\"n\": 3")  # crash mid-append
+
+    restarted = _durable_backend(tmp_path)
+    try:
+        assert restarted.test_exists("t2")
+        assert segment.stat().st_size == intact
+        restarted.store_test("t3", _test(3))
+        assert restarted.stats()["lsn"] == 3
+    finally:
+        restarted.close()
+
+
+def test_wal_concurrent_writes_share_fsyncs(tmp_path, fresh_dicts):
+    backend = _durable_backend(tmp_path, group_commit_linger=0.02)
+    try:
+        threads = [
+            threading.Thread(target=backend.store_submission, args=("t1", {"n": i}))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = backend.stats()
+        assert len(backend.get_submissions("t1")) == 20
+        assert stats["walRecords"] == 20
+        assert stats["walFlushes"] < 20
+    finally:
+        backend.close()
+
+
+def test_wal_writes_proceed_while_a_snapshot_flushes(tmp_path, fresh_dicts, monkeypatch):
+    from src.storage import wal_store
+
+    backend = _durable_backend(tmp_path, snapshot_every=3)
+    backend.store_test("t1", _test(1))
+    backend.store_test("t2", _test(2))
+    flushing, release = threading.Event(), threading.Event()
+    fsync = wal_store.os.fsync
+
+    def gated_fsync(fd):
+        # the flush of the record that triggers the snapshot stalls here
+        if not flushing.is_set():
+            flushing.set()
+            release.wait(5)
+        return fsync(fd)
+
+    monkeypatch.setattr(wal_store.os, "fsync", gated_fsync)
+    try:
+        trigger = threading.Thread(target=backend.store_test, args=("t3", _test(3)))
+        trigger.start()
+        assert flushing.wait(1)
+        writer = threading.Thread(target=backend.store_test, args=("t4", _test(4)))
+        writer.start()
+        for _ in range(100):
+            if "t4" in in_memory_store.TESTS:
+                break
+            time.sleep(0.01)
+        applied = "t4" in in_memory_store.TESTS
+        release.set()
+        trigger.join()
+        writer.join()
+        assert applied
+        for _ in range(100):
+            if backend.stats()["snapshots"]:
+                break
+            time.sleep(0.01)
+        assert backend.stats()["snapshots"] == 1
+    finally:
+        release.set()
+        backend.close()
+
+    in_memory_store.TESTS.clear()
+    restarted = _durable_backend(tmp_path)
+    try:
+        assert sorted(in_memory_store.TESTS) == ["t1", "t2", "t3", "t4"]
+        assert restarted.stats()["lsn"] == 4
+    finally:
+        restarted.close()
+
+
+def test_memory_backend_expires_idle_tests(fresh_dicts, monkeypatch):
+    from src.storage import in_memory_store as store
+
+    clock = [1000.0]
+    monkeypatch.setattr(store.time, "monotonic", lambda: clock[0])
+    backend = InMemoryBackend(ttl=60)
+    backend.store_test("old", _test(1))
+    clock[0] += 30
+    backend.store_test("busy", _test(2))
+    clock[0] += 40
+    backend.get_test("busy")  # activity keeps it alive
+
+    assert not backend.test_exists("old")
+    assert backend.get_test("old") is None
+    clock[0] += 50
+    assert backend.get_test("busy") is not None
+    assert backend.stats()["expirations"] == 1
+
+
+def test_memory_budget_evicts_least_recently_active(fresh_dicts):
+    one = in_memory_store.approximate_size(_test(0))
+    backend = InMemoryBackend(max_bytes=int(one * 3.5))
+    for i in range(3):
+        backend.store_test(f"t{i}", _test(i))
+    backend.get_test("t0")
+    backend.store_test("t3", _test(3))
+
+    assert [backend.test_exists(f"t{i}") for i in range(4)] == [True, False, True, True]
+    stats = backend.stats()
+    assert stats["evictions"] == 1 and stats["tests"] == 3
+    assert stats["approxBytes"] <= stats["budgetBytes"]
+
+
+def test_memory_budget_spills_cold_tests_to_disk(tmp_path, fresh_dicts):
+    one = in_memory_store.approximate_size(_test(0))
+    backend = InMemoryBackend(max_bytes=int(one * 2.5), spill_dir=str(tmp_path))
+    backend.store_test("t0", _test(0))
+    backend.store_submission("t0", {"studentName": "ann", "score": 3})
+    backend.store_test("t1", _test(1))
+    backend.store_test("t2", _test(2))
+
+    assert "t0" not in in_memory_store.TESTS
+    assert backend.test_stats("t0")["resident"] is False
+    assert backend.stats()["spilledTests"] == 1
+
+    # loaded back on access, evicting the now coldest test
+    assert backend.get_test("t0")["testId"] == "t0"
+    assert backend.get_submissions("t0") == [{"studentName": "ann", "score": 3}]
+    assert backend.test_stats("t1")["resident"] is False
+    assert backend.stats()["spillLoads"] == 1
+
+
+def test_spill_files_are_written_off_the_loop_and_outside_the_lock(
+    tmp_path, fresh_dicts, monkeypatch
+):
+    one = in_memory_store.approximate_size(_test(0))
+    backend = InMemoryBackend(max_bytes=int(one * 1.5), spill_dir=str(tmp_path))
+    assert backend.blocking and not InMemoryBackend().blocking
+    writes = []
+    dump = in_memory_store.json.dump
+
+    def recording_dump(state, f, **kwargs):
+        # another caller can use the store while the file is written
+        reader = threading.Thread(target=backend.test_exists, args=("t1",))
+        reader.start()
+        reader.join(timeout=1)
+        writes.append((threading.current_thread().name, not reader.is_alive()))
+        return dump(state, f, **kwargs)
+
+    monkeypatch.setattr(in_memory_store.json, "dump", recording_dump)
+
+    async def scenario():
+        await backend.astore_test("t0", _test(0))
+        await backend.astore_test("t1", _test(1))  # evicts t0
+        return await backend.aget_test("t0")  # loads t0 back, evicting t1
+
+    assert asyncio.run(scenario())["testId"] == "t0"
+    assert len(writes) == 2
+    assert all(name.startswith("blocking") and free for name, free in writes)
+    assert backend.get_test("t1")["testId"] == "t1"
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_memory_backend_reports_bytes_per_test(fresh_dicts):
+    backend = InMemoryBackend()
+    backend.store_test("small", _test(1))
+    backend.store_test("big", {"testId": "big", "questions": [{"question": "x" * 5000}]})
+    backend.store_submission("big", {"studentName": "ann"})
+
+    small, big = backend.test_stats("small"), backend.test_stats("big")
+    assert big["approxBytes"] > 5000 > small["approxBytes"] > 0
+    assert big["submissions"] == 1 and big["resident"]
+    assert backend.stats()["largestTests"][0]["testId"] == "big"
+    assert backend.test_stats("missing") is None
+
+
+def test_wal_backend_logs_expired_tests_as_drops(tmp_path, fresh_dicts, monkeypatch):
+    from src.storage import in_memory_store as store
+
+    clock = [1000.0]
+    monkeypatch.setattr(store.time, "monotonic", lambda: clock[0])
+    backend = _durable_backend(tmp_path, ttl=60)
+    backend.store_test("old", _test(1))
+    clock[0] += 100
+    backend.store_test("new", _test(2))
+    backend.close()
+
+    restarted = _durable_backend(tmp_path)
+    try:
+        assert not restarted.test_exists("old")
+        assert restarted.test_exists("new")
+    finally:
+        restarted.close()
@@ -0,0 +1,104 @@
+"""Unit tests for the pre-rendered student exam view and its ETag handling."""
+
+import json
+import os
+import sys
+
+import pytest
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.exams.exam_manager import ExamManager
+from src.exams.student_view import StudentViewCache, etag_matches, get_student_view_cache
+from src.storage.in_memory_store import store_test
+
+
+def _test(test_id, revision=1, question="What is a list?"):
+    return {
+        "testId": test_id,
+        "topic": "Python",
+        "difficulty": "easy",
+        "questionType": "mcq",
+        "totalQuestions": 2,
+        "questions": [
+            {"question": question, "options": ["a", "b", "c", "d"], "correct_answer": "a"},
+            {"question": "Fill: é ___", "answer": "x"},
+        ],
+        "revision": revision,
+    }
+
+
+@pytest.fixture
+def client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes import exam_routes
+
+    app = FastAPI()
+    app.include_router(exam_routes.router)
+    return TestClient(app)
+
+
+def test_view_is_rendered_on_save_and_served_with_an_etag(client):
+    from src.routes.exam_routes import exam_service
+
+    cache = get_student_view_cache()
+    ExamManager.save_test("view-1", _test("view-1"))
+    renders = cache.renders
+
+    response = client.get("/api/exam/view-1")
+    assert response.status_code == 200
+    assert response.json() == exam_service.get_exam_questions("view-1")
+    assert "correct_answer" not in response.text
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and response.headers["cache-control"] == "no-cache"
+
+    again = client.get("/api/exam/view-1", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert cache.renders == renders  # both served from the saved rendering
+
+
+def test_changed_test_gets_a_new_etag(client):
+    ExamManager.save_test("view-2", _test("view-2"))
+    etag = client.get("/api/exam/view-2").headers["etag"]
+
+    ExamManager.save_test("view-2", _test("view-2", revision=2, question="What is a dict?"))
+    response = client.get("/api/exam/view-2", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["questions"][0]["question"] == "What is a dict?"
+
+
+def test_revision_written_elsewhere_is_re_rendered(client):
+    ExamManager.save_test("view-3", _test("view-3"))
+    etag = client.get("/api/exam/view-3").headers["etag"]
+
+    # another replica regenerated it: only the shared store saw the save
+    store_test("view-3", _test("view-3", revision=2, question="What is a set?"))
+    response = client.get("/api/exam/view-3", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["questions"][0]["question"] == "What is a set?"
+
+
+def test_unknown_exam_is_404(client):
+    assert client.get("/api/exam/UNKNOWN").status_code == 404
+
+
+def test_cache_is_bounded_and_matches_etags():
+    cache = StudentViewCache(max_entries=2)
+    views = [cache.render(f"t{i}", _test(f"t{i}")) for i in range(3)]
+    assert cache.stats()["entries"] == 2
+    assert json.loads(views[0].body)["testId"] == "t0"
+    # same content, same ETag
+    assert views[0].etag == cache.render("t0", _test("t0")).etag
+
+    etag = views[1].etag
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
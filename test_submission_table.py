@@ -0,0 +1,84 @@
+"""Unit tests for the columnar per-test submission storage."""
+
+import json
+import os
+import random
+import sys
+
+# ensure project root is importable (same pattern as test_exam_system)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from src.storage.in_memory_store import approximate_size
+from src.storage.submission_table import SubmissionTable
+
+OPTIONS = ["alpha", "beta", "gamma", "delta"]
+KEY = ["beta", "alpha", "delta", "gamma", "beta", "beta", "alpha", "gamma", "delta", "alpha"]
+
+
+def _submission(i, answered=range(10), key=KEY):
+    """A submission shaped like ExamService.evaluate_exam stores it"""
+    rng = random.Random(i)
+    answers = {q: rng.choice(OPTIONS) for q in answered}
+    details = [
+        {"questionId": q, "studentAnswer": a, "correctAnswer": key[q],
+         "isCorrect": a.lower() == key[q].lower()}
+        for q, a in answers.items()
+    ]
+    correct = sum(d["isCorrect"] for d in details)
+    return {
+        "studentName": f"student-{i}",
+        "answers": answers,
+        "correct": correct,
+        "wrong": len(details) - correct,
+        "totalAttempted": len(details),
+        "scorePercentage": round(correct / max(1, len(details)) * 100, 2),
+        "resultsDetails": details,
+        "revision": 1,
+    }
+
+
+def test_rows_read_back_exactly():
+    rows = [_submission(i) for i in range(50)]
+    rows.append(_submission(50, answered=[0, 3, 9]))
+    rows.append(_submission(51, answered=[]))
+    rows.append(_submission(52, key=[a.upper() for a in KEY]))  # regenerated key
+    table = SubmissionTable.from_rows(rows, width=10)
+
+    assert len(table) == len(rows)
+    assert list(table) == rows
+    assert table[-1] == rows[-1]
+    assert table[10:12] == rows[10:12]
+    assert len(table._irregular) == 0
+    assert len(table._keys) == 4
+
+
+def test_json_round_tripped_rows_keep_string_keys():
+    rows = [json.loads(json.dumps(_submission(i))) for i in range(5)]
+    table = SubmissionTable.from_rows(rows, width=10)
+
+    assert list(table) == rows
+    assert list(table[0]["answers"]) == [str(q) for q in range(10)]
+    assert not table._irregular
+
+
+def test_rows_of_another_shape_are_kept_as_is():
+    odd = [
+        {"studentName": "a"},
+        {**_submission(1), "extra": True},
+        _submission(2, answered=[0, 12], key=KEY + ["beta"] * 3),  # question out of range
+        {**_submission(3), "answers": {1: "beta", 0: "alpha"}},  # not ascending
+        {**_submission(4), "scorePercentage": 0},
+    ]
+    table = SubmissionTable.from_rows([_submission(0)] + odd, width=10)
+
+    assert list(table) == [_submission(0)] + odd
+    assert len(table._irregular) == len(odd)
+
+
+def test_columnar_rows_are_much_smaller_than_dicts():
+    rows = [json.loads(json.dumps(_submission(i), sort_keys=False)) for i in range(500)]
+    table = SubmissionTable.from_rows(rows, width=10)
+
+    assert approximate_size(rows) / table.nbytes() >= 5
+    assert approximate_size(table) == table.nbytes()